@@ -0,0 +1,181 @@
+import glob
+import random
+
+from rparser import parse
+
+# parameters of generated corpora, pass them to generate() or pick one by name in the runner
+SCALES = {
+    'small': dict(files=10, hunks=5, lines=40),
+    'medium': dict(files=50, hunks=10, lines=60),
+    'large': dict(files=200, hunks=20, lines=80),
+}
+
+TYPES = ('int', 'long', 'double', 'String', 'Object', 'List<String>', 'Map<String, List<Integer>>', 'StringBuilder')
+NAMES = ('count', 'index', 'value', 'result', 'name', 'buffer', 'items', 'key', 'total', 'offset', 'cache', 'node')
+METHODS = ('get', 'put', 'add', 'remove', 'equals', 'compareTo', 'append', 'contains', 'size', 'toString')
+WORDS = ('error', 'value', 'of', 'the', 'file', 'is', 'not', 'found', 'at', 'line', 'user', 'id')
+
+
+class DiffGenerator:
+    """
+    A seeded generator of Java diffs. The same parameters and seed always give the same diffs.
+    """
+
+    def __init__(self, seed=0, statement_length=2, comment_density=0.1, string_density=0.2, change_ratio=0.3):
+        """
+        :param seed: seed of the random generator
+        :param statement_length: mean number of lines of a statement, statements longer than a line are split at ','
+        :param comment_density: probability of a comment between statements
+        :param string_density: probability of a string-heavy statement, e.g. a format call or a concatenation
+        :param change_ratio: probability that a line is added or deleted rather than unchanged
+        """
+        self.random = random.Random(seed)
+        self.statement_length = statement_length
+        self.comment_density = comment_density
+        self.string_density = string_density
+        self.change_ratio = change_ratio
+        self._var_cnt = 0
+
+    def diff(self, hunks: int, lines: int):
+        """
+        :param hunks: number of hunks
+        :param lines: number of lines of each hunk, roughly
+        :return: the text of a diff of a single file
+        """
+        chunks, start = list(), 1
+        for _ in range(hunks):
+            body, src_cnt, tgt_cnt = list(), 0, 0
+            while len(body) < lines:
+                prefix = self._prefix()
+                for line in self._block():
+                    body.append(prefix + line + '\n')
+                    src_cnt += prefix != '+'
+                    tgt_cnt += prefix != '-'
+            chunks.append(f'@@ -{start},{src_cnt} +{start},{tgt_cnt} @@ class Generated {{\n')
+            chunks += body
+            start += max(src_cnt, tgt_cnt) + self.random.randint(10, 100)
+        return ''.join(chunks)
+
+    def _prefix(self):
+        if self.random.random() >= self.change_ratio:
+            return ' '
+        return self.random.choice('+-')
+
+    def _block(self):
+        """
+        :return: lines of a statement, or of a comment
+        """
+        r = self.random
+        if r.random() < self.comment_density:
+            if r.random() < 0.5:
+                return [f'        // {self._words(r.randint(3, 10))}']
+            return ['        /**'] + [f'         * {self._words(r.randint(3, 10))}' for _ in range(r.randint(1, 4))] \
+                + ['         */']
+
+        if r.random() < self.string_density:
+            stmt = r.choice(self._string_statements)(self)
+        else:
+            stmt = r.choice(self._statements)(self)
+        return self._split(stmt)
+
+    def _split(self, stmt: str):
+        """
+        Split a statement into lines at ',' so that the mean number of lines is statement_length
+        """
+        lines = ['        ' + stmt]
+        parts = stmt.split(', ')
+        extra = min(len(parts) - 1, int(self.random.expovariate(1 / max(self.statement_length - 1, 1e-9))))
+        if extra <= 0:
+            return lines
+        cut = sorted(self.random.sample(range(1, len(parts)), extra))
+        lines, last = list(), 0
+        for i in cut + [len(parts)]:
+            text = ', '.join(parts[last:i])
+            lines.append(('        ' if not lines else '                ') + text + (',' if i < len(parts) else ''))
+            last = i
+        return lines
+
+    def _var(self):
+        self._var_cnt += 1
+        return f'{self.random.choice(NAMES)}{self._var_cnt % 50}'
+
+    def _words(self, n: int):
+        return ' '.join(self.random.choice(WORDS) for _ in range(n))
+
+    def _args(self):
+        return ', '.join(self._var() for _ in range(self.random.randint(0, 4)))
+
+    # -------------------------- statements -----------------------------
+    def _declaration(self):
+        return f'{self.random.choice(TYPES)} {self._var()} = {self._var()}.{self.random.choice(METHODS)}({self._args()});'
+
+    def _assignment(self):
+        op = self.random.choice(('+', '-', '*', '/', '&', '>>', '%'))
+        return f'{self._var()} = {self._var()} {op} {self.random.randint(0, 1000)};'
+
+    def _call_chain(self):
+        calls = '.'.join(f'{self.random.choice(METHODS)}({self._args()})' for _ in range(self.random.randint(1, 4)))
+        return f'{self._var()}.{calls};'
+
+    def _condition(self):
+        op = self.random.choice(('==', '!=', '<', '>=', '&&'))
+        return f'if ({self._var()} {op} {self._var()} || {self._var()}.{self.random.choice(METHODS)}({self._args()})) {{'
+
+    def _loop(self):
+        return f'for (int i = 0; i < {self._var()}.size(); i++) {{'
+
+    def _close(self):
+        return '}'
+
+    def _method(self):
+        params = ', '.join(f'{self.random.choice(TYPES)} {self._var()}' for _ in range(self.random.randint(0, 4)))
+        return f'public {self.random.choice(TYPES)} {self.random.choice(METHODS)}{self._var_cnt}({params}) {{'
+
+    def _format(self):
+        newline = '\\n' if self.random.random() < 0.5 else '%n'
+        return f'String.format("{self._words(4)} %s {self._words(2)}{newline}", {self._args() or self._var()});'
+
+    def _concat(self):
+        return f'{self._var()} = "{self._words(3)}: " + {self._var()} + " ({self._words(2)}) \\"{self._var()}\\"";'
+
+    def _log(self):
+        return f'logger.info("{self._words(6)} {{}}", {self._var()}.toString());'
+
+    _statements = (_declaration, _declaration, _assignment, _call_chain, _condition, _loop, _close, _close, _method)
+    _string_statements = (_format, _concat, _log)
+
+
+def generate(files=10, hunks=5, lines=40, seed=0, **options):
+    """
+    Generate a corpus of parsed Java diffs
+    :param files: number of patches
+    :param hunks: number of hunks of each patch
+    :param lines: number of lines of each hunk, roughly
+    :param seed: seed of the random generator
+    :param options: other parameters of DiffGenerator, like comment_density
+    :return: a list of (name, diff text) tuples
+    """
+    generator = DiffGenerator(seed, **options)
+    return [(f'src/main/java/gen/Generated{i}.java', generator.diff(hunks, lines)) for i in range(files)]
+
+
+def load_data_files(pattern='tests/data/*.java'):
+    """
+    :return: a list of (name, source text) tuples of java files used by tests
+    """
+    corpus = list()
+    for path in sorted(glob.glob(pattern)):
+        with open(path, 'r', encoding='utf-8') as f:
+            corpus.append((path, f.read()))
+    return corpus
+
+
+def parse_corpus(diffs, sources=()):
+    """
+    :param diffs: a list of (name, diff text) tuples
+    :param sources: a list of (name, source text) tuples of whole java files
+    :return: a list of patches
+    """
+    patches = [parse(text, name=name) for name, text in diffs]
+    patches += [parse(text, is_patch=False, name=name) for name, text in sources]
+    return patches
@@ -0,0 +1,181 @@
+"""
+Stress detectors with adversarial statements and report worst-case latency versus statement length.
+
+    python -m benchmarks.regex_stress
+    python -m benchmarks.regex_stress --detector EqualityDetector --sizes 500,1000,2000,4000,8000
+
+Each detector is run alone on statements of growing length, built to pass its keyword prefilter. Each regex pattern
+of the detector is also matched directly, which shows slow patterns hidden by prefilters. A growth exponent over 1.5
+(time ~ length^k) or a timeout is flagged. The exit status is 1 if any detector is flagged.
+"""
+import argparse
+import json
+import math
+import sys
+from time import perf_counter
+
+import regex
+
+from gen_detectors import DETECTOR_DICT
+from patterns.models.context import Context
+from patterns.models.engine import DefaultEngine
+from rparser import parse
+
+DEFAULT_SIZES = (250, 500, 1000, 2000, 4000)
+SUPER_LINEAR_EXPONENT = 1.5
+
+# generators of adversarial statements, called with a repetition count and the keywords of a detector
+FAMILIES = {
+    'long_identifier': lambda n, core: f'x {core} {"a" * (n * 4)} {core} x;',
+    'identifier_run': lambda n, core: f'x {core} ' + ' '.join(f'v{i}' for i in range(n)) + ';',
+    'nested_parens': lambda n, core: f'x {core} ' + 'f(' * n + 'x' + ')' * n + f' {core} x;',
+    'unbalanced_parens': lambda n, core: f'x {core} ' + 'f(a, ' * n + 'x;',
+    'unbalanced_quotes': lambda n, core: f'x {core} "' + 'a\\" + ' * n,
+    'dotted_chain': lambda n, core: f'x {core} ' + '.'.join(f'f{i}' for i in range(n)) + f' {core} x;',
+    'call_chain': lambda n, core: f'x {core} ' + '.'.join(f'f{i}(a)' for i in range(n)) + ';',
+    'operator_chain': lambda n, core: f' {core} '.join(f'a{i}' for i in range(n)) + ';',
+    'nested_generics': lambda n, core: f'x {core} ' + 'List<' * n + 'T' + '>' * n + ' x;',
+}
+
+
+def keyword_core(detector):
+    """
+    :return: a string containing a literal of each keyword of the detector, so that statements are dispatched to it
+    """
+    return ' '.join(keyword if isinstance(keyword, str) else keyword[0] for keyword in detector.keywords)
+
+
+def growth_exponent(lengths, times):
+    """
+    :return: the slope of log(time) over log(length) fitted by least squares, i.e. k of time ~ length^k
+    """
+    points = [(math.log(length), math.log(max(t, 1e-9))) for length, t in zip(lengths, times)]
+    if len(points) < 2:
+        return 0.0
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    var = sum((x - mean_x) ** 2 for x, _ in points)
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / var if var else 0.0
+
+
+def _best_time(func, repeat: int):
+    best = float('inf')
+    for _ in range(repeat):
+        start = perf_counter()
+        func()
+        best = min(best, perf_counter() - start)
+    return best
+
+
+def _measure(func, statements, cap: float, repeat: int):
+    """
+    :param func: called with a statement, raises TimeoutError if it runs over cap
+    :return: (lengths, times, timed out) of statements measured before the first timeout
+    """
+    lengths, times = list(), list()
+    for statement in statements:
+        try:
+            elapsed = _best_time(lambda: func(statement), repeat)
+        except TimeoutError:
+            return lengths, times, True
+        lengths.append(len(statement))
+        times.append(elapsed)
+        if elapsed >= cap:
+            return lengths, times, True
+    return lengths, times, False
+
+
+def _row(detector, target, family, measurement):
+    lengths, times, timed_out = measurement
+    # the fixed cost of a call hides growth on short statements, so fit the longest ones
+    exponent = growth_exponent(lengths[-3:], times[-3:])
+    return {
+        'detector': detector, 'target': target, 'family': family, 'lengths': lengths, 'times': times,
+        'exponent': exponent, 'timed_out': timed_out,
+        'flagged': timed_out or exponent > SUPER_LINEAR_EXPONENT,
+    }
+
+
+def stress_detector(name: str, sizes=DEFAULT_SIZES, cap=1.0, repeat=3, patterns=True):
+    """
+    :param name: name of the detector in DETECTOR_DICT
+    :param sizes: repetition counts of the adversarial structures, in increasing order
+    :param cap: time budget in seconds of a single match, longer statements are not tried once it is used up
+    :param repeat: number of runs of each measurement, the fastest one is reported
+    :param patterns: whether to match each regex pattern of the detector directly as well
+    :return: a list of dicts, one per (target, family), where target is 'match' or the name of a pattern attribute
+    """
+    engine = DefaultEngine(Context(), included_filter=(name,), regex_timeout=cap)
+    detector = engine._detectors[name]
+    core = keyword_core(detector)
+    raw_patterns = {attr: value for attr, value in vars(DETECTOR_DICT[name]()).items()
+                    if isinstance(value, regex.Pattern)}
+
+    def visit(statement):
+        engine.visit(patch_of[statement])
+        if engine.timeouts:
+            raise TimeoutError
+
+    rows = list()
+    for family, make in FAMILIES.items():
+        statements = [make(n, core) for n in sizes]
+        patch_of = {statement: parse(statement, is_patch=False, name='Stress.java') for statement in statements}
+        rows.append(_row(name, 'match', family, _measure(visit, statements, cap, repeat)))
+
+        if patterns:
+            for attr, pattern in raw_patterns.items():
+                measurement = _measure(lambda s: sum(1 for _ in pattern.finditer(s, timeout=cap)), statements, cap,
+                                       repeat)
+                rows.append(_row(name, attr, family, measurement))
+    return rows
+
+
+def worst_cases(rows):
+    """
+    :return: a dict of detector name to its row with the longest time on the longest statement
+    """
+    worst = dict()
+    for row in rows:
+        if not row['times']:
+            continue
+        current = worst.get(row['detector'], None)
+        if current is None or (row['flagged'], row['times'][-1]) > (current['flagged'], current['times'][-1]):
+            worst[row['detector']] = row
+    return worst
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.regex_stress',
+                                     description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--detector', action='append', help='detectors to stress, all by default')
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help='comma separated repetition counts of adversarial structures')
+    parser.add_argument('--cap', type=float, default=1.0, help='time budget in seconds of a single match')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--no-patterns', action='store_true', help='skip matching regex patterns directly')
+    parser.add_argument('--output', help='write all measurements to a json file')
+    args = parser.parse_args(argv)
+
+    sizes = sorted(int(size) for size in args.sizes.split(','))
+    rows = list()
+    for name in args.detector or DETECTOR_DICT:
+        rows += stress_detector(name, sizes, args.cap, args.repeat, not args.no_patterns)
+
+    print(f'{"detector":<45} {"target":<20} {"family":<18} {"length":>7} {"worst":>10} {"k":>5}')
+    for name, row in worst_cases(rows).items():
+        flag = '  TIMEOUT' if row['timed_out'] else '  SUPER-LINEAR' if row['flagged'] else ''
+        print(f'{name:<45} {row["target"]:<20} {row["family"]:<18} {row["lengths"][-1]:>7} '
+              f'{row["times"][-1] * 1e3:>8.2f}ms {row["exponent"]:>5.2f}{flag}')
+    latent = [row for row in rows if row['flagged'] and row['target'] != 'match']
+    for row in latent:
+        print(f'latent: {row["detector"]}.{row["target"]} on {row["family"]}, k={row["exponent"]:.2f}'
+              + (', timed out' if row['timed_out'] else ''))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(rows, f, indent=2)
+    return 1 if any(row['flagged'] and row['target'] == 'match' for row in rows) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,152 @@
+"""
+Measure throughput of the parser, the engine and each detector on a generated corpus, or on real diffs.
+
+    python -m benchmarks.run --scale medium --output bench.json
+    python -m benchmarks.run --scale medium --baseline bench.json
+    python -m benchmarks.run --diff pr-1.diff --diff pr-2.diff
+
+The exit status is 1 if any metric is slower than the baseline by more than the threshold.
+"""
+import argparse
+import json
+import platform
+import sys
+from time import perf_counter
+
+from gen_detectors import DETECTOR_DICT
+from patterns.models.context import Context
+from patterns.models.engine import DefaultEngine
+from rparser import parse_unified_diff
+from .corpus import SCALES, generate, load_data_files, parse_corpus
+
+RESULT_FORMAT = 1
+
+
+def count_statements(patches):
+    return sum(len(hunk.lines) for patch in patches for hunk in patch)
+
+
+def _best_time(func, repeat: int):
+    best = float('inf')
+    for _ in range(repeat):
+        start = perf_counter()
+        func()
+        best = min(best, perf_counter() - start)
+    return best
+
+
+def run(scale='small', seed=0, repeat=5, detectors=True, diff_paths=None, **options):
+    """
+    :param scale: name of the corpus parameters in SCALES
+    :param seed: seed of the corpus generator
+    :param repeat: number of runs of each measurement, the fastest one is reported
+    :param detectors: whether to measure each detector alone
+    :param diff_paths: paths of unified diffs, e.g. of real pull requests, used as the corpus instead of a generated one
+    :param options: parameters of the corpus generator overriding the scale
+    :return: a dict of results, whose 'metrics' maps names to statements per second
+    """
+    if diff_paths:
+        params = {'diffs': list(diff_paths)}
+
+        def parse_all():
+            return [patch for path in diff_paths for patch in parse_unified_diff(path)]
+    else:
+        params = dict(SCALES[scale], seed=seed, **options)
+        diffs, sources = generate(**params), load_data_files()
+
+        def parse_all():
+            return parse_corpus(diffs, sources)
+
+    patches = parse_all()
+    statements = count_statements(patches)
+    metrics = {'parse': statements / _best_time(parse_all, repeat)}
+
+    engine = DefaultEngine(Context())
+    metrics['visit'] = statements / _best_time(lambda: engine.visit(*patches), repeat)
+    bugs = len(engine.bug_accumulator)
+
+    # statements are counted as in 'visit', so the metrics compare directly
+    engine = DefaultEngine(Context(), added_only=True)
+    metrics['visit.added_only'] = statements / _best_time(lambda: engine.visit(*patches), repeat)
+    added_bugs = len(engine.bug_accumulator)
+
+    if detectors:
+        for name in DETECTOR_DICT:
+            engine = DefaultEngine(Context(), included_filter=(name,))
+            metrics[f'detector.{name}'] = statements / _best_time(lambda: engine.visit(*patches), repeat)
+
+    return {
+        'format': RESULT_FORMAT,
+        'params': params,
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'statements': statements,
+        'bugs': bugs,
+        'bugs_added_only': added_bugs,
+        'metrics': metrics,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold=0.1, higher_is_better=True):
+    """
+    :param threshold: relative slowdown tolerated, e.g. 0.1 for 10%
+    :param higher_is_better: whether metrics are throughput, like statements per second, rather than time
+    :return: a list of (metric name, baseline value, current value, ratio) tuples of all metrics in both results,
+             and a list of names of metrics slower than the baseline by more than the threshold
+    """
+    rows, regressions = list(), list()
+    for name, value in results['metrics'].items():
+        old_value = baseline['metrics'].get(name, None)
+        if not old_value:
+            continue
+        ratio = value / old_value
+        rows.append((name, old_value, value, ratio))
+        if (ratio < 1 - threshold) if higher_is_better else (ratio > 1 + threshold):
+            regressions.append(name)
+    return rows, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.run', description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--scale', choices=sorted(SCALES), default='small')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--statement-length', type=float, help='mean number of lines of a statement')
+    parser.add_argument('--comment-density', type=float, help='probability of a comment between statements')
+    parser.add_argument('--string-density', type=float, help='probability of a string-heavy statement')
+    parser.add_argument('--diff', action='append', help='a unified diff used as the corpus instead of a generated '
+                                                         'one, may be repeated')
+    parser.add_argument('--no-detectors', action='store_true', help='skip measuring each detector alone')
+    parser.add_argument('--output', help='write results to a json file')
+    parser.add_argument('--baseline', help='compare with results in a json file')
+    parser.add_argument('--threshold', type=float, default=0.1, help='relative slowdown reported as a regression')
+    args = parser.parse_args(argv)
+
+    options = {key: getattr(args, key) for key in ('statement_length', 'comment_density', 'string_density')
+               if getattr(args, key) is not None}
+    results = run(args.scale, args.seed, args.repeat, not args.no_detectors, args.diff, **options)
+    print(f"{results['statements']} statements, {results['bugs']} bug instances, "
+          f"{results['bugs_added_only']} on added statements")
+
+    regressions = list()
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('params') != results['params']:
+            print('warning: the baseline was measured on another corpus', file=sys.stderr)
+        rows, regressions = compare(results, baseline, args.threshold)
+        for name, old_value, value, ratio in rows:
+            flag = '  REGRESSION' if name in regressions else ''
+            print(f'{name:<60} {old_value:>12.0f} -> {value:>12.0f} stmt/s  x{ratio:.2f}{flag}')
+    else:
+        for name, value in results['metrics'].items():
+            print(f'{name:<60} {value:>12.0f} stmt/s')
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""
+Measure startup cost: importing the engine and building engines, each in a fresh interpreter.
+
+    python -m benchmarks.startup --output startup.json
+    python -m benchmarks.startup --baseline startup.json
+
+The exit status is 1 if any metric is slower than the baseline by more than the threshold.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from time import perf_counter
+
+from .run import compare
+
+RESULT_FORMAT = 1
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# timed in a fresh interpreter, which prints the elapsed milliseconds of each step
+PROBE = '''
+from time import perf_counter
+start = perf_counter()
+from patterns.models.engine import DefaultEngine
+from patterns.models.context import Context
+imported = perf_counter()
+DefaultEngine(Context(), included_filter=('CheckForSelfAssignment',))
+one = perf_counter()
+DefaultEngine(Context())
+print((imported - start) * 1e3, (one - imported) * 1e3, (perf_counter() - one) * 1e3)
+'''
+
+
+def _probe():
+    """
+    :return: a dict of metric name to milliseconds of a single run in a fresh interpreter
+    """
+    start = perf_counter()
+    output = subprocess.run((sys.executable, '-c', PROBE), cwd=ROOT, check=True, capture_output=True,
+                            text=True).stdout
+    wall = (perf_counter() - start) * 1e3
+    import_ms, one_ms, all_ms = map(float, output.split())
+    return {'import_engine': import_ms, 'engine_one_detector': one_ms, 'engine_all_detectors': all_ms,
+            'process_wall': wall}
+
+
+def run(repeat=5):
+    """
+    :param repeat: number of fresh interpreters, the fastest time of each metric is reported
+    :return: a dict of results, whose 'metrics' maps names to milliseconds
+    """
+    metrics = dict()
+    for _ in range(repeat):
+        for name, value in _probe().items():
+            metrics[name] = min(metrics.get(name, value), value)
+    return {'format': RESULT_FORMAT, 'python': sys.version.split()[0], 'metrics': metrics}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.startup', description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help='write results to a json file')
+    parser.add_argument('--baseline', help='compare with results in a json file')
+    parser.add_argument('--threshold', type=float, default=0.1, help='relative slowdown reported as a regression')
+    args = parser.parse_args(argv)
+
+    results = run(args.repeat)
+    regressions = list()
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        rows, regressions = compare(results, baseline, args.threshold, higher_is_better=False)
+        for name, old_value, value, ratio in rows:
+            flag = '  REGRESSION' if name in regressions else ''
+            print(f'{name:<25} {old_value:>9.1f} -> {value:>9.1f} ms  x{ratio:.2f}{flag}')
+    else:
+        for name, value in results['metrics'].items():
+            print(f'{name:<25} {value:>9.1f} ms')
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,75 +1,80 @@
-from patterns.detect.bad_syntax_for_regular_expression import SingleDotPatternDetector, FileSeparatorAsRegexpDetector
-from patterns.detect.find_dead_local_stores import FindDeadLocalIncrementInReturn
-from patterns.detect.find_puzzlers import BadMonthDetector, ShiftAddPriorityDetector
-from patterns.detect.find_self_comparison import CheckForSelfComputation, CheckForSelfComparison
-from patterns.detect.incompat_mask import IncompatMaskDetector
-from patterns.detect.inheritance_unsafe_get_resource import GetResourceDetector
-from patterns.detect.questionable_boolean_assignment import BooleanAssignmentDetector
-from patterns.detect.static_calendar_detector import StaticDateFormatDetector
-from patterns.detect.method_return_check import NotThrowDetector
-from patterns.detect.overriding_equals_not_symmetrical import EqualsClassNameDetector
-from patterns.detect.infinite_recursive_loop import CollectionAddItselfDetector
-from patterns.detect.find_rough_constants import FindRoughConstantsDetector
-from patterns.detect.find_ref_comparison import EqualityDetector, CallToNullDetector
-from patterns.detect.naming import SimpleSuperclassNameDetector, SimpleInterfaceNameDetector, HashCodeNameDetector, \
-    ToStringNameDetector, EqualNameDetector
-from patterns.detect.dont_catch_illegal_monitor_state_exception import DontCatchIllegalMonitorStateException
-from patterns.detect.find_finalize_invocations import ExplicitInvDetector, PublicAccessDetector
-from patterns.detect.serializable_idiom import DefSerialVersionID, DefReadResolveMethod, DefPrivateMethod
-from patterns.detect.find_unrelated_types_in_generic_container import SuspiciousCollectionMethodDetector
-from patterns.detect.dumb_methods import FinalizerOnExitDetector, RandomOnceDetector, RandomD2IDetector, \
-    StringCtorDetector, InvalidMinMaxDetector
-from patterns.detect.format_string_checker import NewLineDetector
-from patterns.detect.find_float_equality import FloatEqualityDetector
-from patterns.detect.find_puzzlers import OverwrittenIncrementDetector
-from patterns.detect.find_bad_cast import FindBadCastDetector
-from patterns.detect.naming import ClassNameConventionDetector, MethodNameConventionDetector
-from patterns.detect.dont_use_enum import DontUseEnumDetector
-from patterns.detect.find_self_assignment import CheckForSelfAssignment, CheckForSelfDoubleAssignment
+import importlib
+from collections.abc import Mapping
 
 
-DETECTOR_DICT = {
-    "IncompatMaskDetector": IncompatMaskDetector,
-    "GetResourceDetector": GetResourceDetector,
-    "StaticDateFormatDetector": StaticDateFormatDetector,
-    "NotThrowDetector": NotThrowDetector,
-    "EqualsClassNameDetector": EqualsClassNameDetector,
-    "CollectionAddItselfDetector": CollectionAddItselfDetector,
-    "FindRoughConstantsDetector": FindRoughConstantsDetector,
-    "EqualityDetector": EqualityDetector,
-    "CallToNullDetector": CallToNullDetector,
-    "SimpleSuperclassNameDetector": SimpleSuperclassNameDetector,
-    "SimpleInterfaceNameDetector": SimpleInterfaceNameDetector,
-    "HashCodeNameDetector": HashCodeNameDetector,
-    "ToStringNameDetector": ToStringNameDetector,
-    "DontCatchIllegalMonitorStateException": DontCatchIllegalMonitorStateException,
-    "ExplicitInvDetector": ExplicitInvDetector,
-    "PublicAccessDetector": PublicAccessDetector,
-    "DefSerialVersionID": DefSerialVersionID,
-    "DefReadResolveMethod": DefReadResolveMethod,
-    "SuspiciousCollectionMethodDetector": SuspiciousCollectionMethodDetector,
-    "FinalizerOnExitDetector": FinalizerOnExitDetector,
-    "RandomOnceDetector": RandomOnceDetector,
-    "RandomD2IDetector": RandomD2IDetector,
-    "StringCtorDetector": StringCtorDetector,
-    "NewLineDetector": NewLineDetector,
-    "InvalidMinMaxDetector":  InvalidMinMaxDetector,
-    'CheckForSelfComputation': CheckForSelfComputation,
-    'CheckForSelfComparison': CheckForSelfComparison,
-    'FindDeadLocalIncrementInReturn': FindDeadLocalIncrementInReturn,
-    "DefPrivateMethod": DefPrivateMethod,
-    'EqualNameDetector': EqualNameDetector,
-    'BooleanAssignmentDetector': BooleanAssignmentDetector,
-    'BadMonthDetector': BadMonthDetector,
-    'ShiftAddPriorityDetector': ShiftAddPriorityDetector,
-    'FloatEqualityDetector': FloatEqualityDetector,
-    'FindBadCastDetector': FindBadCastDetector,
-    'OverwrittenIncrementDetector': OverwrittenIncrementDetector,
-    'SingleDotPatternDetector': SingleDotPatternDetector,
-    'FileSeparatorAsRegexpDetector': FileSeparatorAsRegexpDetector,
-    'ClassNameConventionDetector': ClassNameConventionDetector,
-    'MethodNameConventionDetector': MethodNameConventionDetector,
-    'DontUseEnumDetector': DontUseEnumDetector,
-    'CheckForSelfAssignment': CheckForSelfAssignment,
-    'CheckForSelfDoubleAssignment': CheckForSelfDoubleAssignment,
-}
\ No newline at end of file
+class DetectorRegistry(Mapping):
+    """
+    A mapping of detector names to detector classes. The module of a detector is imported on the first lookup of the
+    detector, so that an engine only imports the detectors it uses.
+    """
+
+    def __init__(self, paths: dict):
+        """
+        :param paths: a dict of detector name to the import path of the class, like 'package.module.ClassName'
+        """
+        self._paths = paths
+        self._classes = dict()
+
+    def __getitem__(self, name: str):
+        detector_class = self._classes.get(name, None)
+        if detector_class is None:
+            module_name, class_name = self._paths[name].rsplit('.', 1)
+            detector_class = getattr(importlib.import_module(module_name), class_name)
+            self._classes[name] = detector_class
+        return detector_class
+
+    def __contains__(self, name):
+        return name in self._paths
+
+    def __iter__(self):
+        return iter(self._paths)
+
+    def __len__(self):
+        return len(self._paths)
+
+
+DETECTOR_DICT = DetectorRegistry({
+    'IncompatMaskDetector': 'patterns.detect.incompat_mask.IncompatMaskDetector',
+    'GetResourceDetector': 'patterns.detect.inheritance_unsafe_get_resource.GetResourceDetector',
+    'StaticDateFormatDetector': 'patterns.detect.static_calendar_detector.StaticDateFormatDetector',
+    'NotThrowDetector': 'patterns.detect.method_return_check.NotThrowDetector',
+    'EqualsClassNameDetector': 'patterns.detect.overriding_equals_not_symmetrical.EqualsClassNameDetector',
+    'CollectionAddItselfDetector': 'patterns.detect.infinite_recursive_loop.CollectionAddItselfDetector',
+    'FindRoughConstantsDetector': 'patterns.detect.find_rough_constants.FindRoughConstantsDetector',
+    'EqualityDetector': 'patterns.detect.find_ref_comparison.EqualityDetector',
+    'CallToNullDetector': 'patterns.detect.find_ref_comparison.CallToNullDetector',
+    'SimpleSuperclassNameDetector': 'patterns.detect.naming.SimpleSuperclassNameDetector',
+    'SimpleInterfaceNameDetector': 'patterns.detect.naming.SimpleInterfaceNameDetector',
+    'HashCodeNameDetector': 'patterns.detect.naming.HashCodeNameDetector',
+    'ToStringNameDetector': 'patterns.detect.naming.ToStringNameDetector',
+    'DontCatchIllegalMonitorStateException': 'patterns.detect.dont_catch_illegal_monitor_state_exception.DontCatchIllegalMonitorStateException',
+    'ExplicitInvDetector': 'patterns.detect.find_finalize_invocations.ExplicitInvDetector',
+    'PublicAccessDetector': 'patterns.detect.find_finalize_invocations.PublicAccessDetector',
+    'DefSerialVersionID': 'patterns.detect.serializable_idiom.DefSerialVersionID',
+    'DefReadResolveMethod': 'patterns.detect.serializable_idiom.DefReadResolveMethod',
+    'SuspiciousCollectionMethodDetector': 'patterns.detect.find_unrelated_types_in_generic_container.SuspiciousCollectionMethodDetector',
+    'FinalizerOnExitDetector': 'patterns.detect.dumb_methods.FinalizerOnExitDetector',
+    'RandomOnceDetector': 'patterns.detect.dumb_methods.RandomOnceDetector',
+    'RandomD2IDetector': 'patterns.detect.dumb_methods.RandomD2IDetector',
+    'StringCtorDetector': 'patterns.detect.dumb_methods.StringCtorDetector',
+    'NewLineDetector': 'patterns.detect.format_string_checker.NewLineDetector',
+    'InvalidMinMaxDetector': 'patterns.detect.dumb_methods.InvalidMinMaxDetector',
+    'CheckForSelfComputation': 'patterns.detect.find_self_comparison.CheckForSelfComputation',
+    'CheckForSelfComparison': 'patterns.detect.find_self_comparison.CheckForSelfComparison',
+    'FindDeadLocalIncrementInReturn': 'patterns.detect.find_dead_local_stores.FindDeadLocalIncrementInReturn',
+    'DefPrivateMethod': 'patterns.detect.serializable_idiom.DefPrivateMethod',
+    'EqualNameDetector': 'patterns.detect.naming.EqualNameDetector',
+    'BooleanAssignmentDetector': 'patterns.detect.questionable_boolean_assignment.BooleanAssignmentDetector',
+    'BadMonthDetector': 'patterns.detect.find_puzzlers.BadMonthDetector',
+    'ShiftAddPriorityDetector': 'patterns.detect.find_puzzlers.ShiftAddPriorityDetector',
+    'FloatEqualityDetector': 'patterns.detect.find_float_equality.FloatEqualityDetector',
+    'FindBadCastDetector': 'patterns.detect.find_bad_cast.FindBadCastDetector',
+    'OverwrittenIncrementDetector': 'patterns.detect.find_puzzlers.OverwrittenIncrementDetector',
+    'SingleDotPatternDetector': 'patterns.detect.bad_syntax_for_regular_expression.SingleDotPatternDetector',
+    'FileSeparatorAsRegexpDetector': 'patterns.detect.bad_syntax_for_regular_expression.FileSeparatorAsRegexpDetector',
+    'ClassNameConventionDetector': 'patterns.detect.naming.ClassNameConventionDetector',
+    'MethodNameConventionDetector': 'patterns.detect.naming.MethodNameConventionDetector',
+    'DontUseEnumDetector': 'patterns.detect.dont_use_enum.DontUseEnumDetector',
+    'CheckForSelfAssignment': 'patterns.detect.find_self_assignment.CheckForSelfAssignment',
+    'CheckForSelfDoubleAssignment': 'patterns.detect.find_self_assignment.CheckForSelfDoubleAssignment',
+})
@@ -0,0 +1,320 @@
+import asyncio
+import json
+import os
+import ssl
+import threading
+import time
+from urllib.parse import urljoin, urlsplit
+
+from utils import logger, user_agent
+
+MAX_REDIRECTS = 5
+REDIRECT_STATUS = (301, 302, 307, 308)
+
+
+class Response:
+    """ A minimal HTTP response, compatible with the attributes of `requests.Response` used by callers """
+
+    def __init__(self, status_code: int, headers: dict, content: bytes):
+        self.status_code = status_code
+        self.headers = headers  # lower-case header names
+        self.content = content
+
+    def json(self):
+        return json.loads(self.content.decode('utf-8'))
+
+
+async def _read_response(reader: asyncio.StreamReader):
+    """
+    Read a HTTP/1.1 response from the stream
+    :return: a Response object and whether the connection can be reused
+    """
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError('Connection closed by server')
+    parts = status_line.decode('latin-1').split(' ', 2)
+    version, status_code = parts[0], int(parts[1])
+
+    headers = dict()
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+    if status_code in (204, 304) or 100 <= status_code < 200:
+        content = b''
+    elif headers.get('transfer-encoding', '').lower() == 'chunked':
+        chunks = list()
+        while True:
+            size = int((await reader.readline()).split(b';', 1)[0], 16)
+            if size == 0:
+                # skip trailers
+                while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    pass
+                break
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)  # CRLF after each chunk
+        content = b''.join(chunks)
+    elif 'content-length' in headers:
+        content = await reader.readexactly(int(headers['content-length']))
+    else:
+        content = await reader.read()
+        keep_alive = False
+    return Response(status_code, headers, content), keep_alive
+
+
+class ConnectionPool:
+    """
+    Keep-alive connections grouped by (scheme, host, port). Must be used inside a single event loop.
+    """
+
+    def __init__(self, max_connections=8):
+        self._idle = dict()
+        self._semaphore = asyncio.Semaphore(max_connections)
+        self.opened = 0  # number of connections opened so far
+
+    async def request(self, url: str, headers: dict, timeout: float):
+        parts = urlsplit(url)
+        is_https = parts.scheme == 'https'
+        port = parts.port or (443 if is_https else 80)
+        key = (parts.scheme, parts.hostname, port)
+        target = parts.path or '/'
+        if parts.query:
+            target += '?' + parts.query
+
+        lines = [f'GET {target} HTTP/1.1', f'Host: {parts.netloc}', 'Connection: keep-alive']
+        lines += [f'{name}: {value}' for name, value in headers.items()]
+        raw_request = ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+        async with self._semaphore:
+            idle = self._idle.setdefault(key, list())
+            while True:
+                reused = bool(idle)
+                if reused:
+                    reader, writer = idle.pop()
+                else:
+                    ssl_context = ssl.create_default_context() if is_https else None
+                    reader, writer = await asyncio.wait_for(
+                        asyncio.open_connection(parts.hostname, port, ssl=ssl_context), timeout)
+                    self.opened += 1
+
+                try:
+                    writer.write(raw_request)
+                    await writer.drain()
+                    resp, keep_alive = await asyncio.wait_for(_read_response(reader), timeout)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    writer.close()
+                    if reused:
+                        continue  # the idle connection was closed by server, retry with another one
+                    raise
+                except BaseException:
+                    writer.close()
+                    raise
+
+                if keep_alive:
+                    idle.append((reader, writer))
+                else:
+                    writer.close()
+                return resp
+
+    def close(self):
+        for connections in self._idle.values():
+            for _, writer in connections:
+                writer.close()
+        self._idle.clear()
+
+
+def rate_limit_family(url: str):
+    """
+    :return: the rate limit resource GitHub counts requests to the url against, until a response tells otherwise
+    """
+    path = urlsplit(url).path
+    if path.startswith('/search/code'):
+        return 'code_search'
+    if path.startswith('/search/'):
+        return 'search'
+    if path.startswith('/graphql'):
+        return 'graphql'
+    return 'core'
+
+
+class RateLimiter:
+    """
+    A token bucket driven by `X-RateLimit-*` headers of GitHub API, one per rate limit resource, e.g. core or search.
+    The bucket holds the remaining requests of the current window and is refilled when the window resets.
+    """
+
+    def __init__(self):
+        self.limit = None
+        self.tokens = None  # None means unknown, i.e. no limit until the first response
+        self.reset_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while self.tokens is not None and self.tokens < 1:
+                delay = self.reset_at - time.time()
+                if delay > 0:
+                    logger.info(f'[Rate Limit] wait {delay:.1f} seconds')
+                    await asyncio.sleep(delay)
+                self.tokens = self.limit
+            if self.tokens is not None:
+                self.tokens -= 1
+
+    def update(self, headers: dict):
+        remaining = headers.get('x-ratelimit-remaining', None)
+        reset = headers.get('x-ratelimit-reset', None)
+        if remaining is None or reset is None:
+            return
+        remaining, reset = int(remaining), float(reset)
+        if 'x-ratelimit-limit' in headers:
+            self.limit = int(headers['x-ratelimit-limit'])
+        if self.tokens is None or reset != self.reset_at:
+            # a new window
+            self.tokens = remaining
+        else:
+            # requests still in flight have taken their tokens already
+            self.tokens = min(self.tokens, remaining)
+        self.reset_at = reset
+
+    def block_until(self, timestamp: float):
+        self.tokens = 0
+        self.reset_at = max(self.reset_at, timestamp)
+
+
+class AsyncGitHubClient:
+    """
+    GitHub API client with pooled keep-alive connections, rate-limit scheduling and concurrent requests.
+    Coroutines can be awaited in any event loop owned by the caller. Synchronous callers use run(), which executes
+    coroutines on a background event loop so that connections are kept alive between calls.
+    """
+
+    def __init__(self, max_concurrency=8, timeout=10, max_retry=3):
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_retry = max_retry
+        self._pool, self._limiters, self._state_loop = None, None, None
+        self._resources = dict()  # url family to the rate limit resource reported by GitHub
+        self._loop, self._pid = None, None
+        self._loop_lock = threading.Lock()  # so that concurrent first calls of run() start a single loop
+
+    def _ensure_state(self):
+        # connections and locks are bound to the event loop that created them
+        loop = asyncio.get_running_loop()
+        if self._pool is None or self._state_loop is not loop:
+            self._pool = ConnectionPool(self.max_concurrency)
+            self._limiters = dict()  # rate limit resource to its RateLimiter
+            self._state_loop = loop
+
+    def _limiter(self, resource: str):
+        limiter = self._limiters.get(resource, None)
+        if limiter is None:
+            limiter = self._limiters[resource] = RateLimiter()
+        return limiter
+
+    @property
+    def opened_connections(self):
+        return self._pool.opened if self._pool else 0
+
+    async def get(self, url: str, token='', headers=None):
+        """
+        Send a GET request, waiting for the rate limit, retrying on network errors and following redirects, e.g. of
+        renamed repositories
+        :param url: url to request
+        :param token: GitHub token
+        :param headers: extra headers
+        :return: a Response object, or None if all retries fail
+        """
+        self._ensure_state()
+        req_headers = {'User-Agent': user_agent, 'Accept-Encoding': 'identity'}
+        if token:
+            req_headers['Authorization'] = f'token {token}'
+        if headers:
+            req_headers.update(headers)
+
+        for _ in range(MAX_REDIRECTS):
+            resp = await self._get(url, req_headers)
+            if resp is None or resp.status_code not in REDIRECT_STATUS or 'location' not in resp.headers:
+                return resp
+            location = urljoin(url, resp.headers['location'])
+            if urlsplit(location).netloc != urlsplit(url).netloc:
+                req_headers.pop('Authorization', None)  # do not send the token to another host
+            url = location
+        return await self._get(url, req_headers)
+
+    async def _get(self, url: str, req_headers: dict):
+        """
+        Send a GET request without following redirects
+        """
+        family = rate_limit_family(url)
+        limiter = self._limiter(self._resources.get(family, family))
+        for attempt in range(self.max_retry + 1):
+            await limiter.acquire()
+            try:
+                resp = await self._pool.request(url, req_headers, self.timeout)
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+                logger.error('[Request Error] url: {}    - msg: {}'.format(url, e))
+                await asyncio.sleep(min(2 ** attempt, 30))
+                continue
+
+            resource = resp.headers.get('x-ratelimit-resource', None)
+            if resource:
+                # GitHub knows better which bucket the url belongs to
+                self._resources[family] = resource
+                limiter = self._limiter(resource)
+            limiter.update(resp.headers)
+            if resp.status_code in (403, 429):
+                retry_after = resp.headers.get('retry-after', None)
+                if retry_after is not None:
+                    limiter.block_until(time.time() + float(retry_after))
+                    continue
+                if resp.headers.get('x-ratelimit-remaining', None) == '0':
+                    limiter.block_until(float(resp.headers.get('x-ratelimit-reset', time.time())))
+                    continue
+            return resp
+        return None
+
+    async def get_many(self, urls, token=''):
+        """
+        :return: a list of Response objects (or None) in the order of urls
+        """
+        return await asyncio.gather(*(self.get(url, token) for url in urls))
+
+    def run(self, coro):
+        """
+        Run a coroutine on the background event loop of the client and wait for its result
+        """
+        with self._loop_lock:
+            if self._loop is None or self._pid != os.getpid():
+                # event loop threads do not survive fork
+                self._loop, self._pid = asyncio.new_event_loop(), os.getpid()
+                self._pool, self._limiters = None, None
+                threading.Thread(target=self._loop.run_forever, daemon=True).start()
+            loop = self._loop
+        return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+    def close(self):
+        with self._loop_lock:
+            if self._loop is not None and self._pid == os.getpid():
+                if self._pool is not None:
+                    self._loop.call_soon_threadsafe(self._pool.close)
+                self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop, self._pool, self._limiters = None, None, None
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_client():
+    """
+    :return: the client shared by online searches of the process
+    """
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = AsyncGitHubClient()
+        return _default_client
@@ -0,0 +1,64 @@
+import re
+
+# token kinds
+IDENT = 'ident'
+NUMBER = 'number'
+STRING = 'string'  # string literals and text blocks
+CHAR = 'char'
+COMMENT = 'comment'
+OP = 'op'  # operators and separators
+
+TOKEN_REGEX = re.compile(r'''
+    (?P<ws>\s+)
+  | (?P<comment>//[^\n]*|/\*(?:[^*]|\*(?!/))*(?:\*/)?)
+  | (?P<string>"""(?:\\[\s\S]|[^\\])*?(?:"""|\Z)|"(?:\\.|[^"\\\n])*"?)
+  | (?P<char>'(?:\\.|[^'\\\n])*'?)
+  | (?P<number>0[xX][\da-fA-F_]*(?:\.[\da-fA-F_]*)?(?:[pP][+-]?\d+)?[lLfFdD]?
+               |0[bB][01_]+[lL]?
+               |(?:\d[\d_]*\.?[\d_]*|\.\d[\d_]*)(?:[eE][+-]?\d[\d_]*)?[lLfFdD]?)
+  | (?P<ident>[^\W\d][\w$]*|\$[\w$]*)
+  | (?P<op>>>>=|<<=|>>=|>>>|->|::|\+\+|--|&&|\|\||[=!<>+\-*/&|^%]=|<<|>>|\.\.\.|\S)
+''', re.VERBOSE)
+
+
+def tokenize(content: str):
+    """
+    Split Java code into tokens in a single pass. Whitespace is skipped. Escapes in string and char literals are
+    handled. Unterminated string and char literals end at the end of the line, unterminated text blocks and block
+    comments at the end of the content.
+    :param content: code to split, e.g. the content of a statement
+    :return: a list of (kind, start offset, end offset) tuples
+    """
+    return [(m.lastgroup, m.start(), m.end()) for m in TOKEN_REGEX.finditer(content) if m.lastgroup != 'ws']
+
+
+def string_ranges(tokens):
+    """
+    :return: a list of offset ranges of string literals in the tokens
+    """
+    return [(start, end) for kind, start, end in tokens if kind == STRING]
+
+
+def strip_comments(content: str):
+    """
+    Remove comments from a line. An unterminated block comment is kept, since it starts a multi-line comment.
+    :param content: a line of code
+    :return: content without comments
+    """
+    if '//' not in content and '/*' not in content:
+        return content
+    parts, last = list(), 0
+    for kind, start, end in tokenize(content):
+        if kind != COMMENT:
+            continue
+        if content.startswith('//', start):
+            # the rest of the line, including the line break, is dropped
+            parts.append(content[last:start])
+            return ''.join(parts)
+        if content.endswith('*/', start + 2, end):
+            parts.append(content[last:start])
+            last = end
+    if not parts:
+        return content
+    parts.append(content[last:])
+    return ''.join(parts)
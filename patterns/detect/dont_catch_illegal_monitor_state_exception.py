@@ -3,7 +3,7 @@ import re
 from patterns.models.detectors import Detector, get_exact_lineno
 from patterns.models.bug_instance import BugInstance
 from patterns.models import priorities
-from utils import get_string_ranges, in_range
+from utils import in_range
 
 
 class DontCatchIllegalMonitorStateException(Detector):
@@ -11,6 +11,8 @@ class DontCatchIllegalMonitorStateException(Detector):
     匹配 catch (xxException e1, ..., xxException e2), 并分离出 Exception 类型
     TODO: java.lang.Exception　和　java.lang.Throwable 的检测
     """
+    keywords = ('catch', 'IllegalMonitorStateException')
+    best_priorities = {'IMSE_DONT_CATCH_IMSE': priorities.HIGH_PRIORITY}
 
     def __init__(self):
         # 匹配形如 "catch (IOException e)"
@@ -21,7 +23,7 @@ class DontCatchIllegalMonitorStateException(Detector):
         line_content = context.cur_line.content
         match = self.p_catch.search(line_content)
         if match:
-            string_range = get_string_ranges(line_content)
+            string_range = context.cur_line.string_ranges
             if in_range(match.start(0), string_range):
                 return
 
@@ -3,10 +3,14 @@ import regex
 from patterns.models.detectors import Detector, get_exact_lineno
 from patterns.models.bug_instance import BugInstance
 from patterns.models import priorities
-from utils import get_string_ranges, in_range
+from utils import in_range
 
 
 class DontUseEnumDetector(Detector):
+    keywords = (('assert', 'enum'),)
+    best_priorities = {'NM_FUTURE_KEYWORD_USED_AS_MEMBER_IDENTIFIER': priorities.MEDIUM_PRIORITY,
+                       'NM_FUTURE_KEYWORD_USED_AS_IDENTIFIER': priorities.MEDIUM_PRIORITY}
+
     def __init__(self):
         self.p_identifier = regex.compile(r'\b\w+\b(?:\s+|(\s*\.\s*)?)\b(enum|assert)\b\s*(?(1)[^\w$\s]|\()')
         self.p = regex.compile(r'\b(enum|assert)\b\s*[^\w$\s(!-]')
@@ -14,10 +18,7 @@ class DontUseEnumDetector(Detector):
 
     def match(self, context):
         line_content = context.cur_line.content
-        if not any(key in line_content for key in ('assert', 'enum')):
-            return
-
-        string_range = get_string_ranges(line_content)
+        string_range = context.cur_line.string_ranges
         its = self.p_identifier.finditer(line_content)
         for m in its:
             if not in_range(m.start(2), string_range):
@@ -3,10 +3,13 @@ import regex
 from patterns.models.detectors import Detector, get_exact_lineno
 from patterns.models.bug_instance import BugInstance
 from patterns.models import priorities
-from utils import log_message, get_string_ranges, in_range, str_to_float
+from utils import log_message, in_range, str_to_float
 
 
 class FinalizerOnExitDetector(Detector):
+    keywords = ('runFinalizersOnExit',)
+    best_priorities = {'DM_RUN_FINALIZERS_ON_EXIT': priorities.HIGH_PRIORITY}
+
     def __init__(self):
         self.pattern = regex.compile(r'\b(\w+)\s*\.\s*runFinalizersOnExit\s*\(')
         Detector.__init__(self)
@@ -15,7 +18,7 @@ class FinalizerOnExitDetector(Detector):
         line_content = context.cur_line.content
         m = self.pattern.search(line_content)
         if m:
-            string_ranges = get_string_ranges(line_content)
+            string_ranges = context.cur_line.string_ranges
             if in_range(m.start(0), string_ranges):
                 return
 
@@ -32,6 +35,9 @@ class FinalizerOnExitDetector(Detector):
 
 
 class RandomOnceDetector(Detector):
+    keywords = ('new', 'Random', 'next')
+    best_priorities = {'DMI_RANDOM_USED_ONLY_ONCE': priorities.HIGH_PRIORITY}
+
     def __init__(self):
         self.pattern = regex.compile(
             r'new\s+[\w.]*Random(?P<aux1>\((?:[^()]++|(?&aux1))*\))++\s*\.\s*next(?:Boolean|Bytes|Double|Float|Gaussian|Int|Long)\([^),]*\)')
@@ -40,7 +46,7 @@ class RandomOnceDetector(Detector):
     def match(self, context):
         line_content = context.cur_line.content
         its = self.pattern.finditer(line_content)
-        string_ranges = get_string_ranges(line_content)
+        string_ranges = context.cur_line.string_ranges
         for m in its:
             if in_range(m.start(0), string_ranges):
                 continue
@@ -55,6 +61,9 @@ class RandomOnceDetector(Detector):
 
 
 class RandomD2IDetector(Detector):
+    keywords = ('int', ('random', 'nextDouble', 'nextFloat'))
+    best_priorities = {'RV_01_TO_INT': priorities.HIGH_PRIORITY}
+
     def __init__(self):
         self.pattern = regex.compile(r'\(\s*int\s*\)\s*\b(\w+)\s*\.\s*(random|nextDouble|nextFloat)\s*\(\s*\)')
         Detector.__init__(self)
@@ -62,7 +71,7 @@ class RandomD2IDetector(Detector):
     def match(self, context):
         line_content = context.cur_line.content
         its = self.pattern.finditer(line_content)
-        string_ranges = get_string_ranges(line_content)
+        string_ranges = context.cur_line.string_ranges
         for m in its:
             if in_range(m.start(0), string_ranges):
                 continue
@@ -77,6 +86,9 @@ class RandomD2IDetector(Detector):
 
 
 class StringCtorDetector(Detector):
+    keywords = ('new', 'String')
+    best_priorities = {'DM_STRING_VOID_CTOR': priorities.MEDIUM_PRIORITY, 'DM_STRING_CTOR': priorities.MEDIUM_PRIORITY}
+
     def __init__(self):
         self.pattern = regex.compile(r'new\s+String\s*(?P<aux1>\(((?:[^()]++|(?&aux1))*)\))')
         Detector.__init__(self)
@@ -84,7 +96,7 @@ class StringCtorDetector(Detector):
     def match(self, context):
         line_content = context.cur_line.content
         its = self.pattern.finditer(line_content)
-        string_ranges = get_string_ranges(line_content)
+        string_ranges = context.cur_line.string_ranges
         for m in its:
             start_offset = m.start(0)
             if in_range(start_offset, string_ranges):
@@ -113,6 +125,9 @@ class StringCtorDetector(Detector):
 
 
 class InvalidMinMaxDetector(Detector):
+    keywords = ('Math', 'min', 'max')
+    best_priorities = {'DM_INVALID_MIN_MAX': priorities.HIGH_PRIORITY}
+
     def __init__(self):
         self.pattern = regex.compile(r'Math\s*\.\s*(min|max)\s*(?P<aux1>\(((?:[^()]++|(?&aux1))*)\))')
         self.whitespace = regex.compile(r'\s')
@@ -120,11 +135,8 @@ class InvalidMinMaxDetector(Detector):
 
     def match(self, context):
         line_content = context.cur_line.content
-        if not all(key in line_content for key in ('Math', 'min', 'max')):
-            return
-
         its = self.pattern.finditer(line_content)
-        string_ranges = get_string_ranges(line_content)
+        string_ranges = context.cur_line.string_ranges
         for m1 in its:
             start_offset = m1.start(0)
             if in_range(start_offset, string_ranges):
@@ -2,10 +2,13 @@ import regex
 from patterns.models.bug_instance import BugInstance
 from patterns.models.detectors import Detector, get_exact_lineno
 from patterns.models import priorities
-from utils import get_string_ranges, in_range
+from utils import in_range
 
 
 class FindBadCastDetector(Detector):
+    keywords = ('toArray',)
+    best_priorities = {'BC_IMPOSSIBLE_DOWNCAST_OF_TOARRAY': priorities.HIGH_PRIORITY}
+
     def __init__(self):
         self.pattern = regex.compile(
             r'\(\s*(\w+)\s*\[\s*\]\s*\)\s*((?:(?P<aux1>\((?:[^()]++|(?&aux1))*\))|[\w.$<>\s])+?)\s*\.\s*toArray\s*\(\s*\)')
@@ -13,11 +16,8 @@ class FindBadCastDetector(Detector):
 
     def match(self, context):
         line_content = context.cur_line.content
-        if 'toArray' not in line_content:
-            return
-
         its = self.pattern.finditer(line_content)
-        string_ranges = get_string_ranges(line_content)
+        string_ranges = context.cur_line.string_ranges
         for m in its:
             start_offset = m.start(0)
             if in_range(start_offset, string_ranges):
@@ -3,21 +3,22 @@ import re
 from patterns.models.bug_instance import BugInstance
 from patterns.models.detectors import Detector, get_exact_lineno
 from patterns.models.priorities import *
-from utils import get_string_ranges, in_range
+from utils import in_range
 
 
 class FindDeadLocalIncrementInReturn(Detector):
+    keywords = ('return', ('++', '--'))
+    best_priorities = {'DLS_DEAD_LOCAL_INCREMENT_IN_RETURN': IGNORE_PRIORITY}
+
     def __init__(self):
         self.pattern = re.compile(r'^\s*return\s+([\w$]+)(?:\+\+|--)\s*;')
         Detector.__init__(self)
 
     def match(self, context):
         line_content = context.cur_line.content
-        if all(key not in line_content for key in ('++', '--')):
-            return
         m = self.pattern.search(line_content)
         if m:
-            string_ranges = get_string_ranges(line_content)
+            string_ranges = context.cur_line.string_ranges
             if in_range(m.start(0), string_ranges):
                 return
 
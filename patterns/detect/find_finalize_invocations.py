@@ -3,10 +3,13 @@ import re
 from patterns.models.detectors import Detector, get_exact_lineno
 from patterns.models.bug_instance import BugInstance
 from patterns.models import priorities
-from utils import get_string_ranges, in_range
+from utils import in_range
 
 
 class ExplicitInvDetector(Detector):
+    keywords = ('finalize',)
+    best_priorities = {'FI_EXPLICIT_INVOCATION': priorities.HIGH_PRIORITY}
+
     def __init__(self):
         self.pattern = re.compile(r'(\b\w+)\s*\.\s*finalize\s*\(\s*\)\s*;')
         Detector.__init__(self)
@@ -14,7 +17,7 @@ class ExplicitInvDetector(Detector):
     def match(self, context):
         line_content = context.cur_line.content
         its = self.pattern.finditer(line_content)
-        string_ranges = get_string_ranges(line_content)
+        string_ranges = context.cur_line.string_ranges
         for m in its:
             if in_range(m.start(0), string_ranges):
                 continue
@@ -27,6 +30,9 @@ class ExplicitInvDetector(Detector):
 
 
 class PublicAccessDetector(Detector):
+    keywords = ('public', 'finalize')
+    best_priorities = {'FI_PUBLIC_SHOULD_BE_PROTECTED': priorities.MEDIUM_PRIORITY}
+
     def __init__(self):
         self.pattern = re.compile(r'public\s+void\s+finalize\s*\(\s*\)')
         Detector.__init__(self)
@@ -35,7 +41,7 @@ class PublicAccessDetector(Detector):
         line_content = context.cur_line.content
         m = self.pattern.search(line_content)
         if m:
-            string_ranges = get_string_ranges(line_content)
+            string_ranges = context.cur_line.string_ranges
             if in_range(m.start(0), string_ranges):
                 return
             line_no = get_exact_lineno(m.end(0), context.cur_line)[1]
@@ -3,10 +3,13 @@ import regex
 from patterns.models import priorities
 from patterns.models.bug_instance import BugInstance
 from patterns.models.detectors import Detector, get_exact_lineno
-from utils import convert_str_to_int, get_string_ranges, in_range
+from utils import convert_str_to_int, in_range
 
 
 class BadMonthDetector(Detector):
+    keywords = (('set', 'GregorianCalendar'),)
+    best_priorities = {'DMI_BAD_MONTH': priorities.HIGH_PRIORITY}
+
     def __init__(self):
         self.date = regex.compile(r'\b([\w$]+)\.setMonth\s*\((\d+)\s*\)')
         self.calendar = regex.compile(r'\b([\w$]+)\.set\s*\(([^,]+,\s*(\d+)\s*[,)])')
@@ -20,7 +23,7 @@ class BadMonthDetector(Detector):
         priority = priorities.MEDIUM_PRIORITY
 
         line_content = context.cur_line.content
-        string_ranges = get_string_ranges(line_content)
+        string_ranges = context.cur_line.string_ranges
         offset = None
         if 'setMonth' in line_content:
             m = self.date.search(line_content)
@@ -65,18 +68,18 @@ class BadMonthDetector(Detector):
 
                 
 class ShiftAddPriorityDetector(Detector):
+    keywords = ('<<',)
+    best_priorities = {'BSHIFT_WRONG_ADD_PRIORITY': priorities.MEDIUM_PRIORITY}
+
     def __init__(self):
         self.pattern = regex.compile(r'\b[\w$]+\s*<<\s*([\w$]+)\s*[+-]\s*[\w$]+')
         Detector.__init__(self)
 
     def match(self, context):
         line_content = context.cur_line.content
-        if '<<' not in line_content and '+' not in line_content:
-            return
-
         m = self.pattern.search(line_content)
         if m:
-            string_ranges = get_string_ranges(line_content)
+            string_ranges = context.cur_line.string_ranges
             if in_range(m.start(0), string_ranges):
                 return
             priority = priorities.LOW_PRIORITY
@@ -98,6 +101,9 @@ class ShiftAddPriorityDetector(Detector):
 
 
 class OverwrittenIncrementDetector(Detector):
+    keywords = ('=', ('++', '--'))
+    best_priorities = {'DLS_OVERWRITTEN_INCREMENT': priorities.HIGH_PRIORITY}
+
     def __init__(self):
         # 提取'='左右操作数
         self.pattern = regex.compile(
@@ -107,22 +113,21 @@ class OverwrittenIncrementDetector(Detector):
 
     def match(self, context):
         line_content = context.cur_line.content
-        if '=' in line_content and any(op in line_content for op in ('++', '--')):
-            its = self.pattern.finditer(line_content)
-            string_ranges = get_string_ranges(line_content)
-            for m in its:
-                if in_range(m.start(0), string_ranges):
-                    continue
-                op_1 = m.groups()[0]
-                op_2 = m.groups()[1]
-
-                # 两种可能的匹配 'a++', 'a--'
-                pattern_inc = regex.compile(r'\b{}\s*\+\+|\b{}\s*--'.format(op_1, op_1))
-
-                if pattern_inc.search(op_2):
-                    line_no = get_exact_lineno(m.end(0), context.cur_line)[1]
-                    self.bug_accumulator.append(
-                        BugInstance('DLS_OVERWRITTEN_INCREMENT', priorities.HIGH_PRIORITY, context.cur_patch.name,
-                                    line_no, "DLS: Overwritten increment", sha=context.cur_patch.sha, line_content=context.cur_line.content)
-                    )
-                    break
+        its = self.pattern.finditer(line_content)
+        string_ranges = context.cur_line.string_ranges
+        for m in its:
+            if in_range(m.start(0), string_ranges):
+                continue
+            op_1 = m.groups()[0]
+            op_2 = m.groups()[1]
+
+            # 两种可能的匹配 'a++', 'a--'
+            pattern_inc = regex.compile(r'\b{}\s*\+\+|\b{}\s*--'.format(op_1, op_1))
+
+            if pattern_inc.search(op_2):
+                line_no = get_exact_lineno(m.end(0), context.cur_line)[1]
+                self.bug_accumulator.append(
+                    BugInstance('DLS_OVERWRITTEN_INCREMENT', priorities.HIGH_PRIORITY, context.cur_patch.name,
+                                line_no, "DLS: Overwritten increment", sha=context.cur_patch.sha, line_content=context.cur_line.content)
+                )
+                break
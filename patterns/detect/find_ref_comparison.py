@@ -3,7 +3,7 @@ import regex
 from patterns.models.detectors import Detector, get_exact_lineno
 from patterns.models.bug_instance import BugInstance
 from patterns.models import priorities
-from utils import get_string_ranges, in_range
+from utils import in_range
 
 
 def is_str_with_quotes(s: str):
@@ -14,6 +14,13 @@ def is_str_with_quotes(s: str):
 
 
 class EqualityDetector(Detector):
+    best_priorities = {'RC_REF_COMPARISON_BAD_PRACTICE_BOOLEAN': priorities.MEDIUM_PRIORITY,
+                       'ES_COMPARING_STRINGS_WITH_EQ': priorities.MEDIUM_PRIORITY}
+    # Leading [\w."] may cause to catastrophic backtracking,
+    # and it is a little complicate to rewrite regex with word boundary `\b`
+    # therefore, the keywords are required to speed up.
+    keywords = (('==', '!='),)
+
     def __init__(self):
         self.p = regex.compile(
             r'((?:(?P<aux1>\((?:[^()]++|(?&aux1))*\))|[\w.$"])++)\s*[!=]=\s*((?:(?&aux1)|[\w.$"])+)')
@@ -22,14 +29,8 @@ class EqualityDetector(Detector):
 
     def match(self, context):
         line_content = context.cur_line.content
-        # Leading [\w."] may cause to catastrophic backtracking,
-        # and it is a little complicate to rewrite regex with word boundary `\b`
-        # therefore, use the following condition to speed up.
-        if not any(op in line_content for op in ['==', '!=']):
-            return
-
         its = self.p.finditer(line_content)
-        string_ranges = get_string_ranges(line_content)
+        string_ranges = context.cur_line.string_ranges
         for m in its:
             if in_range(m.end(1), string_ranges):  # near '==' or '!=', since the operators can be a string
                 continue
@@ -63,6 +64,9 @@ class EqualityDetector(Detector):
 
 
 class CallToNullDetector(Detector):
+    keywords = ('equals', 'null')
+    best_priorities = {'EC_NULL_ARG': priorities.MEDIUM_PRIORITY}
+
     def __init__(self):
         self.p = regex.compile(
             r'\.equals\s*\(\s*null\s*\)')
@@ -71,7 +75,7 @@ class CallToNullDetector(Detector):
     def match(self, context):
         line_content = context.cur_line.content
         its = self.p.finditer(line_content)
-        string_ranges = get_string_ranges(line_content)
+        string_ranges = context.cur_line.string_ranges
         for m in its:
             if in_range(m.start(0), string_ranges):
                 continue
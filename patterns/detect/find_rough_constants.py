@@ -1,7 +1,7 @@
 from patterns.models import priorities
 from patterns.models.detectors import Detector, get_exact_lineno
 from patterns.models.bug_instance import BugInstance
-from utils import get_string_ranges, in_range
+from lexer import NUMBER
 import re
 
 import math
@@ -54,16 +54,23 @@ def check_const(const_val: float):
 
 
 class FindRoughConstantsDetector(Detector):
+    keywords = ('.',)
+    best_priorities = {'CNT_ROUGH_CONSTANT_VALUE': priorities.HIGH_PRIORITY}
+
     def __init__(self):
         self.regexp = re.compile(r'(\d*\.\d+)')
         Detector.__init__(self)
 
     def match(self, context):
         line_content = context.cur_line.content
-        its = self.regexp.finditer(line_content)
-        string_ranges = get_string_ranges(line_content)
-        for m in its:
-            if in_range(m.start(0), string_ranges):
+        if not self.regexp.search(line_content):
+            return
+        # only number literals, not digits in strings, chars or block comments
+        for kind, start, end in context.cur_line.tokens:
+            if kind != NUMBER:
+                continue
+            m = self.regexp.search(line_content, start, end)
+            if not m:
                 continue
             float_const = float(m.group(0))
             p, bad_const = check_const(float_const)
@@ -77,6 +84,8 @@ class FindRoughConstantsDetector(Detector):
 
 
 class RoughConstantValueBugInstance(BugInstance):
+    __slots__ = ('constant', 'replacement')
+
     def gen_description(self, constant: float, bad_constant: BadConstant):
         self.constant = constant
         self.replacement = bad_constant.replacement
@@ -3,10 +3,13 @@ import regex
 from patterns.models.bug_instance import BugInstance
 from patterns.models.detectors import Detector, get_exact_lineno
 import patterns.models.priorities as Priorities
-from utils import get_generic_type_ranges, get_string_ranges, in_range
+from utils import in_range
 
 
 class CheckForSelfComputation(Detector):
+    keywords = (('&', '|', '^', '-'),)
+    best_priorities = {'SA_SELF_COMPUTATION': Priorities.MEDIUM_PRIORITY}
+
     def __init__(self):
         self.pattern = regex.compile(
             r'(\b\w(?:[\w.]|(?P<aux1>\((?:[^()]++|(?&aux1))*\)))*)\s*([|^&-])\s*(\w(?:[\w.]|(?&aux1))*)')
@@ -28,10 +31,7 @@ class CheckForSelfComputation(Detector):
 
     def match(self, context):
         line_content = context.cur_line.content
-        if all(op not in line_content for op in ('&', '|', '^', '-')):
-            return
-
-        string_ranges = get_string_ranges(line_content)
+        string_ranges = context.cur_line.string_ranges
         its = self.pattern.finditer(line_content)
         for m in its:
             g = m.groups()
@@ -73,6 +73,9 @@ class CheckForSelfComputation(Detector):
 
 
 class CheckForSelfComparison(Detector):
+    keywords = (('>', '<', '==', '!=', 'equals', 'compareTo', 'endsWith', 'startsWith', 'contains'),)
+    best_priorities = {'SA_SELF_COMPARISON': Priorities.MEDIUM_PRIORITY}
+
     def __init__(self):
         self.pattern_1 = regex.compile(
             r'(\b\w[\w.]*(?P<aux1>\((?:[^()]++|(?&aux1))*\))*)\s*(==|!=|>=|<=|>|<)\s*([\w.]+(?&aux1)*)')
@@ -82,12 +85,12 @@ class CheckForSelfComparison(Detector):
 
     def match(self, context):
         line_content = context.cur_line.content
-        string_ranges = get_string_ranges(line_content)
+        string_ranges = context.cur_line.string_ranges
 
         hit = False
         match_end = None
         if any(op in line_content for op in ('>', '<', '>=', '<=', '==', '!=')):
-            generic_type_ranges = get_generic_type_ranges(line_content)
+            generic_type_ranges = context.cur_line.generic_type_ranges
             its = self.pattern_1.finditer(line_content)
             for m in its:
                 op_offset = m.start(3)  # the start offset of relation_op
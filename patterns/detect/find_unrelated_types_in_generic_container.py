@@ -3,10 +3,15 @@ import regex
 from patterns.models.detectors import Detector, get_exact_lineno
 from patterns.models.bug_instance import BugInstance
 from patterns.models import priorities
-from utils import get_string_ranges, in_range
+from utils import in_range
 
 
 class SuspiciousCollectionMethodDetector(Detector):
+    keywords = (('remove', 'contains', 'retain'),)
+    best_priorities = {'DMI_USING_REMOVEALL_TO_CLEAR_COLLECTION': priorities.MEDIUM_PRIORITY,
+                       'DMI_VACUOUS_SELF_COLLECTION_CALL': priorities.MEDIUM_PRIORITY,
+                       'DMI_COLLECTIONS_SHOULD_NOT_CONTAIN_THEMSELVES': priorities.HIGH_PRIORITY}
+
     def __init__(self):
         self.pattern = regex.compile(
             r'(\b\w[\w.]*(?P<aux1>\((?:[^()]++|(?&aux1))*\))*+)\s*\.\s*((?:remove|contains|retain)(?:All)?)\s*\(\s*([\w.]+(?&aux1)*)\s*\)')
@@ -14,11 +19,8 @@ class SuspiciousCollectionMethodDetector(Detector):
 
     def match(self, context):
         line_content = context.cur_line.content
-        if not any(method in line_content for method in ['remove', 'contains', 'retain']):
-            return
-
         its = self.pattern.finditer(line_content)
-        string_ranges = get_string_ranges(line_content)
+        string_ranges = context.cur_line.string_ranges
         for m in its:
             if in_range(m.start(0), string_ranges):
                 continue
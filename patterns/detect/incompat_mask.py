@@ -1,12 +1,17 @@
 from patterns.models.detectors import Detector, get_exact_lineno
 from patterns.models.bug_instance import BugInstance
 from patterns.models import priorities
-from utils import convert_str_to_int, get_string_ranges, in_range
+from utils import convert_str_to_int, in_range
 
 import regex
 
 
 class IncompatMaskDetector(Detector):
+    keywords = (('&', '|'), ('>', '<', '=', '!'))
+    best_priorities = {'BIT_SIGNED_CHECK_HIGH_BIT': priorities.HIGH_PRIORITY,
+                       'BIT_SIGNED_CHECK': priorities.MEDIUM_PRIORITY, 'BIT_IOR': priorities.HIGH_PRIORITY,
+                       'BIT_AND': priorities.HIGH_PRIORITY, 'BIT_AND_ZZ': priorities.HIGH_PRIORITY}
+
     def __init__(self):
         self.regexpSign = regex.compile(
             r'\(\s*([~-]?(?:(?P<aux1>\((?:[^()]++|(?&aux1))*\))|[\w.-])++)\s*([&|])\s*([~-]?(?:(?&aux1)|[\w.])++)\s*\)\s*([><=!]+)\s*([0-9a-zA-Z]+)')
@@ -14,12 +19,8 @@ class IncompatMaskDetector(Detector):
 
     def match(self, context):
         line_content = context.cur_line.content
-        if not any(bitop in line_content for bitop in ('&', '|')) and \
-                not any(op in line_content for op in ('>', '<', '>=', '<=', '==', '!=')):
-            return
-
         its = self.regexpSign.finditer(line_content)
-        string_ranges = get_string_ranges(line_content)
+        string_ranges = context.cur_line.string_ranges
         for m in its:
             if in_range(m.start(0), string_ranges):
                 continue
@@ -3,10 +3,13 @@ import regex
 from patterns.models.detectors import Detector, get_exact_lineno
 from patterns.models.bug_instance import BugInstance
 from patterns.models import priorities
-from utils import get_string_ranges, in_range
+from utils import in_range
 
 
 class CollectionAddItselfDetector(Detector):
+    keywords = ('add',)
+    best_priorities = {'IL_CONTAINER_ADDED_TO_ITSELF': priorities.HIGH_PRIORITY}
+
     def __init__(self):
         self.pattern = regex.compile(
             r'(\b\w[\w.]*(?P<aux1>\((?:[^()]++|(?&aux1))*\))*+)\s*\.\s*add\s*\(\s*([\w.]+(?&aux1)*)\s*\)')
@@ -14,10 +17,8 @@ class CollectionAddItselfDetector(Detector):
 
     def match(self, context):
         line_content = context.cur_line.content
-        if "add" not in line_content:
-            return
         its = self.pattern.finditer(line_content)
-        string_ranges = get_string_ranges(line_content)
+        string_ranges = context.cur_line.string_ranges
         for m in its:
             if in_range(m.start(0), string_ranges):
                 continue
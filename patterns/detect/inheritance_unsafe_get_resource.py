@@ -1,33 +1,29 @@
-import cachetools
 import regex
-from cachetools import cached, LRUCache
 
 from patterns.models import priorities
 from patterns.models.bug_instance import BugInstance
-from patterns.models.detectors import Detector, online_search, get_exact_lineno
-from utils import get_string_ranges, in_range
-
-_cache = LRUCache(maxsize=500)
-
-GENERIC_REGEX = regex.compile(r'(?P<gen><(?:[^<>]++|(?&gen))*>)')
-CLASS_EXTENDS_REGEX = regex.compile(r'class\s+([\w$]+)\s*(?P<gen><(?:[^<>]++|(?&gen))*>)?\s+extends\s+([\w$.]+)')
-INTERFACE_EXTENDS_REGEX = regex.compile(r'interface\s+([\w$]+)\s*(?P<gen><(?:[^<>]++|(?&gen))*>)?\s+extends\s+([^{]+)')
+from patterns.models.detectors import Detector, online_search, online_search_many, get_exact_lineno
+from utils import in_range
 
 
 class GetResourceDetector(Detector):
+    keywords = ('getClass', 'getResource')
+    depends_on_patch = True  # the class name comes from the file name, subclasses are searched in the patch set
+    best_priorities = {'UI_INHERITANCE_UNSAFE_GETRESOURCE': priorities.MEDIUM_PRIORITY}
+
     def __init__(self):
         self.pattern = regex.compile(r'(?:(\b\w+)\.)?getClass\(\s*\)\.getResource(?:AsStream)?\(')
         Detector.__init__(self)
 
-        self.patch_set, self.extends_dict = None, dict()  # If patch_set is updated, then update extends_dict
+        self.patch_set_facts = None  # If the patch set is updated, then search it again
+        self.facts_version = 0  # version of patch_set_facts the priorities were decided with
+        self.online_results = dict()  # simple name to response json of online search prefetched for the patch set
+        self.decided_priorities = dict()  # simple name to priority decided for the patch set
 
     def match(self, context):
         line_content = context.cur_line.content
-        if not all(method in line_content for method in ['getClass', 'getResource']):
-            return
-
         its = self.pattern.finditer(line_content)
-        string_ranges = get_string_ranges(line_content)
+        string_ranges = context.cur_line.string_ranges
         for m in its:
             if in_range(m.start(0), string_ranges):
                 continue
@@ -35,7 +31,10 @@ class GetResourceDetector(Detector):
             obj_name = m.groups()[0]
             if not obj_name or obj_name == 'this':
                 simple_name = context.cur_patch.name.rstrip('.java').rsplit('/', 1)[-1]  # default class name is the filename
-                priority = self.decide_priority(simple_name, context)
+                self._update_patch_set(context)  # before looking up cached priorities of the previous patch set
+                priority = self.decided_priorities.get(simple_name, None)
+                if priority is None:
+                    priority = self.decided_priorities[simple_name] = self.decide_priority(simple_name, context)
 
                 if priority is None:
                     return
@@ -48,32 +47,31 @@ class GetResourceDetector(Detector):
                 )
                 return
 
-    @cached(cache=_cache, key=lambda self, simple_name, context: cachetools.keys.hashkey(simple_name))
     def decide_priority(self, simple_name, context):
         """
-        Decide the priority according to search results of local search or online search
+        Decide the priority according to search results of local search, index search or online search
         :param simple_name: simple name of class
         :param context: context object to analysis
         :return: MEDIUM_PRIORITY if extended, else IGNORE_PRIORITY
         """
-        # check if patch_set is updated
-        if context.patch_set != self.patch_set:
-            self.patch_set = context.patch_set
-            self._init_extends_dict()
-            _cache.clear()
-
         # local search
         if context.local_search():
-            for patch_name, extended_name_list in self.extends_dict.items():
+            for patch_name, extended_name_list in context.patch_set_facts.extends_dict.items():
                 if simple_name in extended_name_list:
                     return priorities.MEDIUM_PRIORITY
+        # index search
+        class_index = context.index_search()
+        if class_index is not None:
+            return priorities.MEDIUM_PRIORITY if class_index.is_extended(simple_name) else priorities.LOW_PRIORITY
         # online search
         if context.online_search():
             repo_name, token = context.get_online_search_info()
             if context:
-                query = f'https://api.github.com/search/code?q=%22extends+{simple_name}%22+in:file' \
-                        f'+language:Java+repo:{repo_name}'
-                resp_json = online_search(query, token, search_parent=True, repo_name=repo_name)
+                if simple_name in self.online_results:
+                    resp_json = self.online_results[simple_name]
+                else:
+                    resp_json = online_search(_search_query(simple_name, repo_name), token, search_parent=True,
+                                              repo_name=repo_name, cache=context.get_search_cache())
 
                 if resp_json:
                     if 'total_count' in resp_json:
@@ -87,31 +85,57 @@ class GetResourceDetector(Detector):
         # return priorities.IGNORE_PRIORITY
         return priorities.LOW_PRIORITY
 
-    def _init_extends_dict(self, ):
-        self.extends_dict.clear()
-        if not self.patch_set:
+    def export_patch_set_state(self, context):
+        self._update_patch_set(context)
+        return self.online_results
+
+    def import_patch_set_state(self, context, state):
+        self.patch_set_facts = context.patch_set_facts
+        self.facts_version = context.patch_set_facts.version
+        self.online_results = state
+        self.decided_priorities = dict()
+
+    def _update_patch_set(self, context):
+        # check if patch_set is updated
+        if context.patch_set_facts is not self.patch_set_facts:
+            self.patch_set_facts = context.patch_set_facts
+            self.facts_version = context.patch_set_facts.version
+            self.decided_priorities = dict()
+            self._prefetch_online_results(context)
+        elif context.patch_set_facts.version != self.facts_version:
+            # hunks were added to the patch set while it is streamed, e.g. a subclass declared in a later hunk
+            self.facts_version = context.patch_set_facts.version
+            self.decided_priorities = dict()
+
+    def _prefetch_online_results(self, context):
+        """
+        Send online searches for all classes that may be reported in the patch set concurrently
+        """
+        self.online_results = dict()
+        if not context.patch_set or not context.online_search() or context.index_search() is not None:
             return
-        for patch in self.patch_set:
-            extended_names_in_patch = set()
-            for hunk in patch:
-                for line in hunk:
-                    if line.prefix == '-':
-                        continue
-
-                    if 'extends' in line.content:
-                        if 'class' in line.content:
-                            m = CLASS_EXTENDS_REGEX.search(line.content.strip())
-                        elif 'interface' in line.content:
-                            m = INTERFACE_EXTENDS_REGEX.search(line.content.strip())
-                        else:
-                            continue
 
-                        if m:
-                            g = m.groups()
-                            extended_str = GENERIC_REGEX.sub('', g[-1])  # remove <...>
-                            extended_names_in_line = [name.rsplit('.', 1)[-1].strip() for name in
-                                                      extended_str.split(',')]
-                            extended_names_in_patch.update(extended_names_in_line)
+        extended_names = set()
+        if context.local_search():
+            for extended_name_list in context.patch_set_facts.extends_dict.values():
+                extended_names.update(extended_name_list)
+
+        simple_names = list()
+        for patch in context.patch_set:
+            simple_name = patch.name.rstrip('.java').rsplit('/', 1)[-1]
+            if simple_name in extended_names or simple_name in simple_names:
+                continue
+            if any(line.prefix != '-' and all(key in line.content for key in self.keywords)
+                   for hunk in patch for line in hunk):
+                simple_names.append(simple_name)
+
+        if simple_names:
+            repo_name, token = context.get_online_search_info()
+            queries = [_search_query(simple_name, repo_name) for simple_name in simple_names]
+            results = online_search_many(queries, token, search_parent=True, repo_name=repo_name,
+                                         cache=context.get_search_cache())
+            self.online_results = dict(zip(simple_names, results))
+
 
-            if extended_names_in_patch:
-                self.extends_dict[patch.name] = extended_names_in_patch
+def _search_query(simple_name: str, repo_name: str):
+    return f'https://api.github.com/search/code?q=%22extends+{simple_name}%22+in:file+language:Java+repo:{repo_name}'
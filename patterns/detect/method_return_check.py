@@ -3,10 +3,13 @@ import regex
 from patterns.models.detectors import Detector, get_exact_lineno
 from patterns.models.bug_instance import BugInstance
 from patterns.models import priorities
-from utils import get_string_ranges, in_range
+from utils import in_range
 
 
 class NotThrowDetector(Detector):
+    keywords = ('new', ('Exception', 'Error'))
+    best_priorities = {'RV_EXCEPTION_NOT_THROWN': priorities.MEDIUM_PRIORITY}
+
     def __init__(self):
         super().__init__()
         self.pattern = regex.compile(r'^\s*new\s+(\w+?)(?:Exception|Error)\s*(?P<aux1>\((?:[^()]++|(?&aux1))*\))\s*;')
@@ -15,7 +18,7 @@ class NotThrowDetector(Detector):
         line_content = context.cur_line.content
         m = self.pattern.search(line_content)
         if m:
-            string_ranges = get_string_ranges(line_content)
+            string_ranges = context.cur_line.string_ranges
             if in_range(m.start(0), string_ranges):
                 return
             line_no = get_exact_lineno(m.end(0), context.cur_line)[1]
@@ -3,15 +3,17 @@ import regex
 from patterns.models.detectors import Detector, get_exact_lineno
 from patterns.models.bug_instance import BugInstance
 from patterns.models.priorities import *
-from utils import get_string_ranges, in_range
+from utils import in_range
 
 GENERIC_REGEX = regex.compile(r'(?P<gen><(?:[^<>]++|(?&gen))*>)')
 CLASS_EXTENDS_REGEX = regex.compile(r'\bclass\s+([\w$]+)\s*(?P<gen><(?:[^<>]++|(?&gen))*>)?\s+extends\s+([\w$.]+)')
 INTERFACE_EXTENDS_REGEX = regex.compile(r'\binterface\s+([\w$]+)\s*(?P<gen><(?:[^<>]++|(?&gen))*>)?\s+extends\s+([^{]+)')
-ENUM_REGEX = regex.compile(r'\benum\s+\w+\s*(?:\b(?:extends|implements)\s+[\w<>,\s]+)*\s*{')
 
 
 class SimpleSuperclassNameDetector(Detector):
+    keywords = ('class', 'extends')
+    best_priorities = {'NM_SAME_SIMPLE_NAME_AS_SUPERCLASS': HIGH_PRIORITY}
+
     def __init__(self):
         # class can extend only one superclass, but implements multiple interfaces
         # extends clause must occur before implements clause
@@ -20,12 +22,9 @@ class SimpleSuperclassNameDetector(Detector):
 
     def match(self, context):
         line_content = context.cur_line.content
-        if not all(key in line_content for key in ('class', 'extends')):
-            return
-
         m = self.pattern.search(line_content)
         if m:
-            string_ranges = get_string_ranges(line_content)
+            string_ranges = context.cur_line.string_ranges
             if in_range(m.start(0), string_ranges):
                 return
             g = m.groups()
@@ -44,6 +43,9 @@ class SimpleSuperclassNameDetector(Detector):
 
 
 class SimpleInterfaceNameDetector(Detector):
+    keywords = (('class', 'interface'), ('implements', 'extends'))
+    best_priorities = {'NM_SAME_SIMPLE_NAME_AS_INTERFACE': MEDIUM_PRIORITY}
+
     def __init__(self):
         # Check interfaces implemented by a class
         self.pattern1 = regex.compile(
@@ -64,7 +66,7 @@ class SimpleInterfaceNameDetector(Detector):
             return
 
         if m:
-            string_ranges = get_string_ranges(line_content)
+            string_ranges = context.cur_line.string_ranges
             if in_range(m.start(0), string_ranges):
                 return
 
@@ -85,6 +87,9 @@ class SimpleInterfaceNameDetector(Detector):
 
 
 class HashCodeNameDetector(Detector):
+    keywords = ('int', 'hashcode')
+    best_priorities = {'NM_LCASE_HASHCODE': HIGH_PRIORITY}
+
     def __init__(self):
         # Check hashcode method exists
         self.pattern = regex.compile(r'\bint\s+hashcode\s*\(\s*\)')
@@ -92,12 +97,12 @@ class HashCodeNameDetector(Detector):
 
     def match(self, context):
         line_content = context.cur_line.content
-        if line_content.strip().startswith('private') or any(key not in line_content for key in ('int', 'hashcode')):
+        if line_content.strip().startswith('private'):
             return
 
         m = self.pattern.search(line_content)
         if m:
-            string_ranges = get_string_ranges(line_content)
+            string_ranges = context.cur_line.string_ranges
             if in_range(m.start(0), string_ranges):
                 return
             line_no = get_exact_lineno(m.end(0), context.cur_line)[1]
@@ -107,6 +112,9 @@ class HashCodeNameDetector(Detector):
 
 
 class ToStringNameDetector(Detector):
+    keywords = ('String', 'tostring')
+    best_priorities = {'NM_LCASE_TOSTRING': HIGH_PRIORITY}
+
     def __init__(self):
         # Check hashcode method exists
         self.pattern = regex.compile(r'\bString\s+tostring\s*\(\s*\)')
@@ -114,11 +122,11 @@ class ToStringNameDetector(Detector):
 
     def match(self, context):
         line_content = context.cur_line.content
-        if line_content.strip().startswith('private') or any(key not in line_content for key in ('String', 'tostring')):
+        if line_content.strip().startswith('private'):
             return
         m = self.pattern.search(line_content)
         if m:
-            string_ranges = get_string_ranges(line_content)
+            string_ranges = context.cur_line.string_ranges
             if in_range(m.start(0), string_ranges):
                 return
             line_no = get_exact_lineno(m.end(0), context.cur_line)[1]
@@ -128,6 +136,9 @@ class ToStringNameDetector(Detector):
 
 
 class EqualNameDetector(Detector):
+    keywords = ('boolean', 'equal')
+    best_priorities = {'NM_BAD_EQUAL': HIGH_PRIORITY}
+
     def __init__(self):
         # Check hashcode method exists
         self.pattern = regex.compile(r'\bboolean\s+equal\s*\(\s*Object\s+[\w$]+\s*\)')
@@ -135,12 +146,11 @@ class EqualNameDetector(Detector):
 
     def match(self, context):
         line_content = context.cur_line.content
-        if line_content.strip().startswith('private') or 'equals' in line_content \
-                or any(key not in line_content for key in ('boolean', 'equal')):
+        if line_content.strip().startswith('private') or 'equals' in line_content:
             return
         m = self.pattern.search(line_content)
         if m:
-            string_ranges = get_string_ranges(line_content)
+            string_ranges = context.cur_line.string_ranges
             if in_range(m.start(0), string_ranges):
                 return
             line_no = get_exact_lineno(m.end(0), context.cur_line)[1]
@@ -150,6 +160,9 @@ class EqualNameDetector(Detector):
 
 
 class ClassNameConventionDetector(Detector):
+    keywords = ('class ', '{')
+    best_priorities = {'NM_CLASS_NAMING_CONVENTION': MEDIUM_PRIORITY}
+
     def __init__(self):
         # Match class name
         self.cn_pattern = regex.compile(r'class\s+([a-z][\w$]+)[^{]*{')
@@ -157,98 +170,88 @@ class ClassNameConventionDetector(Detector):
 
     def match(self, context):
         line_content = context.cur_line.content
-        if 'class ' in line_content and '{' in line_content:
-            its = self.cn_pattern.finditer(line_content)
-            string_ranges = get_string_ranges(line_content)
-            for m in its:
-                if in_range(m.start(0), string_ranges):
-                    continue
-
-                class_name = m.groups()[0]
-                if "Proto$" in class_name:
-                    return
-                # reference from https://github.com/spotbugs/spotbugs/blob/a6f9acb2932b54f5b70ea8bc206afb552321a222
-                # /spotbugs/src/main/java/edu/umd/cs/findbugs/detect/Naming.java#L389
-                if '_' not in class_name:
-                    priority = LOW_PRIORITY
-                    if any(access in line_content for access in ('public', 'protected')):
-                        priority = MEDIUM_PRIORITY
+        if self.priority_bound < LOW_PRIORITY and 'public' not in line_content and 'protected' not in line_content:
+            return  # only public or protected classes are reported above LOW_PRIORITY
+        its = self.cn_pattern.finditer(line_content)
+        string_ranges = context.cur_line.string_ranges
+        for m in its:
+            if in_range(m.start(0), string_ranges):
+                continue
 
-                    line_no = get_exact_lineno(m.end(0), context.cur_line)[1]
-                    self.bug_accumulator.append(
-                        BugInstance('NM_CLASS_NAMING_CONVENTION', priority, context.cur_patch.name, line_no,
-                                    'Nm: Class names should start with an upper case letter',
-                                    sha=context.cur_patch.sha, line_content=context.cur_line.content))
+            class_name = m.groups()[0]
+            if "Proto$" in class_name:
+                return
+            # reference from https://github.com/spotbugs/spotbugs/blob/a6f9acb2932b54f5b70ea8bc206afb552321a222
+            # /spotbugs/src/main/java/edu/umd/cs/findbugs/detect/Naming.java#L389
+            if '_' not in class_name:
+                priority = LOW_PRIORITY
+                if any(access in line_content for access in ('public', 'protected')):
+                    priority = MEDIUM_PRIORITY
+
+                line_no = get_exact_lineno(m.end(0), context.cur_line)[1]
+                self.bug_accumulator.append(
+                    BugInstance('NM_CLASS_NAMING_CONVENTION', priority, context.cur_patch.name, line_no,
+                                'Nm: Class names should start with an upper case letter',
+                                sha=context.cur_patch.sha, line_content=context.cur_line.content))
 
 
 class MethodNameConventionDetector(Detector):
+    keywords = ('(',)
+    depends_on_patch = True  # enum definitions are searched in the patch
+    best_priorities = {'NM_METHOD_NAMING_CONVENTION': MEDIUM_PRIORITY}
+
     def __init__(self):
         # Extract the method name
         self.mn_pattern = regex.compile(
             r'@?(\b\w+\s+)?(?:\b\w+\s*\.\s*)*(\b\w+)\s*\(\s*((?:(?!new)\w)+(?P<gen><(?:[^<>]++|(?&gen))*>)?\s+\w+)?')
-        self.patch, self.is_enum = None, False
         Detector.__init__(self)
 
     def match(self, context):
         line_content = context.cur_line.content
-        if '(' in line_content:
-            its = self.mn_pattern.finditer(line_content)
-            string_ranges = get_string_ranges(line_content)
-            for m in its:
-                # skip annotations
-                if line_content[m.start(0)] == '@':
-                    continue
-                if in_range(m.start(0), string_ranges):
-                    continue
-                g = m.groups()
-                pre_token = g[0].strip() if g[0] else g[0]
-                method_name = g[1]
-                args_def = g[2]
-
-                # skip statements like "new Object(...)"
-                if pre_token == 'new':
-                    continue
-                # skip constructor definitions, like "public Object(int i)"
-                if pre_token in ('public', 'private', 'protected', 'static'):
-                    continue
-                # skip constructor definitions without access modifier, like "Object (int i)", "Object() {"
-                is_def = args_def or line_content.rstrip().endswith('{') or line_content.rstrip().endswith('}')
-                if not pre_token and is_def:
-                    continue
-
-                if len(method_name) >= 2 and method_name[0].isalpha() and not method_name[0].islower() and \
-                        method_name[1].isalpha() and method_name[1].islower() and '_' not in method_name:
-                    if not is_def:
-                        # i.e. obj.MethodName(param), or MethodName(param)
-                        self._local_search(context)
-                        if self.is_enum:  # skip elements defined in enum
-                            continue
-                        else:
-                            priority = IGNORE_PRIORITY
+        if self.priority_bound < LOW_PRIORITY and 'public' not in line_content and 'protected' not in line_content:
+            return  # only public or protected methods are reported above LOW_PRIORITY
+        its = self.mn_pattern.finditer(line_content)
+        string_ranges = context.cur_line.string_ranges
+        for m in its:
+            # skip annotations
+            if line_content[m.start(0)] == '@':
+                continue
+            if in_range(m.start(0), string_ranges):
+                continue
+            g = m.groups()
+            pre_token = g[0].strip() if g[0] else g[0]
+            method_name = g[1]
+            args_def = g[2]
+
+            # skip statements like "new Object(...)"
+            if pre_token == 'new':
+                continue
+            # skip constructor definitions, like "public Object(int i)"
+            if pre_token in ('public', 'private', 'protected', 'static'):
+                continue
+            # skip constructor definitions without access modifier, like "Object (int i)", "Object() {"
+            is_def = args_def or line_content.rstrip().endswith('{') or line_content.rstrip().endswith('}')
+            if not pre_token and is_def:
+                continue
+
+            if len(method_name) >= 2 and method_name[0].isalpha() and not method_name[0].islower() and \
+                    method_name[1].isalpha() and method_name[1].islower() and '_' not in method_name:
+                if not is_def:
+                    # i.e. obj.MethodName(param), or MethodName(param)
+                    if context.cur_patch_facts.is_enum:  # skip elements defined in enum
+                        continue
+                    elif self.priority_bound < IGNORE_PRIORITY:
+                        return  # call sites are only reported at IGNORE_PRIORITY
                     else:
-                        priority = LOW_PRIORITY
-                        if any(access in line_content for access in ('public', 'protected')):
-                            priority = MEDIUM_PRIORITY
+                        priority = IGNORE_PRIORITY
+                else:
+                    priority = LOW_PRIORITY
+                    if any(access in line_content for access in ('public', 'protected')):
+                        priority = MEDIUM_PRIORITY
 
-                    line_no = get_exact_lineno(m.end(0), context.cur_line)[1]
-                    self.bug_accumulator.append(
-                        BugInstance('NM_METHOD_NAMING_CONVENTION', priority, context.cur_patch.name, line_no,
-                                    'Nm: Method names should start with a lower case letter',
-                                    sha=context.cur_patch.sha, line_content=context.cur_line.content))
-                    return
-
-    def _local_search(self, context):
-        # check if patch is updated
-        if context.cur_patch != self.patch:
-            self.patch = context.cur_patch
-            for hunk in self.patch:
-                for line in hunk:
-                    if line.prefix == '-':
-                        continue
-                    m = ENUM_REGEX.search(line.content)
-                    if m:
-                        string_ranges = get_string_ranges(line.content)
-                        if not in_range(m.start(0), string_ranges):
-                            self.is_enum = True
-                            return
-            self.is_enum = False
+                line_no = get_exact_lineno(m.end(0), context.cur_line)[1]
+                self.bug_accumulator.append(
+                    BugInstance('NM_METHOD_NAMING_CONVENTION', priority, context.cur_patch.name, line_no,
+                                'Nm: Method names should start with a lower case letter',
+                                sha=context.cur_patch.sha, line_content=context.cur_line.content))
+                return
@@ -3,10 +3,13 @@ import regex
 from patterns.models import priorities
 from patterns.models.bug_instance import BugInstance
 from patterns.models.detectors import Detector, get_exact_lineno
-from utils import get_string_ranges, in_range
+from utils import in_range
 
 
 class EqualsClassNameDetector(Detector):
+    keywords = ('equals', 'getClass', 'getName')
+    best_priorities = {'EQ_COMPARING_CLASS_NAMES': priorities.MEDIUM_PRIORITY}
+
     def __init__(self):
         self.pattern = regex.compile(
             r'\b((?:[\w\.$"]|(?:\(\s*\)))+)\s*\.\s*equals(?P<aux1>\(((?:[^()]++|(?&aux1))*)\))')
@@ -14,11 +17,8 @@ class EqualsClassNameDetector(Detector):
 
     def match(self, context):
         line_content = context.cur_line.content
-        if not all(key in line_content for key in ('equals', 'getClass', 'getName')):
-            return
-
         its = self.pattern.finditer(line_content)
-        string_ranges = get_string_ranges(line_content)
+        string_ranges = context.cur_line.string_ranges
         for m in its:
             if in_range(m.start(2), string_ranges):  # m.start(2) is offset of the naming group
                 continue
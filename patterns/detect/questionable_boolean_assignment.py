@@ -3,10 +3,13 @@ import regex
 from patterns.models import priorities
 from patterns.models.bug_instance import BugInstance
 from patterns.models.detectors import Detector, get_exact_lineno
-from utils import get_string_ranges, in_range
+from utils import in_range
 
 
 class BooleanAssignmentDetector(Detector):
+    keywords = (('if', 'while'), ('true', 'false'), '=')
+    best_priorities = {'QBA_QUESTIONABLE_BOOLEAN_ASSIGNMENT': priorities.HIGH_PRIORITY}
+
     def __init__(self):
         self.extract = regex.compile(r'\b(?:if|while)\s*(?P<aux>\(((?:[^()]++|(?&aux))*)\))')
         self.assignment = regex.compile(r'\b\w+\s*=\s*(?:true|false)\b')
@@ -14,13 +17,9 @@ class BooleanAssignmentDetector(Detector):
 
     def match(self, context):
         line_content = context.cur_line.content
-        if all(key not in line_content for key in ('if', 'while')) or \
-                all(key not in line_content for key in ('true', 'false')) or '=' not in line_content:
-            return
-
         m_1 = self.extract.search(line_content)
         if m_1:
-            string_ranges = get_string_ranges(line_content)
+            string_ranges = context.cur_line.string_ranges
 
             conditions = m_1.group(2)
             offset = m_1.start(2)
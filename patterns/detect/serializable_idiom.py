@@ -3,22 +3,24 @@ import re
 from patterns.models.detectors import Detector, get_exact_lineno
 from patterns.models.bug_instance import BugInstance
 from patterns.models import priorities
-from utils import get_string_ranges, in_range
+from utils import in_range
 
 
 class DefSerialVersionID(Detector):
+    keywords = ('serialVersionUID',)
+    best_priorities = {'SE_NONSTATIC_SERIALVERSIONID': priorities.MEDIUM_PRIORITY,
+                       'SE_NONFINAL_SERIALVERSIONID': priorities.MEDIUM_PRIORITY,
+                       'SE_NONLONG_SERIALVERSIONID': priorities.LOW_PRIORITY}
+
     def __init__(self):
         self.pattern = re.compile(r'((?:static|final|\s)*)\b(long|int)\s+serialVersionUID\b')
         Detector.__init__(self)
 
     def match(self, context):
         line_content = context.cur_line.content
-        if 'serialVersionUID' not in line_content:
-            return
-
         m = self.pattern.search(line_content)
         if m:
-            string_ranges = get_string_ranges(line_content)
+            string_ranges = context.cur_line.string_ranges
             if in_range(m.start(0), string_ranges):
                 return
             g = m.groups()
@@ -53,6 +55,10 @@ class DefSerialVersionID(Detector):
 
 
 class DefReadResolveMethod(Detector):
+    keywords = ('readResolve', 'throws', 'ObjectStreamException')
+    best_priorities = {'SE_READ_RESOLVE_MUST_RETURN_OBJECT': priorities.MEDIUM_PRIORITY,
+                       'SE_READ_RESOLVE_IS_STATIC': priorities.MEDIUM_PRIORITY}
+
     def __init__(self):
         self.pattern = re.compile(
             r'((?:static|final|\s)*)\b([^\s]+)\s+readResolve\s*\(\s*\)\s+throws\s+ObjectStreamException')
@@ -60,12 +66,9 @@ class DefReadResolveMethod(Detector):
 
     def match(self, context):
         line_content = context.cur_line.content
-        if any(const not in line_content for const in ['readResolve', 'throws', 'ObjectStreamException']):
-            return
-
         m = self.pattern.search(line_content)
         if m:
-            string_ranges = get_string_ranges(line_content)
+            string_ranges = context.cur_line.string_ranges
             if in_range(m.start(0), string_ranges):
                 return
 
@@ -88,6 +91,9 @@ class DefReadResolveMethod(Detector):
 
 
 class DefPrivateMethod(Detector):
+    keywords = ('void', 'throws', ('writeObject', 'readObject'))
+    best_priorities = {'SE_METHOD_MUST_BE_PRIVATE': priorities.MEDIUM_PRIORITY}
+
     def __init__(self):
         self.pattern = re.compile(
             r'void\s+(writeObject|readObject|readObjectNoData)\s*\(([\s\w.$]*)\)\s*throws\s+')
@@ -95,14 +101,10 @@ class DefPrivateMethod(Detector):
 
     def match(self, context):
         line_content = context.cur_line.content
-        if any(key not in line_content for key in ('void', 'throws')) or all(
-                key not in line_content for key in ('writeObject', 'readObject', 'readObjectNoData')):
-            return
-
         strip_line = line_content.strip()
         m = self.pattern.search(strip_line)
         if m:
-            string_ranges = get_string_ranges(line_content)
+            string_ranges = context.cur_line.string_ranges
             if in_range(m.start(0), string_ranges):
                 return
 
@@ -3,10 +3,14 @@ import regex
 from patterns.models.detectors import Detector, get_exact_lineno
 from patterns.models.bug_instance import BugInstance
 from patterns.models import priorities
-from utils import get_string_ranges, in_range
+from utils import in_range
 
 
 class StaticDateFormatDetector(Detector):
+    keywords = ('static', ('DateFormat', 'Calendar'))
+    best_priorities = {'STCAL_STATIC_SIMPLE_DATE_FORMAT_INSTANCE': priorities.MEDIUM_PRIORITY,
+                       'STCAL_STATIC_CALENDAR_INSTANCE': priorities.MEDIUM_PRIORITY}
+
     def __init__(self):
         self.p = regex.compile(
             r'^([\w\s]*?)\bstatic\s*(?:final)?\s+(DateFormat|SimpleDateFormat|Calendar|GregorianCalendar)\s+(\w+)\s*[;=]')
@@ -14,12 +18,9 @@ class StaticDateFormatDetector(Detector):
 
     def match(self, context):
         line_content = context.cur_line.content
-        if not any(key in line_content for key in ('DateFormat', 'Calendar')):
-            return
-
         m = self.p.search(line_content)
         if m:
-            string_ranges = get_string_ranges(line_content)
+            string_ranges = context.cur_line.string_ranges
             if in_range(m.start(0), string_ranges):
                 return
 
@@ -8,6 +8,8 @@ confidence_map = {
 
 
 class BugInstance:
+    __slots__ = ('type', 'file_name', 'commit_sha', 'line_no', 'priority', 'description', 'line_content')
+
     def __init__(self, pattern_type: str, priority: int, file_name: str, line_no: int, description='', sha='',
                  line_content=''):
         self.type = pattern_type
@@ -18,5 +20,13 @@ class BugInstance:
         self.description = description
         self.line_content = line_content
 
+    def to_dict(self):
+        """
+        :return: a json-serializable dict of the bug instance
+        """
+        return {'type': self.type, 'priority': self.priority, 'confidence': confidence_map[self.priority],
+                'file_name': self.file_name, 'line_no': self.line_no, 'sha': self.commit_sha,
+                'description': self.description, 'line_content': self.line_content}
+
     def __str__(self):
         return '%s:%s:%s:%s' % (self.file_name, self.line_no, confidence_map[self.priority], self.type)
@@ -0,0 +1,131 @@
+import hashlib
+import json
+import os
+
+import regex
+
+INDEX_FORMAT = 1
+
+# comments, text blocks, string and char literals, which may contain words like 'class' or 'extends'
+NOISE_REGEX = regex.compile(r'"""[\s\S]*?"""|//[^\n]*|/\*[\s\S]*?\*/|"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\'')
+DECLARATION_REGEX = regex.compile(r'\b(class|interface)\s+([\w$]+)([^{;]*)\{')
+GENERIC_REGEX = regex.compile(r'(?P<gen><(?:[^<>]++|(?&gen))*>)')
+CLAUSE_REGEX = regex.compile(r'\b(extends|implements|permits)\b')
+
+
+def parse_declarations(source: str):
+    """
+    Find type declarations and their super types in Java source code
+    :param source: content of a java file
+    :return: a list of (simple name, extended simple names, implemented simple names) tuples
+    """
+    source = NOISE_REGEX.sub(' ', source)
+    declarations = list()
+    for m in DECLARATION_REGEX.finditer(source):
+        extended, implemented = list(), list()
+        clauses = CLAUSE_REGEX.split(GENERIC_REGEX.sub('', m.group(3)))
+        for keyword, names in zip(clauses[1::2], clauses[2::2]):
+            if keyword == 'permits':
+                continue
+            names = [name.rsplit('.', 1)[-1].strip() for name in names.split(',')]
+            (extended if keyword == 'extends' else implemented).extend(name for name in names if name)
+        declarations.append((m.group(2), extended, implemented))
+    return declarations
+
+
+class ClassIndex:
+    """
+    An index of class hierarchy of a local repository, which maps simple names of types to the files declaring
+    their subclasses (or sub-interfaces) and implementors. It is persisted as a json file and updated incrementally:
+    only files whose modification time or size changed are read, and only files whose content hash changed are parsed.
+    """
+
+    def __init__(self, repo_path: str, index_path=None):
+        """
+        :param repo_path: root directory of the repository
+        :param index_path: path of the json file to persist the index, not persisted if None
+        """
+        self.repo_path = repo_path
+        self.index_path = index_path
+        self.files = dict()  # relative path -> [mtime_ns, size, hash, declarations]
+        self._subclasses, self._implementors = dict(), dict()
+
+        if index_path and os.path.exists(index_path):
+            with open(index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('format') == INDEX_FORMAT:
+                self.files = data['files']
+        self._build_maps()
+
+    def update(self):
+        """
+        Synchronize the index with java files of the repository and save it if anything changed
+        :return: the number of files parsed
+        """
+        parsed, changed = 0, False
+        seen = set()
+        for root, dirs, file_names in os.walk(self.repo_path):
+            dirs[:] = [d for d in dirs if not d.startswith('.')]
+            for file_name in file_names:
+                if not file_name.endswith('.java'):
+                    continue
+                path = os.path.join(root, file_name)
+                rel_path = os.path.relpath(path, self.repo_path).replace(os.sep, '/')
+                seen.add(rel_path)
+
+                stat = os.stat(path)
+                entry = self.files.get(rel_path, None)
+                if entry is not None and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+                    continue
+
+                with open(path, 'rb') as f:
+                    content = f.read()
+                digest = hashlib.blake2b(content, digest_size=16).hexdigest()
+                if entry is not None and entry[2] == digest:
+                    declarations = entry[3]
+                else:
+                    declarations = parse_declarations(content.decode('utf-8', 'replace'))
+                    parsed += 1
+                self.files[rel_path] = [stat.st_mtime_ns, stat.st_size, digest, declarations]
+                changed = True
+
+        for rel_path in set(self.files) - seen:
+            del self.files[rel_path]
+            changed = True
+
+        if changed:
+            self._build_maps()
+            self.save()
+        return parsed
+
+    def save(self):
+        if not self.index_path:
+            return
+        tmp_path = f'{self.index_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'format': INDEX_FORMAT, 'files': self.files}, f, separators=(',', ':'))
+        os.replace(tmp_path, self.index_path)  # atomic, so that readers never see a partial index
+
+    def _build_maps(self):
+        self._subclasses, self._implementors = dict(), dict()
+        for rel_path, (_, _, _, declarations) in self.files.items():
+            for _, extended, implemented in declarations:
+                for name in extended:
+                    self._subclasses.setdefault(name, set()).add(rel_path)
+                for name in implemented:
+                    self._implementors.setdefault(name, set()).add(rel_path)
+
+    def subclasses(self, simple_name: str):
+        """
+        :return: a set of relative paths of files declaring types that extend the type
+        """
+        return self._subclasses.get(simple_name, set())
+
+    def implementors(self, simple_name: str):
+        """
+        :return: a set of relative paths of files declaring classes that implement the interface
+        """
+        return self._implementors.get(simple_name, set())
+
+    def is_extended(self, simple_name: str):
+        return simple_name in self._subclasses
@@ -12,9 +12,16 @@ class Context:
         self.cur_line = None
         self.cur_line_idx = -1
 
+        # facts shared by detectors
+        from patterns.models.facts import PatchSetFacts
+        self.patch_set_facts = PatchSetFacts(None)
+        self.cur_patch_facts = None
+
         # configuration
         self._online_search, self._repo_name, self._token = False, None, None
         self._local_search = True
+        self._search_cache = None
+        self._class_index = None
 
     def set_patch_set(self, patch_set: tuple, repo_name=''):
         self.patch_set = patch_set
@@ -22,6 +29,9 @@ class Context:
         self.cur_hunk = None
         self.cur_line = None
         self.cur_line_idx = -1
+        from patterns.models.facts import PatchSetFacts
+        self.patch_set_facts = PatchSetFacts(patch_set)
+        self.cur_patch_facts = None
 
         if repo_name:
             self._repo_name = repo_name
@@ -47,6 +57,39 @@ class Context:
     def get_online_search_info(self):
         return self._repo_name, self._token
 
+    def enable_search_cache(self, path: str, ttl=None):
+        """
+        Store responses of online search on disk, so that repeated searches are answered locally or revalidated
+        :param path: path of the sqlite database file, may be shared by processes
+        :param ttl: seconds for which a response is used without revalidation, search_cache.DEFAULT_TTL if None
+        """
+        # search backends are imported on the first use, so that short-lived runs do not import sqlite3
+        from patterns.models.search_cache import SearchCache, DEFAULT_TTL
+        self._search_cache = SearchCache(path, DEFAULT_TTL if ttl is None else ttl)
+
+    def disable_search_cache(self):
+        self._search_cache = None
+
+    def get_search_cache(self):
+        return self._search_cache
+
+    def index_search(self):
+        return self._class_index
+
+    def enable_index_search(self, class_index):
+        """
+        Search classes in an offline index of the repository instead of GitHub
+        :param class_index: a ClassIndex object, or the root directory of a local repository to index
+        """
+        if isinstance(class_index, str):
+            from patterns.models.class_index import ClassIndex
+            class_index = ClassIndex(class_index)
+            class_index.update()
+        self._class_index = class_index
+
+    def disable_index_search(self):
+        self._class_index = None
+
     def local_search(self):
         return self._local_search
 
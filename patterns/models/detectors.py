@@ -1,18 +1,36 @@
+import json
+
 from patterns.models.context import Context
+from patterns.models.priorities import HIGH_PRIORITY, IGNORE_PRIORITY
 from rparser import Line, VirtualStatement
-from utils import send
 
 
-def online_search(query: str, token='', search_parent=False, repo_name=''):
-    resp = send(query, token, 3)
+def get_client():
+    # imported on demand, since asyncio and ssl are slow to import and most runs do not search online
+    from github_client import get_client
+    return get_client()
+
+
+async def online_search_async(query: str, token='', search_parent=False, repo_name='', client=None, cache=None):
+    """
+    Search code via GitHub API. If nothing is found in a forked repository, search its parent instead,
+    since forked repositories are not currently searchable.
+    :param query: url of the search API
+    :param token: GitHub token
+    :param search_parent: whether to search the parent repository of a forked repository
+    :param repo_name: full name of the repository in the query
+    :param client: an AsyncGitHubClient object, the default client if None
+    :param cache: a SearchCache object to reuse responses of previous searches
+    :return: the response json, or None if failed
+    """
+    client = client or get_client()
+    resp = await _get_json(client, query, token, repo_name, cache)
     if resp:
-        resp = resp.json()
         if 'total_count' in resp:
             if resp['total_count'] == 0 and search_parent and repo_name:
                 # get parent repo name
-                resp = send(f'https://api.github.com/repos/{repo_name}')
+                resp = await _get_json(client, f'https://api.github.com/repos/{repo_name}', token, repo_name, cache)
                 if resp:
-                    resp = resp.json()
                     # forked repositories are not currently searchable
                     if 'fork' in resp and resp['fork']:
                         parent_full_name = ''
@@ -23,12 +41,63 @@ def online_search(query: str, token='', search_parent=False, repo_name=''):
                         # search in parent
                         if parent_full_name:
                             new_query = query.replace(repo_name, parent_full_name)
-                            return online_search(new_query, token)
+                            return await online_search_async(new_query, token, repo_name=parent_full_name,
+                                                             client=client, cache=cache)
             else:
                 return resp
     return None
 
 
+async def _get_json(client, url: str, token: str, repo_name: str, cache):
+    """
+    Send a GET request, answered from the cache if fresh, or revalidated with the ETag of the cached response
+    :return: the response json, or None if failed
+    """
+    if cache is None:
+        resp = await client.get(url, token)
+        return resp.json() if resp and resp.status_code == 200 else None
+
+    entry = cache.get(repo_name, url)
+    if entry is not None:
+        etag, body, fresh = entry
+        if fresh:
+            cache.hits += 1
+            return json.loads(body)
+    else:
+        etag, body = None, None
+
+    headers = {'If-None-Match': etag} if etag else None
+    resp = await client.get(url, token, headers=headers)
+    if resp is None:
+        return None
+    if resp.status_code == 304 and body is not None:
+        cache.revalidated += 1
+        cache.touch(repo_name, url)
+        return json.loads(body)
+    if resp.status_code != 200:
+        return None
+    cache.misses += 1
+    cache.put(repo_name, url, resp.headers.get('etag', None), resp.content)
+    return resp.json()
+
+
+def online_search(query: str, token='', search_parent=False, repo_name='', cache=None):
+    return get_client().run(online_search_async(query, token, search_parent, repo_name, cache=cache))
+
+
+def online_search_many(queries, token='', search_parent=False, repo_name='', cache=None):
+    """
+    Send multiple searches concurrently
+    :return: a list of response json (or None) in the order of queries
+    """
+    import asyncio
+
+    async def search_all():
+        return await asyncio.gather(*(online_search_async(query, token, search_parent, repo_name, cache=cache)
+                                      for query in queries))
+    return get_client().run(search_all())
+
+
 def get_exact_lineno(target, line: Line, is_strip=False, keyword_mode=False):
     """
     Return the exact line number according to target in line
@@ -57,9 +126,31 @@ def get_exact_lineno(target, line: Line, is_strip=False, keyword_mode=False):
 
 
 class Detector:
+    # Literals a statement must contain for the detector to fire. Each element is either a literal that must appear,
+    # or a tuple of literals of which at least one must appear. The engine skips the detector for other statements.
+    keywords = ()
+    # Bump the version when the findings of the detector change, so that cached results are no longer reused
+    version = 1
+    # Whether findings depend on anything besides the statement itself, e.g. other lines of the patch, the file
+    # name or online search results. Findings of such detectors are never cached.
+    depends_on_patch = False
+    # The best (lowest) priority of bug instances of each bug type the detector reports. An engine given a level does
+    # not run detectors which cannot report anything at that level. Undeclared detectors are always run.
+    best_priorities = {}
+    # The lowest priority an engine reports, set by the engine. Checks which can only find bug instances of lower
+    # priorities, e.g. the largest priority values, may be skipped.
+    priority_bound = IGNORE_PRIORITY
+
     def __init__(self):
         self.bug_accumulator = []
 
+    @classmethod
+    def best_priority(cls):
+        """
+        :return: the best priority of bug instances the detector reports, HIGH_PRIORITY if undeclared
+        """
+        return min(cls.best_priorities.values(), default=HIGH_PRIORITY)
+
     def match(self, context: Context):
         """
         Match single line and generate bug instance using regex pattern
@@ -68,5 +159,22 @@ class Detector:
         """
         pass
 
+    def export_patch_set_state(self, context: Context):
+        """
+        Compute the state derived from the whole patch set, which is shipped to worker processes in parallel mode
+        :param context: context object whose patch set is to be visited
+        :return: a picklable object, or None if the detector does not depend on the patch set
+        """
+        return None
+
+    def import_patch_set_state(self, context: Context, state):
+        """
+        Restore the state computed by export_patch_set_state() in a worker process
+        :param context: context object of the worker, whose patch set only contains patches assigned to the worker
+        :param state: the object returned by export_patch_set_state()
+        :return: None
+        """
+        pass
+
     def reset_bug_accumulator(self):
         self.bug_accumulator = list()
@@ -0,0 +1,91 @@
+import re
+
+
+class KeywordDispatcher:
+    """
+    Select the detectors to run on a statement according to the literals they declare in `Detector.keywords`.
+    The literals of all detectors are compiled into one pattern shaped like a trie, which finds the longest literal
+    starting at each position in a single pass over the statement; the literals contained in the ones found are
+    present too. The resulting set of present literals is mapped to the tuple of detectors whose keyword clauses are
+    satisfied.
+    """
+
+    MAX_CACHED_SELECTIONS = 4096
+
+    def __init__(self, detectors: dict):
+        """
+        :param detectors: an ordered dict of detector name to detector instance
+        """
+        self._entries = list()
+        literals = set()
+        for name, detector in detectors.items():
+            clauses = normalize_keywords(detector.keywords)
+            for clause in clauses:
+                literals.update(clause)
+            self._entries.append((name, detector, clauses))
+
+        self._literals = tuple(sorted(literals))
+        # literal -> the literals it contains, itself included
+        self._contained = {lit: frozenset(other for other in self._literals if other in lit) for lit in self._literals}
+        # a zero-width match at each position, so that overlapping literals are all found
+        self._pattern = re.compile(f'(?=({trie_pattern(self._literals)}))') if self._literals else None
+        self._selections = dict()
+
+    def dispatch(self, content: str):
+        """
+        :param content: content of the statement to check
+        :return: a tuple of (name, detector) pairs in registration order
+        """
+        if self._pattern is None:
+            found = frozenset()
+        else:
+            found = frozenset().union(*map(self._contained.__getitem__, set(self._pattern.findall(content))))
+        selected = self._selections.get(found, None)
+        if selected is None:
+            selected = tuple((name, detector) for name, detector, clauses in self._entries
+                             if all(not clause.isdisjoint(found) for clause in clauses))
+            if len(self._selections) >= self.MAX_CACHED_SELECTIONS:
+                self._selections.clear()
+            self._selections[found] = selected
+        return selected
+
+
+def normalize_keywords(keywords):
+    """
+    Convert keywords declared by a detector into a tuple of clauses.
+    A string element is a literal that must appear; a tuple element is a group of literals, one of which must appear.
+    :param keywords: keywords declared by a detector
+    :return: a tuple of frozensets
+    """
+    clauses = list()
+    for elem in keywords:
+        if isinstance(elem, str):
+            clauses.append(frozenset((elem,)))
+        else:
+            clauses.append(frozenset(elem))
+    return tuple(clauses)
+
+
+def trie_pattern(literals):
+    """
+    Build a regular expression matching any of the literals, with common prefixes factored out, e.g. 'get(?:Class)?'
+    for ('get', 'getClass'), so that a position is rejected after a few character tests.
+    Among the literals starting at a position, the longest one is matched.
+    :param literals: an iterable of non-empty strings
+    :return: the source of the regular expression
+    """
+    trie = dict()
+    for lit in literals:
+        node = trie
+        for char in lit:
+            node = node.setdefault(char, dict())
+        node[''] = None  # end of a literal
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return f'(?:{body})?' if '' in node else body
+
+    return build(trie)
@@ -1,9 +1,35 @@
-from rparser import Patch
+import copy
+from functools import partial
+from time import perf_counter
+
+from rparser import Patch, iter_parse
 from utils import log_message
 from gen_detectors import DETECTOR_DICT
 from .priorities import *
 from .context import Context
-from timer import Timer
+from .dispatch import KeywordDispatcher
+from .profiler import DetectorProfiler
+from .watchdog import RegexBudget, watch_patterns
+from .result_cache import ResultCache, detector_signature, line_position, resolve_line_position
+
+
+def priority_bound(level=None):
+    """
+    :param level: one of 'ignore', 'exp', 'low', 'medium' and 'high', or None for all priorities
+    :return: the largest priority value of bug instances at the level
+    :raise ValueError: if level is invalid
+    """
+    if not level or level == 'ignore':
+        return IGNORE_PRIORITY
+    if level == 'low':
+        return LOW_PRIORITY
+    if level == 'medium':
+        return MEDIUM_PRIORITY
+    if level == 'high':
+        return HIGH_PRIORITY
+    if level == 'exp':
+        return EXP_PRIORITY
+    raise ValueError('Invalid level value. Hint: ignore, exp, low, medium, high')
 
 
 class BaseEngine:
@@ -12,70 +38,344 @@ class BaseEngine:
     An engine maintains a Context object, and assigns tasks to detectors.
     """
 
-    def __init__(self, context: Context, included_filter=None, excluded_filter=None):
+    def __init__(self, context: Context, included_filter=None, excluded_filter=None, processes=1, profile=False,
+                 regex_timeout=None, result_cache=None, level=None, added_only=False):
         """
         Init detectors according to included_filter or excluded_filter
         :param included_filter: a list or tuple of detector class names to include
         :param excluded_filter: a list or tuple of detector class names to exclude
+        :param processes: number of worker processes to spread patches over, 1 means visiting in the current process.
+                          Workers are started on the first parallel visit and keep a copy of the context at that time.
+        :param profile: if true, collect timing statistics of detectors, see profile_stats()
+        :param regex_timeout: time budget in seconds of a detector on a statement. A detector whose regex matching
+                              runs over budget is skipped for that statement, and the skip is counted in timeouts.
+        :param result_cache: a ResultCache object or the path of its database. Findings of detectors that do not
+                             depend on the patch are reused for statements with the same content.
+        :param level: the lowest level of bug instances to be reported, as in filter_bugs(). Detectors which cannot
+                      report anything at the level are not run, and checks of lower priorities may be skipped, so
+                      bug instances below the level may be missing. All detectors are run by default.
+        :param added_only: if true, detectors only check statements containing added lines, while facts of patches
+                           still cover unchanged lines. Hunks without added or deleted statements, like those of
+                           whole source files, are checked entirely.
         """
         self.bug_accumulator = list()  # every patch set should own a new bug_accumulator
         self._detectors = dict()
         assert isinstance(context, Context)
         self.context = context
+        self.processes = processes
+        self._executor = None
+        self.profiler = DetectorProfiler() if profile else None
+        self.regex_timeout = regex_timeout
+        self._regex_budget = RegexBudget(regex_timeout) if regex_timeout else None
+        self.timeouts = dict()  # detector name to the number of statements skipped due to regex timeout
+        if isinstance(result_cache, str):
+            result_cache = ResultCache(result_cache)
+        self.result_cache = result_cache
+        self.added_only = added_only
 
+        # detector modules are imported on demand by the registry
         if included_filter:
             for name in included_filter:
                 detector_class = DETECTOR_DICT.get(name, None)
                 if detector_class:
                     self._detectors[name] = detector_class()
-        elif excluded_filter:
-            for name, detector_class in DETECTOR_DICT.items():
-                if name not in excluded_filter:
-                    self._detectors[name] = detector_class()
         else:
-            for name, detector_class in DETECTOR_DICT.items():
-                self._detectors[name] = detector_class()
+            for name in DETECTOR_DICT:
+                if not excluded_filter or name not in excluded_filter:
+                    self._detectors[name] = DETECTOR_DICT[name]()
+
+        self.level = level
+        if level:
+            bound = priority_bound(level)
+            for name in tuple(self._detectors):
+                detector = self._detectors[name]
+                if detector.best_priority() > bound:
+                    del self._detectors[name]
+                else:
+                    detector.priority_bound = bound
+
+        if self._regex_budget:
+            for detector in self._detectors.values():
+                watch_patterns(detector, self._regex_budget)
+
+        self._dispatcher = KeywordDispatcher(self._detectors)
+        cached_detectors = {name: detector for name, detector in self._detectors.items()
+                            if not detector.depends_on_patch}
+        self._cached_names = frozenset(cached_detectors)
+        self._cache_signature = detector_signature(cached_detectors)
+        # whether match() calls should go through _match_detector()
+        self._guarded = self.profiler is not None or self._regex_budget is not None
 
     def visit(self, *patch_set):
         self.context.set_patch_set(patch_set)
         self.bug_accumulator = list()  # reset
+        self.timeouts = dict()
+        if self.profiler:
+            self.profiler.reset()
+
+        if self.processes > 1 and len(patch_set) > 1:
+            self._visit_parallel()
+            return
 
         for patch in self.context.patch_set:
             self._visit_patch(patch)
+        if self.result_cache is not None:
+            self.result_cache.flush()
+
+    def iter_bugs(self, *patch_set, level=None):
+        """
+        Visit patches one by one, and yield bug instances of each patch as soon as it is visited.
+        Unlike visit(), bug instances are not kept in bug_accumulator, so memory does not grow with the number of
+        findings and the first ones can be reported while later patches are being checked.
+        :param patch_set: patches to visit, facts of the whole patch set are computed before the first one is visited
+        :param level: the lowest priority of bug instances to yield, as in filter_bugs(), all by default
+        :return: a generator of bug instances in the order of patches
+        :raise ValueError: if level is invalid, before anything is visited
+        """
+        bound = priority_bound(level)
+        self.context.set_patch_set(patch_set)
+        self.bug_accumulator = list()
+        self.timeouts = dict()
+        if self.profiler:
+            self.profiler.reset()
+        return self._iter_bugs(bound)
+
+    def _iter_bugs(self, bound: int):
+        if self.processes > 1 and len(self.context.patch_set) > 1:
+            patch_bugs = self._iter_parallel()
+        else:
+            patch_bugs = map(self._check_patch, self.context.patch_set)
+
+        for bugs in patch_bugs:
+            for bug_ins in bugs:
+                if bug_ins.priority <= bound:
+                    yield bug_ins
+        if self.result_cache is not None:
+            self.result_cache.flush()
+
+    def visit_stream(self, lines, name='', sha='', is_patch=True):
+        """
+        Visit a single patch read line by line, and yield bug instances of each hunk as soon as it is visited.
+        Only the current hunk is kept in memory, so large diffs are checked with bounded memory. Facts of the patch
+        looked up by detectors cover the hunks read so far. Bug instances are also added to bug_accumulator.
+        :param lines: an iterable of lines, e.g. an opened diff file
+        :param name: file name of the patch
+        :param sha: commit sha of the patch
+        :param is_patch: whether lines are a diff, otherwise a source file
+        :return: a generator of bug instances
+        """
+        patch = Patch()
+        patch.name, patch.sha = name, sha
+        self.context.set_patch_set((patch,))
+        self.bug_accumulator = list()  # reset
+        self.timeouts = dict()
+        if self.profiler:
+            self.profiler.reset()
+
+        self.context.cur_patch = patch
+        patch_set_facts = self.context.patch_set_facts
+        self.context.cur_patch_facts = patch_set_facts.of(patch)
+        for hunk in iter_parse(lines, is_patch):
+            patch.hunks = [hunk]
+            patch_set_facts.add_hunk(patch, hunk)
+            self._visit_hunk(hunk)
+            bugs = self._collect_bugs()
+            self.bug_accumulator += bugs
+            yield from bugs
+        if self.result_cache is not None:
+            self.result_cache.flush()
+
+    def _visit_parallel(self):
+        """
+        Spread patches over worker processes and merge bug instances in the order of patches
+        """
+        for bugs in self._iter_parallel():
+            self.bug_accumulator += bugs
+
+    def _iter_parallel(self):
+        """
+        Spread patches over worker processes, and yield a list of bug instances of each patch in the order of patches.
+        Facts of the patch set and patch-set-wide state of detectors are computed once here and shipped to the workers.
+        """
+        if self._executor is None:
+            from concurrent.futures import ProcessPoolExecutor
+            worker_context = copy.copy(self.context)
+            worker_context.set_patch_set(tuple())
+            self._executor = ProcessPoolExecutor(max_workers=self.processes, initializer=_init_worker,
+                                                 initargs=(type(self), worker_context, self._worker_options()))
+
+        states = dict()
+        for name, detector in self._detectors.items():
+            state = detector.export_patch_set_state(self.context)
+            if state is not None:
+                states[name] = state
+
+        visit_func = partial(_visit_in_worker, self.context.patch_set_facts, states)
+        for bugs, stats, timeouts in self._executor.map(visit_func, self.context.patch_set):
+            if stats:
+                self.profiler.merge(stats)
+            for name, cnt in timeouts.items():
+                self.timeouts[name] = self.timeouts.get(name, 0) + cnt
+            yield bugs
+
+    def _worker_options(self):
+        """
+        :return: keyword arguments to build an engine with the same configuration in a worker process
+        """
+        return dict(included_filter=tuple(self._detectors), profile=self.profiler is not None,
+                    regex_timeout=self.regex_timeout, result_cache=self.result_cache, level=self.level,
+                    added_only=self.added_only)
+
+    def shutdown(self):
+        """
+        Stop worker processes of parallel mode
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
 
     def _visit_patch(self, patch):
+        """
+        Check a patch and add its bug instances to bug_accumulator
+        :param patch: code from a single file to visit
+        :return: None
+        """
+        self.bug_accumulator += self._check_patch(patch)
+
+    def _check_patch(self, patch):
         """
         Update context and assign tasks to detectors
         :param patch: code from a single file to visit
-        :return: bug instances
+        :return: a list of bug instances of the patch
+        """
+        return list()
+
+    def _visit_hunk(self, hunk):
+        """
+        Assign tasks to detectors on a hunk of the current patch, used by visit_stream()
+        :param hunk: a Hunk object
+        :return: None
         """
         pass
 
+    def _collect_bugs(self):
+        """
+        Take bug instances out of detectors
+        :return: a list of the bug instances
+        """
+        bugs = list()
+        for detector in self._detectors.values():
+            if detector.bug_accumulator:
+                bugs += detector.bug_accumulator
+                detector.reset_bug_accumulator()
+        return bugs
+
+    def _match_detectors(self, detectors: tuple):
+        """
+        Call match() of detectors on the current line
+        :param detectors: a tuple of (name, detector) pairs
+        :return: None
+        """
+        if self._guarded:
+            for name, detector in detectors:
+                self._match_detector(name, detector)
+        else:
+            for name, detector in detectors:
+                detector.match(self.context)
+
+    def _match_detectors_with_cache(self, detectors: tuple):
+        """
+        Reuse cached findings on the current line if its content has been checked before, otherwise call match()
+        of detectors and cache the findings
+        :param detectors: a tuple of (name, detector) pairs
+        :return: None
+        """
+        line, patch = self.context.cur_line, self.context.cur_patch
+        key = ResultCache.make_key(self._cache_signature, line)
+        findings = self.result_cache.get(key)
+        if findings is not None:
+            for name, position, bug_ins in findings:
+                bug_ins.file_name, bug_ins.commit_sha = patch.name, patch.sha
+                bug_ins.line_no = resolve_line_position(line, position)
+                bug_ins.line_content = line.content
+                self._detectors[name].bug_accumulator.append(bug_ins)
+            self._match_detectors(tuple((name, detector) for name, detector in detectors
+                                        if name not in self._cached_names))
+            return
+
+        bug_cnts = [len(detector.bug_accumulator) for name, detector in detectors]
+        timeout_cnt = sum(self.timeouts.values())
+        self._match_detectors(detectors)
+        if sum(self.timeouts.values()) != timeout_cnt:
+            return  # findings are incomplete
+
+        findings = list()
+        for (name, detector), bug_cnt in zip(detectors, bug_cnts):
+            if name not in self._cached_names:
+                continue
+            for bug_ins in detector.bug_accumulator[bug_cnt:]:
+                findings.append((name, line_position(line, bug_ins.line_no), _detach_bug(bug_ins)))
+        self.result_cache.put(key, findings)
+
+    def _match_detector(self, name: str, detector):
+        """
+        Call detector.match() on the current line with profiling and regex time budget
+        :param name: name of the detector
+        :param detector: detector object
+        :return: None
+        """
+        budget = self._regex_budget
+        if budget is not None:
+            bug_cnt = len(detector.bug_accumulator)
+            budget.start()
+
+        start = perf_counter()
+        try:
+            detector.match(self.context)
+        except TimeoutError:
+            if budget is None or not budget.expired():
+                raise
+            # skip the detector for this statement
+            del detector.bug_accumulator[bug_cnt:]
+            self.timeouts[name] = self.timeouts.get(name, 0) + 1
+            log_message(f'[Regex Timeout] {name} skipped {self.context.cur_patch.name}:'
+                        f'{self.context.cur_line.lineno}', 'warning')
+
+        if self.profiler is not None:
+            self.profiler.record(name, perf_counter() - start)
+
     def filter_bugs(self, level=None):
         if not level:
             return self.bug_accumulator
 
-        if level == 'low':
-            bound = LOW_PRIORITY
-        elif level == 'medium':
-            bound = MEDIUM_PRIORITY
-        elif level == 'high':
-            bound = HIGH_PRIORITY
-        elif level == 'exp':
-            bound = EXP_PRIORITY
-        elif level == 'ignore':
-            bound = IGNORE_PRIORITY
-        else:
-            raise ValueError('Invalid level value. Hint: ignore, exp, low, medium, high')
-
+        bound = priority_bound(level)
         return tuple(bug for bug in self.bug_accumulator if bug.priority <= bound)
 
+    def profile_stats(self):
+        """
+        :return: a dict of detector name to DetectorStats collected in the last visit, or None if profiling is disabled
+        """
+        if self.profiler is None:
+            return None
+        return self.profiler.stats
+
     def report(self, level='low'):
         """
         This method is called after all patches to be visited.
         """
         for bug_ins in self.filter_bugs(level):
             log_message(str(bug_ins), 'info')
+        if self.profiler:
+            for line in self.profiler.summary():
+                log_message(line, 'debug')
+        for name, cnt in self.timeouts.items():
+            log_message(f'[Regex Timeout] {name} skipped {cnt} statements', 'warning')
 
 
 class DefaultEngine(BaseEngine):
@@ -83,37 +383,81 @@ class DefaultEngine(BaseEngine):
     ParentDetector and SubDetector are for multiple single-line patterns in the same file
     """
 
-    def _visit_patch(self, patch: Patch):
+    def _check_patch(self, patch: Patch):
         """
         Update context and assign tasks to detectors
         :param patch:
-        :return: None
+        :return: a list of bug instances of the patch
         """
 
         self.context.cur_patch = patch
+        self.context.cur_patch_facts = self.context.patch_set_facts.of(patch)
 
         # detect patch
         for hunk in patch:
-            self.context.cur_hunk = hunk
-
-            for i in range(len(hunk.lines)):
-                # detect all lines in the patch rather than the addition
-                if i in hunk.dellines:
-                    continue
-
-                self.context.cur_line_idx = i
-                self.context.cur_line = hunk.lines[i]
-
-                detector_timers = dict()
-                for name, detector in self._detectors.items():
-                    if name not in detector_timers:
-                        detector_timers[name] = Timer(name=name, logger=None)
-                    detector_timers[name].start()
-                    detector.match(self.context)
-                    detector_timers[name].stop()
-
-        # collect bug instances
-        for detector in list(self._detectors.values()):
-            if detector.bug_accumulator:
-                self.bug_accumulator += detector.bug_accumulator
-                detector.reset_bug_accumulator()
+            self._visit_hunk(hunk)
+        return self._collect_bugs()
+
+    def _visit_hunk(self, hunk):
+        """
+        Assign tasks to detectors on lines of a hunk of the current patch
+        :param hunk: a Hunk object
+        :return: None
+        """
+        self.context.cur_hunk = hunk
+        if self.added_only and (hunk.addlines or hunk.dellines):
+            indexes = hunk.addlines
+        elif hunk.dellines:
+            # detect all lines in the patch rather than the addition
+            dellines = set(hunk.dellines)
+            indexes = [i for i in range(len(hunk.lines)) if i not in dellines]
+        else:
+            indexes = range(len(hunk.lines))
+
+        for i in indexes:
+            self.context.cur_line_idx = i
+            self.context.cur_line = hunk.lines[i]
+
+            detectors = self._dispatcher.dispatch(self.context.cur_line.content)
+            if self.result_cache is None:
+                self._match_detectors(detectors)
+            else:
+                self._match_detectors_with_cache(detectors)
+
+
+def _detach_bug(bug_ins):
+    """
+    :return: a copy of the bug instance without location, which is filled in again when the cache entry is reused
+    """
+    bug_ins = copy.copy(bug_ins)
+    bug_ins.file_name, bug_ins.commit_sha, bug_ins.line_no, bug_ins.line_content = '', '', None, ''
+    return bug_ins
+
+
+# ===========================================
+#          Worker process of parallel mode
+# ===========================================
+_worker_engine = None
+
+
+def _init_worker(engine_class, context: Context, options: dict):
+    global _worker_engine
+    _worker_engine = engine_class(context, **options)
+
+
+def _visit_in_worker(patch_set_facts, states: dict, patch: Patch):
+    engine = _worker_engine
+    engine.context.set_patch_set((patch,))
+    engine.context.patch_set_facts = patch_set_facts
+    for name, state in states.items():
+        engine._detectors[name].import_patch_set_state(engine.context, state)
+
+    engine.timeouts = dict()
+    stats = None
+    if engine.profiler:
+        engine.profiler.reset()
+        stats = engine.profiler.stats
+    bugs = engine._check_patch(patch)
+    if engine.result_cache is not None:
+        engine.result_cache.flush()
+    return bugs, stats, engine.timeouts
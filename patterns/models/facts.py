@@ -0,0 +1,134 @@
+import regex
+
+from utils import in_range
+
+ENUM_REGEX = regex.compile(r'\benum\s+\w+\s*(?:\b(?:extends|implements)\s+[\w<>,\s]+)*\s*{')
+VAR_DEF_REGEX = regex.compile(r'\b(Formatter|PrintStream|\w*Writer|\w*Logger)\s+(\w+)\s*[;=]')
+VAR_TYPE_KEYWORDS = ('Formatter', 'PrintStream', 'Writer', 'Logger')
+GENERIC_REGEX = regex.compile(r'(?P<gen><(?:[^<>]++|(?&gen))*>)')
+CLASS_EXTENDS_REGEX = regex.compile(r'class\s+([\w$]+)\s*(?P<gen><(?:[^<>]++|(?&gen))*>)?\s+extends\s+([\w$.]+)')
+INTERFACE_EXTENDS_REGEX = regex.compile(r'interface\s+([\w$]+)\s*(?P<gen><(?:[^<>]++|(?&gen))*>)?\s+extends\s+([^{]+)')
+
+
+class PatchFacts:
+    """
+    Facts about a patch that detectors look up beyond the current line. They are collected lazily by a single scan
+    over the lines of the patch that are not deleted.
+    """
+
+    def __init__(self, patch):
+        self.patch = patch
+        self._pending_hunks = list(patch) if patch else []  # hunks not scanned yet
+        self._is_enum = False
+        self._interesting_vars = dict()  # variable name to type name of formatters, writers and loggers
+        self._extended_names = set()  # simple names of types extended by types declared in the patch
+
+    @property
+    def is_enum(self):
+        """
+        :return: whether an enum is defined in the patch
+        """
+        self._scan()
+        return self._is_enum
+
+    @property
+    def interesting_vars(self):
+        self._scan()
+        return self._interesting_vars
+
+    @property
+    def extended_names(self):
+        self._scan()
+        return self._extended_names
+
+    def add_hunk(self, hunk):
+        """
+        Add facts of a hunk of a patch that is read incrementally, see BaseEngine.visit_stream()
+        """
+        self._pending_hunks.append(hunk)
+        self._scan()  # scan it now, the hunk is not kept
+
+    def _scan(self):
+        if not self._pending_hunks:
+            return
+        hunks, self._pending_hunks = self._pending_hunks, []
+
+        for hunk in hunks:
+            for line in hunk:
+                if line.prefix == '-':
+                    continue
+                content = line.content
+
+                if not self._is_enum and 'enum' in content:
+                    m = ENUM_REGEX.search(content)
+                    if m and not in_range(m.start(0), line.string_ranges):
+                        self._is_enum = True
+
+                if any(key in content for key in VAR_TYPE_KEYWORDS):
+                    m = VAR_DEF_REGEX.search(content)
+                    if m and not in_range(m.start(0), line.string_ranges):
+                        type_name, var_name = m.groups()
+                        self._interesting_vars[var_name] = type_name
+
+                if 'extends' in content:
+                    if 'class' in content:
+                        m = CLASS_EXTENDS_REGEX.search(content.strip())
+                    elif 'interface' in content:
+                        m = INTERFACE_EXTENDS_REGEX.search(content.strip())
+                    else:
+                        continue
+
+                    if m:
+                        extended_str = GENERIC_REGEX.sub('', m.groups()[-1])  # remove <...>
+                        self._extended_names.update(name.rsplit('.', 1)[-1].strip() for name in extended_str.split(','))
+
+
+class PatchSetFacts:
+    """
+    Facts about a patch set, built from facts of its patches. Only the derived facts are pickled, so that they can be
+    shipped to worker processes which visit a single patch of the set.
+    """
+
+    def __init__(self, patch_set):
+        self.patch_set = patch_set
+        self.version = 0  # incremented when facts are added, so that decisions based on them can be made again
+        self._patch_facts = dict()  # id of patch to PatchFacts
+        self._extends_dict = None
+
+    def of(self, patch):
+        """
+        :return: the PatchFacts object of a patch, shared by all detectors
+        """
+        facts = self._patch_facts.get(id(patch), None)
+        if facts is None or facts.patch is not patch:
+            facts = PatchFacts(patch)
+            self._patch_facts[id(patch)] = facts
+        return facts
+
+    def add_hunk(self, patch, hunk):
+        """
+        Add facts of a hunk of a patch of the set that is read incrementally, see BaseEngine.visit_stream()
+        """
+        self.of(patch).add_hunk(hunk)
+        self._extends_dict = None  # collected again with the new hunk
+        self.version += 1
+
+    @property
+    def extends_dict(self):
+        """
+        :return: a dict of patch name to simple names of types extended in the patch
+        """
+        if self._extends_dict is None:
+            self._extends_dict = dict()
+            for patch in self.patch_set or ():
+                extended_names = self.of(patch).extended_names
+                if extended_names:
+                    self._extends_dict[patch.name] = extended_names
+        return self._extends_dict
+
+    def __getstate__(self):
+        return {'extends_dict': self.extends_dict}
+
+    def __setstate__(self, state):
+        self.__init__(None)
+        self._extends_dict = state['extends_dict']
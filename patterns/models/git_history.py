@@ -0,0 +1,122 @@
+import hashlib
+import io
+import subprocess
+import tempfile
+
+from rparser import iter_diff_stream
+from .bug_instance import BugInstance
+from .context import Context
+from .engine import DefaultEngine
+from .result_cache import ResultCache, detector_signature
+
+# options that make the diff of a pair of blobs independent of the configuration of git
+GIT_LOG_OPTIONS = ('-c', 'core.quotePath=false', 'log', '-p', '--full-index', '--unified=3', '--no-color',
+                   '--no-ext-diff', '--no-textconv', '--format=commit %H')
+
+
+class GitHistoryAnalyzer:
+    """
+    Analyze the commits of a range in a local git repository. The output of 'git log -p' is streamed into the parser,
+    and findings are cached per (file path, source blob id, target blob id, detectors), so that a change which recurs
+    in many commits, e.g. on several branches, is parsed and visited only once. Each changed file is visited as a
+    patch set of its own, so its findings only depend on the blobs and the versions of the detectors.
+    """
+
+    def __init__(self, repo_path: str, result_cache=None, **engine_options):
+        """
+        :param repo_path: root directory of the repository
+        :param result_cache: a ResultCache object or the path of its database to keep findings across runs,
+                             findings are only kept during the lifetime of the analyzer if None
+        :param engine_options: keyword arguments of DefaultEngine, like included_filter or regex_timeout
+        """
+        self.repo_path = repo_path
+        if isinstance(result_cache, str):
+            result_cache = ResultCache(result_cache)
+        self.result_cache = result_cache
+        self.analyzed, self.reused = 0, 0  # numbers of file changes visited and skipped in the last analysis
+
+        self._engine = DefaultEngine(Context(), **engine_options)
+        self._signature = b'blobs:' + detector_signature(self._engine._detectors)
+        self._memo = dict()  # cache key -> findings, for changes seen during the lifetime of the analyzer
+
+    def analyze(self, commit_range: str, paths=('*.java',)):
+        """
+        :param commit_range: a revision range of git log, like 'v1.0..main' or 'HEAD~100..HEAD'
+        :param paths: pathspecs of files to analyze
+        :return: a list of bug instances, in the order of 'git log'
+        """
+        self.analyzed, self.reused = 0, 0
+        command = ('git', '-C', self.repo_path) + GIT_LOG_OPTIONS + (commit_range, '--') + tuple(paths)
+        # stderr goes to a file rather than a pipe, git would block on a full pipe while stdout is being read
+        errors = tempfile.TemporaryFile()
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=errors)
+        # keep '\r' as parse() does
+        lines = io.TextIOWrapper(process.stdout, encoding='utf-8', errors='replace', newline='')
+
+        bugs, cached = list(), dict()
+
+        def parse_hunks(patch):
+            key = self._make_key(patch)
+            findings = self._lookup(key) if key else None
+            if findings is not None:
+                cached[id(patch)] = findings
+            return findings is None
+
+        try:
+            for patch in iter_diff_stream(lines, parse_hunks=parse_hunks):
+                findings = cached.pop(id(patch), None)
+                if findings is not None:
+                    self.reused += 1
+                elif patch.hunks:
+                    findings = self._visit(patch)
+                    self.analyzed += 1
+                else:
+                    continue
+                for pattern_type, priority, line_no, description, line_content in findings:
+                    bugs.append(BugInstance(pattern_type, priority, patch.name, line_no, description, sha=patch.sha,
+                                            line_content=line_content))
+        finally:
+            lines.close()
+            returncode = process.wait()
+            errors.seek(0)
+            stderr = errors.read().decode('utf-8', 'replace')
+            errors.close()
+            if self.result_cache is not None:
+                self.result_cache.flush()
+
+        if returncode != 0:
+            raise RuntimeError(f'git log failed in {self.repo_path}: {stderr.strip()}')
+        return bugs
+
+    def _make_key(self, patch):
+        """
+        :return: the cache key of a change of a file, or None if the blob ids are unknown
+        """
+        if not patch.blobs:
+            return None
+        h = hashlib.blake2b(self._signature, digest_size=16)
+        h.update(f'\0{patch.name}\0{patch.blobs[0]}\0{patch.blobs[1]}'.encode('utf-8', 'surrogatepass'))
+        return h.digest()
+
+    def _lookup(self, key: bytes):
+        findings = self._memo.get(key, None)
+        if findings is None and self.result_cache is not None:
+            findings = self.result_cache.get(key)
+            if findings is not None:
+                self._memo[key] = findings
+        return findings
+
+    def _visit(self, patch):
+        """
+        Visit a change of a file and cache its findings
+        :return: a list of (type, priority, line_no, description, line_content) tuples
+        """
+        self._engine.visit(patch)
+        findings = [(bug.type, bug.priority, bug.line_no, bug.description, bug.line_content)
+                    for bug in self._engine.bug_accumulator]
+        key = self._make_key(patch)
+        if key:
+            self._memo[key] = findings
+            if self.result_cache is not None:
+                self.result_cache.put(key, findings)
+        return findings
@@ -0,0 +1,74 @@
+from bisect import bisect_right
+
+# upper bounds (in seconds) of latency histogram buckets, the last bucket counts calls slower than 1 second
+HISTOGRAM_BOUNDS = (1e-6, 1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1.0)
+
+
+class DetectorStats:
+    """
+    Aggregated timing of `match()` calls of a single detector
+    """
+    __slots__ = ('calls', 'total_time', 'max_time', 'histogram')
+
+    def __init__(self):
+        self.calls = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.histogram = [0] * (len(HISTOGRAM_BOUNDS) + 1)
+
+    def add(self, elapsed: float):
+        self.calls += 1
+        self.total_time += elapsed
+        if elapsed > self.max_time:
+            self.max_time = elapsed
+        self.histogram[bisect_right(HISTOGRAM_BOUNDS, elapsed)] += 1
+
+    def merge(self, other):
+        self.calls += other.calls
+        self.total_time += other.total_time
+        self.max_time = max(self.max_time, other.max_time)
+        self.histogram = [a + b for a, b in zip(self.histogram, other.histogram)]
+
+    @property
+    def mean_time(self):
+        return self.total_time / self.calls if self.calls else 0.0
+
+    def __str__(self):
+        return 'calls=%d total=%.6fs mean=%.2fus max=%.2fus histogram=%s' % (
+            self.calls, self.total_time, self.mean_time * 1e6, self.max_time * 1e6, self.histogram)
+
+
+class DetectorProfiler:
+    """
+    Collect per-detector statistics of `match()` calls. An engine only creates a profiler when profiling is enabled.
+    """
+
+    def __init__(self):
+        self.stats = dict()
+
+    def record(self, name: str, elapsed: float):
+        stats = self.stats.get(name, None)
+        if stats is None:
+            stats = self.stats[name] = DetectorStats()
+        stats.add(elapsed)
+
+    def merge(self, stats_dict: dict):
+        """
+        Merge statistics collected elsewhere, e.g. in worker processes
+        :param stats_dict: a dict of detector name to DetectorStats
+        """
+        for name, other in stats_dict.items():
+            stats = self.stats.get(name, None)
+            if stats is None:
+                stats = self.stats[name] = DetectorStats()
+            stats.merge(other)
+
+    def reset(self):
+        self.stats = dict()
+
+    def summary(self):
+        """
+        :return: a list of lines sorted by total time in descending order
+        """
+        items = sorted(self.stats.items(), key=lambda item: item[1].total_time, reverse=True)
+        return ['%s: %s' % (name, stats) for name, stats in items]
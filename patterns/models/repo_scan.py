@@ -0,0 +1,179 @@
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from rparser import parse
+from utils import log_message
+from .bug_instance import BugInstance
+from .context import Context
+from .engine import DefaultEngine
+from .result_cache import detector_signature
+
+MANIFEST_FORMAT = 2
+
+
+def iter_java_files(repo_path: str):
+    """
+    Walk a source tree, skipping hidden directories like .git
+    :return: a generator of (relative path, absolute path, stat result) of java files
+    """
+    stack = [repo_path]
+    while stack:
+        try:
+            entries = list(os.scandir(stack.pop()))
+        except OSError as e:
+            log_message(f'[Repo Scan] {e}', 'warning')
+            continue
+        for entry in entries:
+            if entry.name.startswith('.'):
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                stack.append(entry.path)
+            elif entry.name.endswith('.java') and entry.is_file():
+                rel_path = os.path.relpath(entry.path, repo_path).replace(os.sep, '/')
+                yield rel_path, entry.path, entry.stat()
+
+
+class RepoScanner:
+    """
+    Scan all java files of a source tree with DefaultEngine. Files are read, parsed and visited in chunks by worker
+    processes. Findings are kept in a manifest, a json file which maps paths and content hashes of files to their
+    findings, so that a re-scan only visits files whose content changed. Each file is visited as a patch set of its
+    own, so its findings only depend on its path, its content and the versions of the detectors.
+    """
+
+    def __init__(self, repo_path: str, manifest_path=None, processes=1, chunk_size=16, **engine_options):
+        """
+        :param repo_path: root directory of the source tree
+        :param manifest_path: path of the json file to persist findings, not persisted if None
+        :param processes: number of worker processes, 1 means scanning in the current process
+        :param chunk_size: number of files sent to a worker at a time
+        :param engine_options: keyword arguments of DefaultEngine, like included_filter or regex_timeout
+        """
+        self.repo_path = repo_path
+        self.manifest_path = manifest_path
+        self.processes = processes
+        self.chunk_size = chunk_size
+        self.engine_options = engine_options
+        self.analyzed, self.reused = 0, 0  # numbers of files visited and skipped in the last scan
+
+        self._engine = DefaultEngine(Context(), **engine_options)
+        self.signature = detector_signature(self._engine._detectors).decode()
+        self.files = dict()  # relative path -> [mtime_ns, size, hash]
+        # manifest key of (relative path, hash) -> a list of [type, priority, line_no, description, line_content]
+        self.findings = dict()
+
+        if manifest_path and os.path.exists(manifest_path):
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            # findings of other detectors or versions are stale
+            if data.get('format') == MANIFEST_FORMAT and data.get('signature') == self.signature:
+                self.files, self.findings = data['files'], data['findings']
+
+    def scan(self):
+        """
+        Synchronize findings with java files of the source tree and save the manifest
+        :return: a list of bug instances of all java files, ordered by file path
+        """
+        self.analyzed, self.reused = 0, 0
+        files, tasks = dict(), list()
+        for rel_path, path, stat in iter_java_files(self.repo_path):
+            entry = self.files.get(rel_path, None)
+            if entry is None or _manifest_key(rel_path, entry[2]) not in self.findings:
+                tasks.append((rel_path, path, None))
+            elif entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+                files[rel_path] = entry
+                self.reused += 1
+            else:
+                tasks.append((rel_path, path, entry[2]))
+
+        if self.processes > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=self.processes, initializer=_init_worker,
+                                     initargs=(self.engine_options,)) as executor:
+                self._merge(executor.map(_scan_file, tasks, chunksize=self.chunk_size), files)
+        else:
+            self._merge(map(partial(_scan_file, engine=self._engine), tasks), files)
+
+        self.files = files
+        keys = {_manifest_key(rel_path, entry[2]) for rel_path, entry in files.items()}
+        self.findings = {key: findings for key, findings in self.findings.items() if key in keys}
+        self.save()
+        return self.bugs()
+
+    def _merge(self, results, files: dict):
+        for rel_path, mtime_ns, size, digest, findings in results:
+            if digest is None:
+                continue  # unreadable
+            files[rel_path] = [mtime_ns, size, digest]
+            if findings is None:
+                self.reused += 1  # touched, but the content is the same
+            else:
+                self.findings[_manifest_key(rel_path, digest)] = findings
+                self.analyzed += 1
+
+    def bugs(self):
+        """
+        :return: a list of bug instances in the manifest, ordered by file path
+        """
+        bugs = list()
+        for rel_path in sorted(self.files):
+            findings = self.findings[_manifest_key(rel_path, self.files[rel_path][2])]
+            for pattern_type, priority, line_no, description, line_content in findings:
+                bugs.append(BugInstance(pattern_type, priority, rel_path, line_no, description,
+                                        line_content=line_content))
+        return bugs
+
+    def save(self):
+        if not self.manifest_path:
+            return
+        tmp_path = f'{self.manifest_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'format': MANIFEST_FORMAT, 'signature': self.signature, 'files': self.files,
+                       'findings': self.findings}, f, separators=(',', ':'))
+        os.replace(tmp_path, self.manifest_path)  # atomic, so that readers never see a partial manifest
+
+
+def _manifest_key(rel_path: str, digest: str):
+    """
+    :return: the key of findings in the manifest, findings depend on the path too, e.g. the class name of a file
+    """
+    return f'{digest}:{rel_path}'
+
+
+# ===========================================
+#          Worker of repo scan
+# ===========================================
+_scan_engine = None
+
+
+def _init_worker(engine_options: dict):
+    global _scan_engine
+    _scan_engine = DefaultEngine(Context(), **engine_options)
+
+
+def _scan_file(task: tuple, engine=None):
+    """
+    :param task: (relative path, absolute path, hash in the manifest or None)
+    :param engine: engine to visit the file, the engine of the worker process if None
+    :return: (relative path, mtime_ns, size, hash, findings), findings is None if the hash is unchanged
+    """
+    rel_path, path, old_digest = task
+    try:
+        with open(path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            content = f.read()
+    except OSError as e:
+        log_message(f'[Repo Scan] {e}', 'warning')
+        return rel_path, None, None, None, None
+
+    digest = hashlib.blake2b(content, digest_size=16).hexdigest()
+    if digest == old_digest:
+        return rel_path, stat.st_mtime_ns, stat.st_size, digest, None
+
+    engine = engine or _scan_engine
+    engine.visit(parse(content.decode('utf-8', 'replace'), is_patch=False, name=rel_path))
+    findings = [[bug.type, bug.priority, bug.line_no, bug.description, bug.line_content]
+                for bug in engine.bug_accumulator]
+    return rel_path, stat.st_mtime_ns, stat.st_size, digest, findings
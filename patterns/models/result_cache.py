@@ -0,0 +1,120 @@
+import hashlib
+import pickle
+import threading
+
+from rparser import VirtualStatement
+from .priorities import IGNORE_PRIORITY
+
+
+class ResultCache:
+    """
+    An on-disk cache of bug instances found on statements, shared by engines, threads, processes and runs.
+    Entries are keyed by a hash of the statement content plus the names and versions of the cached detectors.
+    """
+
+    def __init__(self, path: str):
+        """
+        :param path: path of the sqlite database file
+        """
+        self.path = path
+        self.hits, self.misses = 0, 0
+        self._conn = None
+        self._pending = list()
+        self._lock = threading.Lock()  # engines of the analysis daemon use the cache from several threads
+
+    def _connect(self):
+        if self._conn is None:
+            import sqlite3  # imported on the first use, engines without a result cache do not need it
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.execute('CREATE TABLE IF NOT EXISTS findings (key BLOB PRIMARY KEY, value BLOB NOT NULL)')
+        return self._conn
+
+    @staticmethod
+    def make_key(signature: bytes, line):
+        """
+        :param signature: signature of the cached detectors, see detector_signature()
+        :param line: a line or virtual statement object
+        :return: the cache key of the line
+        """
+        h = hashlib.blake2b(signature, digest_size=16)
+        h.update(line.content.encode('utf-8', 'surrogatepass'))
+        if isinstance(line, VirtualStatement):
+            # the same content may be split into sub-lines differently, e.g. after removing comments
+            h.update(','.join(str(len(sub_line.content)) for sub_line in line.sub_lines).encode())
+        return h.digest()
+
+    def get(self, key: bytes):
+        """
+        :return: a list of (detector name, line position, bug instance) tuples, or None if missing
+        """
+        with self._lock:
+            row = self._connect().execute('SELECT value FROM findings WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return pickle.loads(row[0])
+
+    def put(self, key: bytes, findings: list):
+        """
+        Store findings of a statement. They are written to disk by flush().
+        :param key: the cache key of the statement
+        :param findings: a list of (detector name, line position, bug instance) tuples
+        """
+        value = pickle.dumps(findings, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._pending.append((key, value))
+
+    def flush(self):
+        with self._lock:
+            if self._pending:
+                conn = self._connect()
+                with conn:
+                    conn.executemany('INSERT OR REPLACE INTO findings (key, value) VALUES (?, ?)', self._pending)
+                self._pending = list()
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def __getstate__(self):
+        # connections are not shared with worker processes
+        return {'path': self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state['path'])
+
+
+def detector_signature(detectors: dict):
+    """
+    :param detectors: a dict of detector name to detector object whose findings are cached
+    :return: bytes identifying the detectors, their versions and the priorities they report
+    """
+    return ';'.join(f'{name}:{detector.version}' if detector.priority_bound == IGNORE_PRIORITY
+                    else f'{name}:{detector.version}@{detector.priority_bound}'
+                    for name, detector in detectors.items()).encode()
+
+
+def line_position(line, line_no: int):
+    """
+    Locate a reported line number relative to a line or virtual statement, so it can be rebuilt for another
+    statement with the same content
+    :return: ('sub', index of the sub-line) if possible, else ('delta', offset from the first line number)
+    """
+    if isinstance(line, VirtualStatement):
+        for i, sub_line in enumerate(line.sub_lines):
+            if sub_line.lineno[1] == line_no:
+                return 'sub', i
+    return 'delta', line_no - line.lineno[1]
+
+
+def resolve_line_position(line, position: tuple):
+    kind, value = position
+    if kind == 'sub':
+        return line.sub_lines[value].lineno[1]
+    return line.lineno[1] + value
@@ -0,0 +1,76 @@
+import sqlite3
+import time
+
+DEFAULT_TTL = 24 * 60 * 60  # seconds
+
+
+class SearchCache:
+    """
+    An on-disk cache of GitHub API responses, shared by processes and runs.
+    Entries are keyed by (repository, query url). Fresh entries are used without any request; stale entries are
+    revalidated with conditional requests, which do not count against the rate limit of GitHub when unchanged.
+    """
+
+    def __init__(self, path: str, ttl=DEFAULT_TTL):
+        """
+        :param path: path of the sqlite database file
+        :param ttl: seconds for which a response is used without revalidation
+        """
+        self.path = path
+        self.ttl = ttl
+        self.hits, self.revalidated, self.misses = 0, 0, 0
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.execute('CREATE TABLE IF NOT EXISTS responses (repo TEXT NOT NULL, query TEXT NOT NULL, '
+                               'etag TEXT, body BLOB NOT NULL, fetched_at REAL NOT NULL, PRIMARY KEY (repo, query))')
+        return self._conn
+
+    def get(self, repo: str, query: str):
+        """
+        :return: a tuple of (etag, body, fresh), or None if missing
+        """
+        row = self._connect().execute('SELECT etag, body, fetched_at FROM responses WHERE repo = ? AND query = ?',
+                                      (repo, query)).fetchone()
+        if row is None:
+            return None
+        etag, body, fetched_at = row
+        return etag, body, time.time() - fetched_at < self.ttl
+
+    def put(self, repo: str, query: str, etag, body: bytes):
+        conn = self._connect()
+        with conn:
+            conn.execute('INSERT OR REPLACE INTO responses (repo, query, etag, body, fetched_at) VALUES (?, ?, ?, ?, ?)',
+                         (repo, query, etag, body, time.time()))
+
+    def touch(self, repo: str, query: str):
+        """
+        Mark an entry as fresh after it has been revalidated
+        """
+        conn = self._connect()
+        with conn:
+            conn.execute('UPDATE responses SET fetched_at = ? WHERE repo = ? AND query = ?', (time.time(), repo, query))
+
+    def clear(self, repo=None):
+        conn = self._connect()
+        with conn:
+            if repo is None:
+                conn.execute('DELETE FROM responses')
+            else:
+                conn.execute('DELETE FROM responses WHERE repo = ?', (repo,))
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __getstate__(self):
+        # connections are not shared with worker processes
+        return {'path': self.path, 'ttl': self.ttl}
+
+    def __setstate__(self, state):
+        self.__init__(state['path'], state['ttl'])
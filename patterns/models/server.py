@@ -0,0 +1,324 @@
+"""
+A long-running analysis daemon which keeps engines warm and answers over localhost HTTP or a Unix socket.
+
+    python -m patterns.models.server --port 8765
+    python -m patterns.models.server --unix-socket /tmp/codegex.sock --concurrency 8
+
+POST /analyze with a raw diff (any content type but json), or a json object with one of
+    {"diff": "<git diff>", "sha": "<commit sha>"}
+    {"files": [{"filename": "...", "patch": "@@ ..."}, ...], "sha": "<commit sha>"}   (GitHub files.json)
+and optionally "level", "format", and "included_filter" or "excluded_filter" as lists of detector names. A bare json
+list is read as "files".
+Bug instances are streamed back patch by patch as json lines, followed by a summary line {"done": true, ...}, or
+as a SARIF log with "format": "sarif". If the analysis fails after the response has started, the stream ends with
+{"error": "..."} instead of the summary line, or with an error notification in the SARIF log.
+GET /health returns the status of the daemon.
+"""
+import argparse
+import io
+import json
+import os
+import socket
+import socketserver
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import perf_counter
+
+from gen_detectors import DETECTOR_DICT
+from rparser import parse, iter_diff_stream
+from utils import log_message
+from .context import Context
+from .engine import DefaultEngine, priority_bound
+from .sinks import WRITERS
+
+MAX_BODY_SIZE = 256 * 1024 * 1024
+DEFAULT_LEVEL = 'low'
+
+
+class EnginePool:
+    """
+    Warm engines keyed by detector set and level. At most `size` engines run at a time; an engine is built the first
+    time its detector set is requested while the other engines of the set are busy, and kept afterwards. Engines of
+    the detector sets built by warm() are always kept, those of other sets only for the `max_detector_sets` sets
+    used most recently.
+    """
+
+    def __init__(self, size=4, max_detector_sets=8, **engine_options):
+        """
+        :param size: maximum number of concurrent analyses
+        :param max_detector_sets: maximum number of detector sets, besides the warmed ones, whose idle engines are kept
+        :param engine_options: keyword arguments of DefaultEngine shared by all engines, like regex_timeout
+        """
+        self.size = size
+        self.max_detector_sets = max_detector_sets
+        self.engine_options = engine_options
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._idle = OrderedDict()  # (included_filter, excluded_filter, level) -> a list of idle engines, LRU first
+        self._warmed = set()  # keys of the detector sets built by warm()
+
+    @staticmethod
+    def _key(included_filter, excluded_filter, level):
+        return tuple(included_filter or ()), tuple(sorted(excluded_filter or ())), level or None
+
+    def _build(self, key):
+        included_filter, excluded_filter, level = key
+        return DefaultEngine(Context(), included_filter=included_filter, excluded_filter=excluded_filter, level=level,
+                             **self.engine_options)
+
+    def warm(self, included_filter=None, excluded_filter=None, count=1, level=None):
+        """
+        Build engines of a detector set ahead of requests
+        """
+        key = self._key(included_filter, excluded_filter, level)
+        engines = [self._build(key) for _ in range(count)]
+        with self._lock:
+            self._warmed.add(key)
+            self._idle.setdefault(key, list()).extend(engines)
+
+    @contextmanager
+    def engine(self, included_filter=None, excluded_filter=None, level=None):
+        """
+        Borrow an engine of a detector set, which may skip detectors below the level, waiting while `size` analyses
+        are running
+        """
+        key = self._key(included_filter, excluded_filter, level)
+        with self._slots:
+            with self._lock:
+                idle = self._idle.get(key, None)
+                engine = idle.pop() if idle else None
+            if engine is None:
+                engine = self._build(key)
+            try:
+                yield engine
+            finally:
+                with self._lock:
+                    self._idle.setdefault(key, list()).append(engine)
+                    self._idle.move_to_end(key)
+                    self._evict()
+
+    def _evict(self):
+        """
+        Drop the idle engines of the least recently used detector sets which are not warmed, the lock must be held
+        """
+        unwarmed = [key for key in self._idle if key not in self._warmed]
+        for key in unwarmed[:max(len(unwarmed) - self.max_detector_sets, 0)]:
+            del self._idle[key]
+
+    def stats(self):
+        with self._lock:
+            return {'detector_sets': len(self._idle), 'idle_engines': sum(map(len, self._idle.values()))}
+
+
+def read_patches(body: bytes, content_type: str):
+    """
+    :param body: a raw diff, or a json payload described in the module docstring
+    :return: (patches, options) where options is a dict of 'level', 'included_filter', 'excluded_filter' and 'format'
+    :raise ValueError: if the payload is malformed
+    """
+    if 'json' not in content_type:
+        return list(iter_diff_stream(io.StringIO(body.decode('utf-8', 'replace'), newline=''))), dict()
+
+    payload = json.loads(body)
+    if isinstance(payload, list):
+        payload = {'files': payload}
+    if not isinstance(payload, dict):
+        raise ValueError('expect a json object or a list of files')
+
+    sha = payload.get('sha', '')
+    if 'diff' in payload:
+        patches = list(iter_diff_stream(io.StringIO(payload['diff'], newline=''), sha))
+    elif 'files' in payload:
+        patches = list()
+        for file in payload['files']:
+            if file.get('patch'):  # binary files have no patch
+                patch = parse(file['patch'], name=file.get('filename', ''))
+                patch.sha = sha
+                patches.append(patch)
+    else:
+        raise ValueError('expect "diff" or "files"')
+    options = {key: payload[key] for key in ('level', 'included_filter', 'excluded_filter', 'format')
+               if key in payload}
+    for key in ('included_filter', 'excluded_filter'):
+        names = options.get(key, None)
+        if names is None:
+            continue
+        if not isinstance(names, list) or not all(isinstance(name, str) for name in names):
+            raise ValueError(f'expect "{key}" to be a list of detector names')
+        unknown = [name for name in names if name not in DETECTOR_DICT]
+        if unknown:
+            raise ValueError(f'unknown detectors in "{key}": {", ".join(unknown)}')
+    return patches, options
+
+
+class AnalysisHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # responses of /analyze are chunked, so connections can be kept alive
+
+    def setup(self):
+        # send small chunks at once rather than waiting for acks, TCP only
+        self.disable_nagle_algorithm = self.request.family != socket.AF_UNIX
+        BaseHTTPRequestHandler.setup(self)
+
+    def do_GET(self):
+        if self.path != '/health':
+            self._send_json(404, {'error': 'not found'})
+            return
+        self._send_json(200, dict(status='ok', **self.server.pool.stats()))
+
+    def do_POST(self):
+        if self.path != '/analyze':
+            self._send_json(404, {'error': 'not found'})
+            return
+        length = int(self.headers.get('Content-Length', 0))
+        if length > MAX_BODY_SIZE:
+            self._send_json(413, {'error': 'payload too large'})
+            self.close_connection = True
+            return
+        body = self.rfile.read(length)
+
+        start = perf_counter()
+        try:
+            patches, options = read_patches(body, self.headers.get('Content-Type', ''))
+        except (ValueError, TypeError, AttributeError) as e:
+            self._send_json(400, {'error': f'invalid payload: {e}'})
+            return
+
+        output_format = options.get('format', 'jsonl')
+        if output_format not in WRITERS:
+            self._send_json(400, {'error': f'invalid format: {output_format}, hint: {", ".join(WRITERS)}'})
+            return
+
+        level = options.get('level', DEFAULT_LEVEL)
+        try:
+            priority_bound(level)
+        except ValueError as e:
+            self._send_json(400, {'error': str(e)})
+            return
+
+        with self.server.pool.engine(options.get('included_filter'), options.get('excluded_filter'), level) as engine:
+            try:
+                bugs = engine.iter_bugs(*patches, level=level)
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/sarif+json' if output_format == 'sarif'
+                                 else 'application/x-ndjson')
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+                chunked = _ChunkedStream(self.wfile)
+                writer = WRITERS[output_format](chunked)
+                failed = False
+                try:
+                    # bug instances of a patch are sent as soon as it is checked
+                    writer.write_all(bugs)
+                except (BrokenPipeError, ConnectionResetError):
+                    self.close_connection = True  # the client is gone
+                    return
+                except Exception as e:
+                    failed = True
+                    log_message(f'[Server] analysis failed: {e!r}', 'error')
+                    writer.write_error(f'analysis failed: {e!r}')
+                writer.close()
+            finally:
+                # do not keep the patches of the request in an idle engine
+                engine.context.set_patch_set(tuple())
+        if output_format == 'jsonl' and not failed:
+            chunked.write(json.dumps({'done': True, 'patches': len(patches), 'bugs': writer.count,
+                                      'elapsed_ms': (perf_counter() - start) * 1e3}) + '\n')
+        self.wfile.write(b'0\r\n\r\n')
+
+    def _send_json(self, status: int, obj):
+        data = json.dumps(obj).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def address_string(self):
+        return self.client_address[0] if self.client_address else 'unix'
+
+    def log_message(self, format, *args):
+        log_message(f'[Server] {self.address_string()} {format % args}', 'debug')
+
+
+class _ChunkedStream:
+    """
+    A text stream which sends each write as a chunk of a chunked response
+    """
+
+    def __init__(self, wfile):
+        self.wfile = wfile
+
+    def write(self, text: str):
+        if text:
+            data = text.encode('utf-8')
+            self.wfile.write(b'%x\r\n%s\r\n' % (len(data), data))
+
+    def flush(self):
+        self.wfile.flush()
+
+
+class AnalysisServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, pool: EnginePool):
+        self.pool = pool
+        ThreadingHTTPServer.__init__(self, address, AnalysisHandler)
+
+
+class UnixAnalysisServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: str, pool: EnginePool):
+        self.pool = pool
+        if os.path.exists(path):
+            os.remove(path)  # a stale socket of a previous daemon
+        socketserver.UnixStreamServer.__init__(self, path, AnalysisHandler)
+
+    def server_close(self):
+        socketserver.UnixStreamServer.server_close(self)
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+
+
+def create_server(host='127.0.0.1', port=8765, unix_socket=None, concurrency=4, warm=True, **engine_options):
+    """
+    :param unix_socket: path of a Unix socket to listen on instead of host and port
+    :param concurrency: maximum number of concurrent analyses
+    :param warm: whether to build engines with all detectors for the default level before serving
+    :param engine_options: keyword arguments of DefaultEngine, like regex_timeout
+    :return: a server object, call serve_forever() to run it
+    """
+    pool = EnginePool(concurrency, **engine_options)
+    if warm:
+        pool.warm(count=concurrency, level=DEFAULT_LEVEL)
+    if unix_socket:
+        return UnixAnalysisServer(unix_socket, pool)
+    return AnalysisServer((host, port), pool)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m patterns.models.server',
+                                     description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix-socket', help='listen on a Unix socket instead of host and port')
+    parser.add_argument('--concurrency', type=int, default=4, help='maximum number of concurrent analyses')
+    parser.add_argument('--regex-timeout', type=float, help='time budget in seconds of a detector on a statement')
+    parser.add_argument('--added-only', action='store_true', help='only check statements containing added lines')
+    args = parser.parse_args(argv)
+
+    server = create_server(args.host, args.port, args.unix_socket, args.concurrency, regex_timeout=args.regex_timeout,
+                           added_only=args.added_only)
+    log_message(f'[Server] listening on {args.unix_socket or f"{args.host}:{args.port}"}', 'info')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+"""
+Writers which output each bug instance as soon as it is given, e.g. by DefaultEngine.iter_bugs(), so that findings of
+a large patch set are never held in memory at once.
+
+    with open('bugs.sarif', 'w', encoding='utf-8') as f, SarifWriter(f) as sink:
+        sink.write_all(engine.iter_bugs(*patch_set, level='medium'))
+"""
+import json
+
+from .bug_instance import BugInstance, confidence_map
+from .priorities import HIGH_PRIORITY, MEDIUM_PRIORITY
+
+SARIF_VERSION = '2.1.0'
+SARIF_SCHEMA = 'https://json.schemastore.org/sarif-2.1.0.json'
+TOOL_NAME = 'Codegex'
+TOOL_URI = 'https://github.com/codegex-analysis/Codegex'
+
+
+class BugWriter:
+    """
+    Base class of writers. A writer writes to a text stream opened by the caller, and does not close it.
+    """
+
+    def __init__(self, stream, flush=True):
+        """
+        :param stream: a text stream with write() and flush(), like an opened file or sys.stdout
+        :param flush: whether to flush the stream after each bug instance, so that readers see it at once
+        """
+        self.stream = stream
+        self.flush = flush
+        self.count = 0  # number of bug instances written
+        self.closed = False
+
+    def write(self, bug_ins: BugInstance):
+        self._write(bug_ins)
+        self.count += 1
+        if self.flush:
+            self.stream.flush()
+
+    def write_all(self, bugs):
+        """
+        :param bugs: an iterable of bug instances, consumed one by one
+        :return: the number of bug instances written
+        """
+        cnt = 0
+        for bug_ins in bugs:
+            self.write(bug_ins)
+            cnt += 1
+        return cnt
+
+    def write_error(self, message: str):
+        """
+        Record that the analysis failed, so that readers know the output is incomplete
+        """
+        self._write_error(message)
+        if self.flush:
+            self.stream.flush()
+
+    def close(self):
+        """
+        Finish the output, the stream is left open
+        """
+        if not self.closed:
+            self.closed = True
+            self._close()
+            self.stream.flush()
+
+    def _write(self, bug_ins: BugInstance):
+        pass
+
+    def _write_error(self, message: str):
+        pass
+
+    def _close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class JsonLinesWriter(BugWriter):
+    """
+    Write a json object per line, see BugInstance.to_dict()
+    """
+
+    def _write(self, bug_ins: BugInstance):
+        self.stream.write(json.dumps(bug_ins.to_dict()) + '\n')
+
+    def _write_error(self, message: str):
+        self.stream.write(json.dumps({'error': message}) + '\n')
+
+
+class SarifWriter(BugWriter):
+    """
+    Write a SARIF 2.1.0 log of a single run. Results are written as they come; rules of the bug types seen and the
+    invocation, with errors if any, are written by close() after the results, so the log is a valid json document
+    only once the writer is closed.
+    """
+
+    def __init__(self, stream, flush=True):
+        BugWriter.__init__(self, stream, flush)
+        self._rule_index = dict()  # bug type -> index in the rules of the driver
+        self._errors = list()
+        self.stream.write(f'{{"version": "{SARIF_VERSION}", "$schema": "{SARIF_SCHEMA}", "runs": [{{"results": [\n')
+
+    def _write(self, bug_ins: BugInstance):
+        rule_index = self._rule_index.setdefault(bug_ins.type, len(self._rule_index))
+        result = json.dumps(sarif_result(bug_ins, rule_index))
+        self.stream.write(result if self.count == 0 else ',\n' + result)
+
+    def _write_error(self, message: str):
+        self._errors.append(message)
+
+    def _close(self):
+        driver = {'name': TOOL_NAME, 'informationUri': TOOL_URI,
+                  'rules': [{'id': bug_type} for bug_type in self._rule_index]}
+        invocation = {'executionSuccessful': not self._errors}
+        if self._errors:
+            invocation['toolExecutionNotifications'] = [{'level': 'error', 'message': {'text': message}}
+                                                        for message in self._errors]
+        self.stream.write('\n], "tool": {"driver": %s}, "invocations": [%s]}]}\n'
+                          % (json.dumps(driver), json.dumps(invocation)))
+
+
+def sarif_level(priority: int):
+    """
+    :return: the SARIF level of a priority
+    """
+    if priority <= HIGH_PRIORITY:
+        return 'error'
+    if priority <= MEDIUM_PRIORITY:
+        return 'warning'
+    return 'note'
+
+
+def sarif_result(bug_ins: BugInstance, rule_index=None):
+    """
+    :param rule_index: index of the rule of the bug type in the rules of the driver
+    :return: a json-serializable dict of a SARIF result object
+    """
+    location = {'artifactLocation': {'uri': bug_ins.file_name}}
+    if bug_ins.line_no and bug_ins.line_no > 0:
+        location['region'] = {'startLine': bug_ins.line_no, 'snippet': {'text': bug_ins.line_content}}
+    result = {'ruleId': bug_ins.type, 'level': sarif_level(bug_ins.priority),
+              'message': {'text': bug_ins.description}, 'locations': [{'physicalLocation': location}],
+              'properties': {'confidence': confidence_map[bug_ins.priority]}}
+    if rule_index is not None:
+        result['ruleIndex'] = rule_index
+    if bug_ins.commit_sha:
+        result['properties']['commitSha'] = bug_ins.commit_sha
+    return result
+
+
+WRITERS = {'jsonl': JsonLinesWriter, 'sarif': SarifWriter}
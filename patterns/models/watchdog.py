@@ -0,0 +1,83 @@
+from time import perf_counter
+
+import regex
+
+
+class RegexBudget:
+    """
+    Time budget of a single `match()` call, shared by all watched patterns of the detectors of an engine
+    """
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.deadline = None
+
+    def start(self):
+        self.deadline = perf_counter() + self.seconds
+
+    def expired(self):
+        return self.deadline is not None and perf_counter() >= self.deadline
+
+    def remaining(self):
+        """
+        :return: the remaining seconds of the budget
+        :raise TimeoutError: if the budget is used up
+        """
+        if self.deadline is None:
+            return None
+        remaining = self.deadline - perf_counter()
+        if remaining <= 0:
+            raise TimeoutError('regex timed out')
+        return remaining
+
+
+class WatchedPattern:
+    """
+    A proxy of a compiled `regex` pattern that passes the remaining budget as `timeout` to every matching call.
+    The `regex` module raises TimeoutError once the timeout is reached, even in the middle of backtracking.
+    """
+    __slots__ = ('pattern', 'budget')
+
+    def __init__(self, pattern, budget: RegexBudget):
+        self.pattern = pattern
+        self.budget = budget
+
+    def search(self, string, *args, **kwargs):
+        return self.pattern.search(string, *args, timeout=self.budget.remaining(), **kwargs)
+
+    def match(self, string, *args, **kwargs):
+        return self.pattern.match(string, *args, timeout=self.budget.remaining(), **kwargs)
+
+    def fullmatch(self, string, *args, **kwargs):
+        return self.pattern.fullmatch(string, *args, timeout=self.budget.remaining(), **kwargs)
+
+    def finditer(self, string, *args, **kwargs):
+        return self.pattern.finditer(string, *args, timeout=self.budget.remaining(), **kwargs)
+
+    def findall(self, string, *args, **kwargs):
+        return self.pattern.findall(string, *args, timeout=self.budget.remaining(), **kwargs)
+
+    def sub(self, repl, string, *args, **kwargs):
+        return self.pattern.sub(repl, string, *args, timeout=self.budget.remaining(), **kwargs)
+
+    def subn(self, repl, string, *args, **kwargs):
+        return self.pattern.subn(repl, string, *args, timeout=self.budget.remaining(), **kwargs)
+
+    def split(self, string, *args, **kwargs):
+        return self.pattern.split(string, *args, timeout=self.budget.remaining(), **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.pattern, name)
+
+
+def watch_patterns(detector, budget: RegexBudget):
+    """
+    Replace `regex` patterns stored as attributes of the detector with watched patterns.
+    Patterns of the standard `re` module do not support timeout and are kept as they are.
+    :param detector: a detector object
+    :param budget: budget shared by the watched patterns
+    :return: None
+    """
+    for name, value in list(vars(detector).items()):
+        if isinstance(value, regex.Pattern):
+            setattr(detector, name, WatchedPattern(value, budget))
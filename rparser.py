@@ -1,7 +1,12 @@
 import copy
+import mmap
+import os
 import re
+from bisect import bisect_left
 from io import StringIO
-from utils import logger, get_string_ranges, in_range
+from itertools import accumulate
+from lexer import tokenize, string_ranges, strip_comments
+from utils import logger, get_generic_type_ranges
 import traceback
 
 
@@ -32,6 +37,9 @@ class Hunk:
 
 
 class Line:
+    __slots__ = ('_src_lineno', '_tgt_lineno', 'prefix', 'content', '_tokens', '_tokens_of', '_string_ranges', '_string_ranges_of',
+                 '_generic_type_ranges', '_generic_type_ranges_of')
+
     def __init__(self, content, lineno=(-1, -1), is_patch=True):  # lineno的第一位是src里的lineno,第二位是tgt里的lineno
         self.lineno = lineno
         if is_patch and len(content) > 1:
@@ -41,6 +49,53 @@ class Line:
         else:
             self.prefix = ''
             self.content = content
+        # lazily computed analysis of content, recomputed if content is replaced
+        self._tokens, self._tokens_of = None, None
+        self._string_ranges, self._string_ranges_of = None, None
+        self._generic_type_ranges, self._generic_type_ranges_of = None, None
+
+    @property
+    def lineno(self):
+        """
+        :return: a tuple of line numbers in the source and target file, -1 if the line is absent from the file
+        """
+        return self._src_lineno, self._tgt_lineno
+
+    @lineno.setter
+    def lineno(self, lineno: tuple):
+        # two slots take less memory than a tuple per line
+        self._src_lineno, self._tgt_lineno = lineno
+
+    @property
+    def tokens(self):
+        """
+        :return: tokens of content, see lexer.tokenize
+        """
+        content = self.content
+        if self._tokens_of is not content:
+            self._tokens, self._tokens_of = tokenize(content), content
+        return self._tokens
+
+    @property
+    def string_ranges(self):
+        """
+        :return: offset ranges of string literals in content
+        """
+        content = self.content
+        if self._string_ranges_of is not content:
+            self._string_ranges = string_ranges(self.tokens) if '"' in content else []
+            self._string_ranges_of = content
+        return self._string_ranges
+
+    @property
+    def generic_type_ranges(self):
+        """
+        :return: offset ranges of `<...>` pairs in content, see utils.get_generic_type_ranges
+        """
+        content = self.content
+        if self._generic_type_ranges_of is not content:
+            self._generic_type_ranges, self._generic_type_ranges_of = get_generic_type_ranges(content), content
+        return self._generic_type_ranges
 
     def __str__(self):
         if self.prefix:
@@ -54,19 +109,63 @@ class VirtualStatement(Line):
     A virtual statement contains multiple lines ending with '\n'.
     It ends with ';', '{' or '}'. Its prefix should be set manually.
     """
+    __slots__ = ('sub_lines', '_fragments', '_content', '_sub_line_ends', '_shared_lists')
 
     def __init__(self, line_obj: Line):
+        self._fragments, self._content = [], ''  # content is joined from fragments lazily
+        self._shared_lists = False  # whether the lists are shared with a fork, i.e. must be copied before writing
         super().__init__('', line_obj.lineno)
         self.sub_lines = []
+        self._sub_line_ends = None  # cumulative lengths of sub-lines, computed lazily
         self.append_sub_line(line_obj)
 
+    @property
+    def content(self):
+        if self._content is None:
+            self._content = ''.join(self._fragments)
+            self._fragments = [self._content]  # a new list, sub_lines may still be shared with a fork
+        return self._content
+
+    @content.setter
+    def content(self, value: str):
+        self._own_lists()
+        self._fragments, self._content = [value], value
+
+    def fork(self):
+        """
+        Copy the statement in O(1), e.g. to continue a common statement with deleted and added lines separately.
+        Sub-line objects are shared, the lists of them and of content fragments are copied on the first write of
+        either statement.
+        """
+        # copy.copy() would read the content property, i.e. join the fragments
+        vt_stmt = VirtualStatement.__new__(VirtualStatement)
+        vt_stmt._src_lineno, vt_stmt._tgt_lineno, vt_stmt.prefix = self._src_lineno, self._tgt_lineno, self.prefix
+        vt_stmt.sub_lines, vt_stmt._fragments, vt_stmt._content = self.sub_lines, self._fragments, self._content
+        vt_stmt._sub_line_ends = self._sub_line_ends
+        vt_stmt._tokens, vt_stmt._tokens_of = self._tokens, self._tokens_of
+        vt_stmt._string_ranges, vt_stmt._string_ranges_of = self._string_ranges, self._string_ranges_of
+        vt_stmt._generic_type_ranges, vt_stmt._generic_type_ranges_of = \
+            self._generic_type_ranges, self._generic_type_ranges_of
+        self._shared_lists = vt_stmt._shared_lists = True
+        return vt_stmt
+
+    def _own_lists(self):
+        if self._shared_lists:
+            self.sub_lines = list(self.sub_lines)
+            self._fragments = list(self._fragments)
+            self._shared_lists = False
+
     def append_sub_line(self, line_obj: Line):
+        self._own_lists()
         self.sub_lines.append(line_obj)
-        self.content += line_obj.content
+        self._fragments.append(line_obj.content)
+        self._content, self._sub_line_ends = None, None
 
     def merge_vt_stmt(self, vt_stmt):
+        self._own_lists()
         self.sub_lines.extend(vt_stmt.sub_lines)
-        self.content += vt_stmt.content
+        self._fragments.extend(vt_stmt._fragments)
+        self._content, self._sub_line_ends = None, None
 
     def get_exact_lineno_by_keyword(self, key: str):
         """
@@ -86,21 +185,25 @@ class VirtualStatement(Line):
         :param if_strip: if true, left strip the first sub-line and right strip the last sub-line
         :return: lineno of Line object, or None for invalid offset
         """
-        size = len(self.sub_lines)
-        i = 0
-        while i < size:
-            if i == 0 and if_strip:
-                offset -= len(self.sub_lines[i].content.lstrip())
-            elif i == size - 1 and if_strip:
-                offset -= len(self.sub_lines[i].content.rstrip())
-            else:
-                offset -= len(self.sub_lines[i].content)
-
-            if offset <= 0:
-                return self.sub_lines[i].lineno
-
-            i += 1
-        return None
+        if self._sub_line_ends is None:
+            self._sub_line_ends = list(accumulate(len(line.content) for line in self.sub_lines))
+        ends, size = self._sub_line_ends, len(self.sub_lines)
+        if size == 0:
+            return None
+
+        last_end = ends[-1]
+        if if_strip:
+            first = self.sub_lines[0].content
+            offset += len(first) - len(first.lstrip())
+            if size > 1:
+                last = self.sub_lines[-1].content
+                last_end -= len(last) - len(last.rstrip())
+
+        # the first sub-line whose end is not before the offset
+        i = bisect_left(ends, offset, 0, size - 1)
+        if i == size - 1 and offset > last_end:
+            return None
+        return self.sub_lines[i].lineno
 
 
 class Patch:
@@ -113,6 +216,7 @@ class Patch:
         self.hunks = []
         self.type = None
         self.sha = ''
+        self.blobs = None  # (source blob id, target blob id) from the 'index' line of a git diff
 
     def __iter__(self):
         for h in self.hunks:
@@ -122,9 +226,6 @@ class Patch:
 # --------------------------------------------------------------------------------------
 re_stmt_end = re.compile(r'[;{}]\s*$')
 re_annotation = re.compile(r'^@[\w\_$]+(?:\(.*\))?$')
-ann_left = re.compile(r'/\*')
-ann_right = re.compile(r'\*/')
-ann_slash = re.compile(r'//')
 
 
 def _check_statement_end(line: str):
@@ -216,10 +317,11 @@ def _skip_started_incomplete_multi_line_comments(comment_end_line_obj: Line, hun
 def _parse_hunk(stream, is_patch, hunk=None):
     """
     Parse the content of a hunk
-    :param stream: content to parse, exclude hunk header (i.e. '@@ -d,d +d,d @@')
+    :param stream: content to parse, exclude hunk header (i.e. '@@ -d,d +d,d @@'), or an iterable of its lines
     :param hunk: a hunk object with info
     :return: the hunk object
     """
+    lines = StringIO(stream) if isinstance(stream, str) else stream
     cnt_dict = {'linessrc': hunk.startsrc - 1, 'linestgt': hunk.starttgt - 1}
 
     # init statement. Priority: del_statement == add_statement > common_statement
@@ -230,24 +332,11 @@ def _parse_hunk(stream, is_patch, hunk=None):
     incomplete_common_statement = [False, False]
     all_lines_start_with_star = True
 
-    for line in StringIO(stream):
+    for line in lines:
         line_obj = Line(line, is_patch=is_patch)
 
         # remove single-line annotation from line content
-        string_ranges = get_string_ranges(line_obj.content)
-
-        left_stars = [m for m in ann_left.finditer(line_obj.content) if not in_range(m.start(), string_ranges)]
-        right_stars = [m for m in ann_right.finditer(line_obj.content) if not in_range(m.start(), string_ranges)]
-        if left_stars and right_stars:
-            left, right = left_stars[0], right_stars[-1]
-            if left.end()-1 != right.start():  # fix "/*/"
-                old_content = line_obj.content
-                line_obj.content = old_content[:left.start()] + old_content[right.end():]
-                string_ranges = get_string_ranges(line_obj.content)
-
-        slash_starts = [m.start() for m in ann_slash.finditer(line_obj.content) if not in_range(m.start(), string_ranges)]
-        if slash_starts:
-            line_obj.content = line_obj.content[:slash_starts[0]]
+        line_obj.content = strip_comments(line_obj.content)
 
         # trim empty line, it will be skip in following branches
         strip_content = line_obj.content.strip()
@@ -276,7 +365,7 @@ def _parse_hunk(stream, is_patch, hunk=None):
                 # then goto reset common_statement
             elif del_multi_comment:
                 if not del_statement and common_statement:
-                    del_statement = copy.deepcopy(common_statement)
+                    del_statement = common_statement.fork()
 
                 if _check_multiline_comment_end(line_obj.content):
                     _finish_vt_statement(line_obj, del_statement, hunk, '-')
@@ -300,14 +389,14 @@ def _parse_hunk(stream, is_patch, hunk=None):
                         continue
                 # line_obj belongs to a del_statement
                 if not del_statement and common_statement:
-                    del_statement = copy.deepcopy(common_statement)
+                    del_statement = common_statement.fork()
                 _finish_vt_statement(line_obj, del_statement, hunk, '-')
                 del_statement = None
             else:
                 # if line_obj is a incomplete statement, it must belong to del_statement
                 if not del_statement:
                     if common_statement:
-                        del_statement = copy.deepcopy(common_statement)
+                        del_statement = common_statement.fork()
                         del_statement.append_sub_line(line_obj)
                     else:
                         del_statement = VirtualStatement(line_obj)
@@ -331,7 +420,7 @@ def _parse_hunk(stream, is_patch, hunk=None):
                 # then goto reset common_statement
             elif add_multi_comment:
                 if not add_statement and common_statement:
-                    add_statement = copy.deepcopy(common_statement)
+                    add_statement = common_statement.fork()
 
                 if _check_multiline_comment_end(line_obj.content):
                     _finish_vt_statement(line_obj, add_statement, hunk, '+')
@@ -356,14 +445,14 @@ def _parse_hunk(stream, is_patch, hunk=None):
 
                 # line_obj belongs to a add_statement
                 if common_statement and not add_statement:
-                    add_statement = copy.deepcopy(common_statement)
+                    add_statement = common_statement.fork()
                 _finish_vt_statement(line_obj, add_statement, hunk, '+')
                 add_statement = None
             else:
                 # if line_obj is a incomplete statement, it must belong to add_statement
                 if not add_statement:
                     if common_statement:
-                        add_statement = copy.deepcopy(common_statement)
+                        add_statement = common_statement.fork()
                         add_statement.append_sub_line(line_obj)
                     else:
                         add_statement = VirtualStatement(line_obj)
@@ -420,7 +509,7 @@ def _parse_hunk(stream, is_patch, hunk=None):
                     del_statement.append_sub_line(line_obj)
 
                     # code branch: turn common line to added line
-                    line_obj = copy.deepcopy(line_obj)
+                    line_obj = copy.copy(line_obj)
                     line_obj.prefix = '+'
 
                     if _check_statement_end(line_obj.content):
@@ -447,7 +536,7 @@ def _parse_hunk(stream, is_patch, hunk=None):
                     add_statement.append_sub_line(line_obj)
 
                     # code branch: turn common line to added line
-                    line_obj = copy.deepcopy(line_obj)
+                    line_obj = copy.copy(line_obj)
                     line_obj.prefix = '-'
 
                     if _check_statement_end(line_obj.content):
@@ -520,6 +609,52 @@ def _parse_hunk(stream, is_patch, hunk=None):
 re_hunk_start = re.compile(r'@@ -(\d+),?(\d+)? \+(\d+),?(\d+)? @@[^\n]*\n')
 
 
+def _new_hunk(match):
+    g = match.groups()
+    startsrc = int(g[0])
+    linessrc = int(g[1]) if g[1] else 0  # fix case like '@@ -1 +1,21 @@'
+    starttgt = int(g[2])
+    linestgt = int(g[3]) if g[3] else 0
+    return Hunk(startsrc, linessrc, starttgt, linestgt)
+
+
+def iter_parse(lines, is_patch=True):
+    """
+    Parse modifications of a file incrementally, keeping only the lines of the current hunk in memory
+    :param lines: a file object or an iterable of lines (ending with '\n') of a patch or a hunk
+    :param is_patch: lines contain hunk headers like '@@ -d,d +d,d @@' or not
+    :return: a generator of hunk objects, each yielded as soon as the header of the next hunk or the end is read.
+             If a hunk is malformed, it is yielded with the lines parsed so far, then the exception is raised.
+    """
+    if not is_patch:
+        yield from _iter_parsed_hunk(lines, is_patch, Hunk())
+        return
+
+    hunk, hunk_lines = None, []
+    for line in lines:
+        m = re_hunk_start.match(line) if line.startswith('@@') else None
+        if m:
+            if hunk is not None:
+                yield from _iter_parsed_hunk(hunk_lines, is_patch, hunk)
+            hunk, hunk_lines = _new_hunk(m), []
+        elif hunk is not None:  # lines before the first hunk header are skipped
+            hunk_lines.append(line)
+    if hunk is not None:
+        yield from _iter_parsed_hunk(hunk_lines, is_patch, hunk)
+
+
+def _iter_parsed_hunk(lines, is_patch, hunk):
+    """
+    Yield the hunk once parsed, or with the lines parsed so far before raising if parsing fails
+    """
+    try:
+        _parse_hunk(lines, is_patch, hunk)
+    except Exception:
+        yield hunk
+        raise
+    yield hunk
+
+
 def parse(stream, is_patch=True, name=''):
     """
     parse modifications of a file
@@ -532,28 +667,252 @@ def parse(stream, is_patch=True, name=''):
     patch = Patch()
     patch.name = name
     try:
-        if not is_patch:
-            patch.hunks.append(_parse_hunk(stream, is_patch, Hunk()))
-        else:
-            hunk_bounds = []
-
-            matches = re_hunk_start.finditer(stream)
-            for match in matches:
-                g = match.groups()
-                startsrc = int(g[0])
-                linessrc = int(g[1]) if g[1] else 0  # fix case like '@@ -1 +1,21 @@'
-                starttgt = int(g[2])
-                linestgt = int(g[3]) if g[3] else 0
-
-                patch.hunks.append(Hunk(startsrc, linessrc, starttgt, linestgt))
-                hunk_bounds.append((match.start(), match.end()))
-
-            last_end = hunk_bounds[0][1]
-            for i in range(1, len(hunk_bounds)):
-                hunk_content = stream[last_end:hunk_bounds[i][0]]
-                _parse_hunk(hunk_content, is_patch, patch.hunks[i - 1])
-                last_end = hunk_bounds[i][1]
-            _parse_hunk(stream[last_end:], is_patch, patch.hunks[-1])
+        for hunk in iter_parse(StringIO(stream), is_patch):
+            patch.hunks.append(hunk)
     except Exception as e:
         logger.error(f'[Parser Error] {name}\n{e}\n{traceback.format_exc()}')
     return patch
+
+
+# --------------------------------------------------------------------------------------
+#                          Multi-file unified diffs
+# --------------------------------------------------------------------------------------
+# 'diff --git' starts a file, 'From <sha>' (git format-patch) and 'commit <sha>' (git log -p) start a commit
+re_git_diff_header = re.compile(rb'^(?:(diff --git )|(?:From|commit) ([0-9a-f]{40})\b)', re.M)
+re_plain_diff_header = re.compile(rb'^--- [^\n]*\n\+\+\+ ', re.M)
+re_git_diff_names = re.compile(r'diff --git ("?a/.+?"?) ("?b/.+?"?)$')
+re_git_diff_index = re.compile(r'index ([0-9a-f]+)\.\.([0-9a-f]+)')
+re_git_commit_line = re.compile(r'(?:From|commit) ([0-9a-f]{40})\b')
+
+
+def parse_unified_diff(path, sha=''):
+    """
+    Parse a multi-file diff, like the output of 'git diff', 'git log -p', 'git format-patch' or 'diff -ru'
+    :param path: path of the diff file
+    :param sha: commit sha of patches, overridden by 'From <sha>' or 'commit <sha>' lines in the file
+    :return: a list of patch objects, one per file section
+    """
+    return list(iter_unified_diff(path, sha))
+
+
+def iter_unified_diff(path, sha=''):
+    """
+    Parse a multi-file diff file by file. The file is memory-mapped, headers of files are found by scanning the
+    mapped buffer, and only the lines of the current file are decoded.
+    :param path: path of the diff file
+    :param sha: commit sha of patches, overridden by 'From <sha>' or 'commit <sha>' lines in the file
+    :return: a generator of patch objects with name, sha and type ('added', 'removed', 'renamed' or 'modified')
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            if re_git_diff_header.search(buf):
+                sections = _git_diff_sections(buf, sha)
+            else:
+                sections = ((m.start(), sha) for m in re_plain_diff_header.finditer(buf))
+                sections = _close_sections(sections, len(buf))
+
+            for start, end, patch_sha in sections:
+                yield _parse_diff_section(buf, start, end, patch_sha)
+
+
+def iter_diff_stream(lines, sha='', parse_hunks=None):
+    """
+    Parse a multi-file git diff read line by line, e.g. from the output of 'git log -p' through a pipe. Only the lines
+    of the current file are kept in memory.
+    :param lines: an iterable of lines, each ending with '\n'
+    :param sha: commit sha of patches, overridden by 'From <sha>' or 'commit <sha>' lines
+    :param parse_hunks: a function called with each patch after its header is read, hunks of the patch are skipped
+                        without being parsed if it returns False
+    :return: a generator of patch objects with name, sha, type and blobs
+    """
+    patch, header_lines, body_lines = None, None, None
+    for line in lines:
+        if line.startswith('diff --git '):
+            if patch is not None or header_lines is not None:
+                yield _finish_stream_patch(patch, header_lines, body_lines, sha)
+            patch, header_lines, body_lines = None, [line], None
+            continue
+        if line.startswith(('From ', 'commit ')):
+            m = re_git_commit_line.match(line)
+            if m:
+                if patch is not None or header_lines is not None:
+                    yield _finish_stream_patch(patch, header_lines, body_lines, sha)
+                patch, header_lines, body_lines = None, None, None
+                sha = m.group(1)
+                continue
+
+        if header_lines is not None:
+            if not line.startswith('@@ '):
+                header_lines.append(line)
+                continue
+            patch = _new_stream_patch(header_lines, sha)
+            header_lines = None
+            body_lines = list() if parse_hunks is None or parse_hunks(patch) else None
+        if body_lines is not None:
+            body_lines.append(line)
+
+    if patch is not None or header_lines is not None:
+        yield _finish_stream_patch(patch, header_lines, body_lines, sha)
+
+
+def _new_stream_patch(header_lines, sha):
+    patch = Patch()
+    patch.sha = sha
+    _read_diff_header(patch, header_lines)
+    return patch
+
+
+def _finish_stream_patch(patch, header_lines, body_lines, sha):
+    if patch is None:  # no hunks in binary or mode-only changes
+        return _new_stream_patch(header_lines, sha)
+    if body_lines:
+        try:
+            for hunk in iter_parse(_counted_hunk_lines(body_lines)):
+                patch.hunks.append(hunk)
+        except Exception as e:
+            logger.error(f'[Parser Error] {patch.name}\n{e}\n{traceback.format_exc()}')
+    return patch
+
+
+def _git_diff_sections(buf, sha):
+    """
+    :return: a generator of (start, end, sha) of file sections in a git diff
+    """
+    start = None
+    for m in re_git_diff_header.finditer(buf):
+        if start is not None:
+            yield start, m.start(), sha
+            start = None
+        if m.group(1):
+            start = m.start()
+        else:
+            sha = m.group(2).decode()
+    if start is not None:
+        yield start, len(buf), sha
+
+
+def _close_sections(starts, size):
+    """
+    :param starts: an iterable of (start, sha) of sections which end at the start of the next one
+    :return: a generator of (start, end, sha)
+    """
+    last = None
+    for start, sha in starts:
+        if last is not None:
+            yield last[0], start, last[1]
+        last = (start, sha)
+    if last is not None:
+        yield last[0], size, last[1]
+
+
+def _parse_diff_section(buf, start, end, sha):
+    """
+    :param buf: the mapped diff file
+    :param start: offset of the header of the file section
+    :param end: offset of the end of the file section
+    :return: a patch object
+    """
+    body_start = buf.find(b'\n@@ ', start, end)
+    body_start = end if body_start == -1 else body_start + 1  # no hunks in binary or mode-only changes
+    header_lines = buf[start:body_start].decode('utf-8', 'replace').splitlines()
+
+    patch = Patch()
+    patch.sha = sha
+    _read_diff_header(patch, header_lines)
+
+    if body_start < end:
+        try:
+            for hunk in iter_parse(_counted_hunk_lines(_iter_buffer_lines(buf, body_start, end))):
+                patch.hunks.append(hunk)
+        except Exception as e:
+            logger.error(f'[Parser Error] {patch.name}\n{e}\n{traceback.format_exc()}')
+    return patch
+
+
+def _read_diff_header(patch, header_lines):
+    """
+    Fill in name, type and blob ids of a patch from the header lines of a file section of a diff
+    """
+    patch.type = 'modified'
+    src_name, tgt_name = '', ''
+    for line in header_lines:
+        if line.startswith('diff --git '):
+            m = re_git_diff_names.match(line.rstrip('\r\n'))
+            if m:
+                src_name, tgt_name = _strip_diff_name(m.group(1)), _strip_diff_name(m.group(2))
+        elif line.startswith('--- '):
+            src_name = _strip_diff_name(line[4:].rstrip('\r\n'))
+        elif line.startswith('+++ '):
+            tgt_name = _strip_diff_name(line[4:].rstrip('\r\n'))
+        elif line.startswith('index '):
+            m = re_git_diff_index.match(line)
+            if m:
+                patch.blobs = m.groups()
+        elif line.startswith('new file mode'):
+            patch.type = 'added'
+        elif line.startswith('deleted file mode'):
+            patch.type = 'removed'
+        elif line.startswith('rename from'):
+            patch.type = 'renamed'
+    if tgt_name == '/dev/null':
+        patch.type = 'removed'
+    elif src_name == '/dev/null':
+        patch.type = 'added'
+    patch.name = src_name if patch.type == 'removed' else tgt_name
+
+
+def _strip_diff_name(name: str):
+    """
+    :return: the path in a header like 'a/src/A.java' or '"b/src/A B.java"\t2021-01-01 00:00:00', without the prefix
+    """
+    name = name.split('\t', 1)[0]
+    if len(name) > 1 and name[0] == '"' and name[-1] == '"':
+        name = name[1:-1]
+    if name.startswith(('a/', 'b/')):
+        name = name[2:]
+    return name
+
+
+def _iter_buffer_lines(buf, start, end):
+    """
+    :return: a generator of decoded lines in buf[start:end], so that the section is never copied as a whole
+    """
+    pos = start
+    while pos < end:
+        line_end = buf.find(b'\n', pos, end)
+        line_end = end if line_end == -1 else line_end + 1
+        yield buf[pos:line_end].decode('utf-8', 'replace')
+        pos = line_end
+
+
+def _counted_hunk_lines(lines):
+    """
+    Keep hunk headers and the lines counted by them, dropping trailing lines that belong to no hunk, e.g. the
+    signature of git format-patch or 'Only in ...' lines of diff -r
+    """
+    src_left, tgt_left = 0, 0
+    for line in lines:
+        if line.startswith('@@'):
+            m = re_hunk_start.match(line)
+            if m:
+                g = m.groups()
+                src_left = int(g[1]) if g[1] else 1
+                tgt_left = int(g[3]) if g[3] else 1
+                yield line
+                continue
+        if src_left <= 0 and tgt_left <= 0:
+            if line.startswith('\\'):  # '\ No newline at end of file'
+                yield line
+            continue
+
+        prefix = line[:1]
+        if prefix == '-':
+            src_left -= 1
+        elif prefix == '+':
+            tgt_left -= 1
+        elif prefix != '\\':
+            src_left -= 1
+            tgt_left -= 1
+        yield line
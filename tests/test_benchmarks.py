@@ -0,0 +1,46 @@
+from benchmarks.corpus import generate, parse_corpus
+from benchmarks.run import compare, count_statements, run
+from rparser import re_hunk_start
+
+
+def test_generate_is_seeded():
+    assert generate(files=2, hunks=2, lines=20, seed=1) == generate(files=2, hunks=2, lines=20, seed=1)
+    assert generate(files=2, hunks=2, lines=20, seed=1) != generate(files=2, hunks=2, lines=20, seed=2)
+
+
+def test_hunk_headers_count_lines():
+    for name, text in generate(files=3, hunks=4, lines=30, statement_length=3, comment_density=0.5):
+        hunks = list()
+        for line in text.splitlines(keepends=True):
+            m = re_hunk_start.match(line)
+            if m:
+                hunks.append([int(m.group(2)), int(m.group(4)), 0, 0])
+            else:
+                hunks[-1][2] += line[0] != '+'
+                hunks[-1][3] += line[0] != '-'
+        assert len(hunks) == 4
+        assert all(src == src_cnt and tgt == tgt_cnt for src, tgt, src_cnt, tgt_cnt in hunks)
+
+    patches = parse_corpus(generate(files=3, hunks=4, lines=30))
+    assert len(patches) == 3 and count_statements(patches) > 0
+
+
+def test_run_and_compare():
+    results = run(repeat=1, detectors=False, files=2, hunks=2, lines=20)
+    assert results['statements'] > 0 and set(results['metrics']) == {'parse', 'visit', 'visit.added_only'}
+    assert results['bugs_added_only'] <= results['bugs']
+
+    baseline = {'metrics': {'parse': results['metrics']['parse'] * 2, 'visit': results['metrics']['visit'],
+                            'removed': 1.0}}
+    rows, regressions = compare(results, baseline, threshold=0.1)
+    assert [row[0] for row in rows] == ['parse', 'visit']
+    assert regressions == ['parse']
+
+
+def test_run_on_diff_files(tmp_path):
+    path = tmp_path / 'pr.diff'
+    path.write_text(''.join(f'diff --git a/{name} b/{name}\n--- a/{name}\n+++ b/{name}\n{text}'
+                            for name, text in generate(files=2, hunks=2, lines=20)))
+    results = run(repeat=1, detectors=False, diff_paths=[str(path)])
+    assert results['params'] == {'diffs': [str(path)]}
+    assert results['statements'] == count_statements(parse_corpus(generate(files=2, hunks=2, lines=20)))
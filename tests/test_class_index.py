@@ -0,0 +1,55 @@
+import os
+
+import pytest
+
+from patterns.models.class_index import ClassIndex, parse_declarations
+
+
+@pytest.mark.parametrize('source,expected', [
+    ('public class A extends B implements C, java.io.Serializable {', [('A', ['B'], ['C', 'Serializable'])]),
+    ('class A<T extends Comparable<T>>\n    extends Base<T> {', [('A', ['Base'], [])]),
+    ('interface I extends J, K<String> {', [('I', ['J', 'K'], [])]),
+    ('sealed class S permits X, Y {', [('S', [], [])]),
+    ('// class A extends B {\nString s = "class C extends D {";', []),
+    ('class Outer { static class Inner extends Outer { } }', [('Outer', [], []), ('Inner', ['Outer'], [])]),
+])
+def test_parse_declarations(source, expected):
+    assert parse_declarations(source) == expected
+
+
+def _write(path, content):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+
+
+def test_incremental_update(tmp_path):
+    repo, index_path = tmp_path / 'repo', str(tmp_path / 'index.json')
+    _write(repo / 'src/Base.java', 'public class Base { }')
+    _write(repo / 'src/Sub.java', 'public class Sub extends Base implements Runnable { }')
+
+    index = ClassIndex(str(repo), index_path)
+    assert index.update() == 2
+    assert index.subclasses('Base') == {'src/Sub.java'}
+    assert index.implementors('Runnable') == {'src/Sub.java'}
+    assert not index.is_extended('Sub')
+
+    # the persisted index is loaded, unchanged files are not read again
+    index = ClassIndex(str(repo), index_path)
+    assert index.is_extended('Base')
+    assert index.update() == 0
+
+    # touched but unchanged files are hashed only
+    stat = os.stat(repo / 'src/Base.java')
+    os.utime(repo / 'src/Base.java', ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert index.update() == 0
+
+    _write(repo / 'src/Sub.java', 'public class Sub { }')
+    _write(repo / 'src/Other.java', 'public class Other extends Sub { }')
+    assert index.update() == 2
+    assert not index.is_extended('Base')
+    assert index.subclasses('Sub') == {'src/Other.java'}
+
+    os.remove(repo / 'src/Other.java')
+    index.update()
+    assert not index.is_extended('Sub')
+    assert ClassIndex(str(repo), index_path).files.keys() == {'src/Base.java', 'src/Sub.java'}
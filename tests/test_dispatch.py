@@ -0,0 +1,65 @@
+import pytest
+
+from patterns.models.context import Context
+from patterns.models.detectors import Detector
+from patterns.models.dispatch import KeywordDispatcher, trie_pattern
+from patterns.models.engine import DefaultEngine
+from gen_detectors import DETECTOR_DICT
+
+
+class AllOfDetector(Detector):
+    keywords = ('getClass', 'getResource')
+
+
+class AnyOfDetector(Detector):
+    keywords = (('==', '!='),)
+
+
+class AlwaysDetector(Detector):
+    pass
+
+
+params = [
+    ('URL url = getClass().getResource(name);', ['AllOf', 'Always']),
+    ('URL url = getClass();', ['Always']),
+    ('if (a == b) {', ['AnyOf', 'Always']),
+    ('if (a != b && getResource(getClass())) {', ['AllOf', 'AnyOf', 'Always']),
+]
+
+
+@pytest.mark.parametrize('content,expected', params)
+def test_dispatch(content: str, expected: list):
+    dispatcher = KeywordDispatcher({'AllOf': AllOfDetector(), 'AnyOf': AnyOfDetector(), 'Always': AlwaysDetector()})
+    assert [name for name, _ in dispatcher.dispatch(content)] == expected
+    # the second call is served from the selection cache
+    assert [name for name, _ in dispatcher.dispatch(content)] == expected
+
+
+def test_all_detectors_declare_keywords():
+    engine = DefaultEngine(Context())
+    assert len(engine._detectors) == len(DETECTOR_DICT)
+    assert engine._dispatcher.dispatch('int a = 0;\n') != tuple(engine._detectors.items())
+    assert engine._dispatcher.dispatch('\n') == ()
+
+
+def test_overlapping_literals():
+    class PrefixDetector(Detector):
+        keywords = ('get',)
+
+    class OverlapDetector(Detector):
+        keywords = ('Class().',)
+
+    class InnerDetector(Detector):
+        keywords = ('lass',)
+
+    dispatcher = KeywordDispatcher({'AllOf': AllOfDetector(), 'Prefix': PrefixDetector(),
+                                    'Overlap': OverlapDetector(), 'Inner': InnerDetector()})
+    # 'get' is a prefix of 'getClass', 'lass' is inside it, and 'Class().' starts inside it
+    assert [name for name, _ in dispatcher.dispatch('getClass().getResource(name)')] == \
+           ['AllOf', 'Prefix', 'Overlap', 'Inner']
+    assert [name for name, _ in dispatcher.dispatch('getClas')] == ['Prefix']
+    assert [name for name, _ in KeywordDispatcher({'Always': AlwaysDetector()}).dispatch('a')] == ['Always']
+
+
+def test_trie_pattern():
+    assert trie_pattern(('get', 'getClass', 'getResource', '==')) == '(?:==|get(?:(?:Class|Resource))?)'
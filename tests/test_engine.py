@@ -0,0 +1,213 @@
+import glob
+import subprocess
+import sys
+
+import pytest
+
+from patterns.models import priorities
+from patterns.models.context import Context
+from patterns.models.engine import DefaultEngine
+from rparser import parse
+
+
+def _load_data_patches():
+    patches = list()
+    for path in sorted(glob.glob('tests/data/*.java')):
+        with open(path, 'r') as f:
+            patches.append(parse(f.read(), is_patch=False, name=path))
+    return patches
+
+
+def test_parallel_visit():
+    patches = _load_data_patches()
+
+    engine = DefaultEngine(Context())
+    engine.visit(*patches)
+    expected = [str(bug) for bug in engine.bug_accumulator]
+    assert expected
+
+    with DefaultEngine(Context(), processes=2) as parallel_engine:
+        parallel_engine.visit(*patches)
+        assert [str(bug) for bug in parallel_engine.bug_accumulator] == expected
+        # workers stay warm between visits
+        parallel_engine.visit(*patches)
+        assert [str(bug) for bug in parallel_engine.bug_accumulator] == expected
+
+
+def test_parallel_visit_with_patch_set_state():
+    patch_1 = parse('''File expectedFile = new File(getClass().getResource(name).getFile());''', is_patch=False,
+                    name='src/main/java/com/madgag/gif/fmsware/NanoHTTPD.java')
+    patch_2 = parse('''interface Bingo extends OtherClass<String, Integer>, madgag.gif.fmsware.NanoHTTPD, AnotherClass
+    {''', is_patch=False, name='Bingo.java')
+
+    with DefaultEngine(Context(), included_filter=('GetResourceDetector',), processes=2) as engine:
+        engine.visit(patch_1, patch_2)
+        bugs = engine.filter_bugs()
+        assert len(bugs) == 1
+        assert bugs[0].priority == priorities.MEDIUM_PRIORITY  # NanoHTTPD is extended in another patch
+
+
+def test_profile():
+    patches = _load_data_patches()
+
+    engine = DefaultEngine(Context())
+    engine.visit(*patches)
+    assert engine.profile_stats() is None
+
+    engine = DefaultEngine(Context(), profile=True)
+    engine.visit(*patches)
+    stats = engine.profile_stats()
+    assert stats
+    for detector_stats in stats.values():
+        assert detector_stats.calls == sum(detector_stats.histogram)
+        assert detector_stats.max_time <= detector_stats.total_time
+
+    with DefaultEngine(Context(), processes=2, profile=True) as parallel_engine:
+        parallel_engine.visit(*patches)
+        parallel_stats = parallel_engine.profile_stats()
+        assert {name: s.calls for name, s in parallel_stats.items()} == {name: s.calls for name, s in stats.items()}
+
+
+def test_visit_stream():
+    with open('tests/data/DotPlotPanel.java', 'r') as f:
+        source_lines = f.readlines()
+    # a diff of two hunks which add the first and the second half of the file
+    half = len(source_lines) // 2
+    diff_lines = [f'@@ -0,0 +1,{half} @@\n'] + ['+' + line for line in source_lines[:half]]
+    diff_lines += [f'@@ -0,0 +{half + 1},{len(source_lines) - half} @@\n'] + ['+' + line for line in source_lines[half:]]
+
+    patch = parse(''.join(diff_lines), name='DotPlotPanel.java')
+    patch.sha = 'abc'
+    engine = DefaultEngine(Context())
+    engine.visit(patch)
+    expected = [str(bug) for bug in engine.bug_accumulator]
+    assert expected
+
+    stream_engine = DefaultEngine(Context())
+    bugs = stream_engine.visit_stream(iter(diff_lines), name='DotPlotPanel.java', sha='abc')
+    first_bug = next(bugs)  # bugs of the first hunk are yielded before the second hunk is read
+    assert str(first_bug) == expected[0]
+    assert [str(first_bug)] + [str(bug) for bug in bugs] == expected
+    assert [str(bug) for bug in stream_engine.bug_accumulator] == expected
+
+
+def test_visit_stream_facts():
+    # the subclass is declared in the second hunk, after a first use of getResource
+    diff_lines = ['@@ -1,0 +1,1 @@\n', '+URL a = getClass().getResource("a");\n',
+                  '@@ -5,0 +6,1 @@\n', '+class Child extends Parent {\n',
+                  '@@ -9,0 +11,1 @@\n', '+URL b = getClass().getResource("b");\n']
+    engine = DefaultEngine(Context(), included_filter=('GetResourceDetector',))
+    bugs = list(engine.visit_stream(iter(diff_lines), name='src/Parent.java'))
+    assert [(bug.line_no, bug.priority) for bug in bugs] == [(1, priorities.LOW_PRIORITY),
+                                                             (11, priorities.MEDIUM_PRIORITY)]
+
+
+def test_iter_bugs():
+    patches = _load_data_patches()
+    engine = DefaultEngine(Context())
+    engine.visit(*patches)
+    expected = [str(bug) for bug in engine.filter_bugs('low')]
+    assert expected
+
+    bugs = engine.iter_bugs(*patches, level='low')
+    first_bug = next(bugs)
+    # only patches up to the one of the first bug have been checked, and nothing is kept in the engine
+    assert engine.context.cur_patch.name == first_bug.file_name != patches[-1].name
+    assert [str(first_bug)] + [str(bug) for bug in bugs] == expected
+    assert not engine.bug_accumulator
+
+    with DefaultEngine(Context(), processes=2) as parallel_engine:
+        assert [str(bug) for bug in parallel_engine.iter_bugs(*patches, level='low')] == expected
+
+    with pytest.raises(ValueError):
+        engine.iter_bugs(*patches, level='x')
+
+
+NAMING_PATCH = parse('''class lower {
+    public void BadName(int x) {
+        helper.DoWork(x);
+    }
+    void AnotherName() {}
+}
+public class lowerPublic {}''', is_patch=False, name='src/lower.java')
+
+
+def test_best_priorities():
+    patches = _load_data_patches() + [NAMING_PATCH]
+    engine = DefaultEngine(Context())
+    engine.visit(*patches)
+    assert all(detector.best_priorities for detector in engine._detectors.values())
+    assert engine.bug_accumulator
+    for bug in engine.bug_accumulator:
+        declared = [detector.best_priorities[bug.type] for detector in engine._detectors.values()
+                    if bug.type in detector.best_priorities]
+        assert declared and bug.priority >= min(declared), bug.type
+
+
+def test_level_pruning():
+    patches = _load_data_patches() + [NAMING_PATCH]
+    engine = DefaultEngine(Context())
+    engine.visit(*patches)
+    for level in ('high', 'medium', 'low', 'exp'):
+        pruned_engine = DefaultEngine(Context(), level=level)
+        pruned_engine.visit(*patches)
+        assert [str(bug) for bug in pruned_engine.filter_bugs(level)] == [str(bug) for bug in engine.filter_bugs(level)]
+
+    assert 'FindDeadLocalIncrementInReturn' not in DefaultEngine(Context(), level='low')._detectors
+    high_engine = DefaultEngine(Context(), level='high')
+    assert 'ClassNameConventionDetector' not in high_engine._detectors
+    assert all(detector.best_priority() == priorities.HIGH_PRIORITY for detector in high_engine._detectors.values())
+
+    # lower priority checks are skipped
+    naming = ('ClassNameConventionDetector', 'MethodNameConventionDetector')
+    engine = DefaultEngine(Context(), included_filter=naming)
+    engine.visit(NAMING_PATCH)
+    assert sorted(bug.line_no for bug in engine.bug_accumulator) == [1, 2, 3, 5, 7]
+    engine = DefaultEngine(Context(), included_filter=naming, level='medium')
+    engine.visit(NAMING_PATCH)
+    assert sorted((bug.line_no, bug.priority) for bug in engine.bug_accumulator) == [(2, priorities.MEDIUM_PRIORITY),
+                                                                                     (7, priorities.MEDIUM_PRIORITY)]
+
+
+def test_added_only():
+    patch = parse('''@@ -1,5 +1,7 @@
+ enum Color {
+     RED;
+     void f(int x) {
+         x = x;
++        int y = 0;
++        y = y;
+     }
+''', name='Color.java')
+    engine = DefaultEngine(Context(), included_filter=('CheckForSelfAssignment',))
+    engine.visit(patch)
+    assert [bug.line_no for bug in engine.bug_accumulator] == [4, 6]
+
+    engine = DefaultEngine(Context(), included_filter=('CheckForSelfAssignment',), added_only=True)
+    engine.visit(patch)
+    assert [bug.line_no for bug in engine.bug_accumulator] == [6]
+    assert engine.context.cur_patch_facts.is_enum  # facts still cover unchanged lines
+
+    # whole source files are checked entirely
+    patches = _load_data_patches()
+    engine = DefaultEngine(Context())
+    engine.visit(*patches)
+    added_only_engine = DefaultEngine(Context(), added_only=True)
+    added_only_engine.visit(*patches)
+    assert [str(bug) for bug in added_only_engine.bug_accumulator] == [str(bug) for bug in engine.bug_accumulator]
+
+
+def test_lazy_imports():
+    # a fresh interpreter, since other tests have imported everything
+    code = '''
+import sys
+from patterns.models.engine import DefaultEngine
+from patterns.models.context import Context
+from gen_detectors import DETECTOR_DICT
+assert 'FloatEqualityDetector' in DETECTOR_DICT and len(list(DETECTOR_DICT)) == len(DETECTOR_DICT)
+engine = DefaultEngine(Context(), included_filter=('CheckForSelfAssignment',))
+print(' '.join(sorted(name for name in sys.modules
+                      if name.startswith('patterns.detect.') or name in ('loguru', 'asyncio', 'sqlite3'))))
+'''
+    output = subprocess.run((sys.executable, '-c', code), check=True, capture_output=True, text=True).stdout
+    assert output.split() == ['patterns.detect.find_self_assignment']
@@ -0,0 +1,25 @@
+import pickle
+
+from patterns.models.facts import PatchSetFacts
+from rparser import parse
+
+
+def test_patch_facts():
+    patch = parse('''public enum Color { RED, GREEN }
+        private static final Logger log = LoggerFactory.getLogger(A.class);
+        String s = "PrintWriter out;";
+        class Sub<T> extends Base<T> {
+        interface I extends J, com.example.K {''', False, 'A.java')
+    other = parse('''int x = 0;''', False, 'B.java')
+    facts = PatchSetFacts((patch, other))
+
+    assert facts.of(patch) is facts.of(patch)
+    assert facts.of(patch).is_enum and not facts.of(other).is_enum
+    assert facts.of(patch).interesting_vars == {'log': 'Logger'}
+    assert facts.extends_dict == {'A.java': {'Base', 'J', 'K'}}
+
+    # only derived facts are shipped to worker processes
+    shipped = pickle.loads(pickle.dumps(facts))
+    assert shipped.patch_set is None
+    assert shipped.extends_dict == facts.extends_dict
+    assert shipped.of(other).interesting_vars == dict()
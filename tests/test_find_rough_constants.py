@@ -30,3 +30,11 @@ class TestCntRoughConstantValue:
         engine = DefaultEngine(Context(), included_filter=['FindRoughConstantsDetector'])
         engine.visit(patch)
         assert len(engine.bug_accumulator) == 0
+
+    def test_04(self):
+        # digits in a block comment spanning lines of a statement are not constants
+        patch = parse('''double x = f(1, /* was 3.14159
+        */ 6.2831853);''', is_patch=False)
+        engine = DefaultEngine(Context(), included_filter=['FindRoughConstantsDetector'])
+        engine.visit(patch)
+        assert [bug.description for bug in engine.bug_accumulator] == ['Rough value of 2*Math.PI found: 6.2831853']
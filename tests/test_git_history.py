@@ -0,0 +1,91 @@
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from patterns.models.git_history import GitHistoryAnalyzer
+from patterns.models.result_cache import ResultCache
+
+pytestmark = pytest.mark.skipif(shutil.which('git') is None, reason='git is not installed')
+
+GOOD = '''public class A {
+    void f(int x) {
+        int y = x;
+    }
+}
+'''
+BAD = '''public class A {
+    void f(int x) {
+        x = x;
+    }
+}
+'''
+
+
+def _git(repo, *args):
+    return subprocess.run(('git', '-C', str(repo), '-c', 'user.name=test', '-c', 'user.email=test@example.com')
+                          + args, check=True, capture_output=True, text=True).stdout.strip()
+
+
+def _commit(repo, files: dict, message: str):
+    for name, content in files.items():
+        path = repo / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    _git(repo, 'add', '-A')
+    _git(repo, 'commit', '-q', '-m', message)
+    return _git(repo, 'rev-parse', 'HEAD')
+
+
+def test_analyze(tmp_path):
+    repo = tmp_path / 'repo'
+    repo.mkdir()
+    _git(repo, 'init', '-q')
+    base = _commit(repo, {'src/A.java': GOOD, 'README.md': 'readme'}, 'base')
+    bad_1 = _commit(repo, {'src/A.java': BAD}, 'introduce a bug')
+    _commit(repo, {'src/A.java': GOOD}, 'revert')
+    bad_2 = _commit(repo, {'src/A.java': BAD, 'src/B.java': BAD.replace('class A', 'class B')}, 'reapply')
+
+    cache_path = str(tmp_path / 'findings.db')
+    analyzer = GitHistoryAnalyzer(str(repo), cache_path, included_filter=('CheckForSelfAssignment',))
+    bugs = analyzer.analyze(f'{base}..HEAD')
+    assert [(bug.file_name, bug.line_no, bug.commit_sha) for bug in bugs] == [
+        ('src/A.java', 3, bad_2), ('src/B.java', 3, bad_2), ('src/A.java', 3, bad_1)]
+    # the same change of A.java in the two commits is visited once, the revert has no findings
+    assert (analyzer.analyzed, analyzer.reused) == (3, 1)
+
+    # findings are kept across runs
+    analyzer = GitHistoryAnalyzer(str(repo), ResultCache(cache_path), included_filter=('CheckForSelfAssignment',))
+    assert [str(bug) for bug in analyzer.analyze(f'{base}..HEAD')] == [str(bug) for bug in bugs]
+    assert (analyzer.analyzed, analyzer.reused) == (0, 4)
+
+    # other detectors do not reuse the findings
+    analyzer = GitHistoryAnalyzer(str(repo), cache_path)
+    analyzer.analyze(f'{base}..HEAD')
+    assert analyzer.analyzed == 3
+
+    with pytest.raises(RuntimeError):
+        analyzer.analyze('no-such-revision..HEAD')
+
+
+@pytest.mark.skipif(os.name != 'posix', reason='the wrapper of git is a shell script')
+def test_verbose_stderr(tmp_path, monkeypatch):
+    repo = tmp_path / 'repo'
+    repo.mkdir()
+    _git(repo, 'init', '-q')
+    base = _commit(repo, {'src/A.java': GOOD}, 'base')
+    bad = _commit(repo, {'src/A.java': BAD}, 'introduce a bug')
+
+    # a git which writes more warnings than a pipe buffer holds before its output
+    real_git = shutil.which('git')
+    bin_dir = tmp_path / 'bin'
+    bin_dir.mkdir()
+    wrapper = bin_dir / 'git'
+    wrapper.write_text(f'#!/bin/sh\nyes "warning: noise" | head -c 1000000 >&2\nexec "{real_git}" "$@"\n')
+    wrapper.chmod(0o755)
+    monkeypatch.setenv('PATH', f'{bin_dir}{os.pathsep}{os.environ["PATH"]}')
+
+    analyzer = GitHistoryAnalyzer(str(repo), included_filter=('CheckForSelfAssignment',))
+    bugs = analyzer.analyze(f'{base}..HEAD')
+    assert [(bug.file_name, bug.line_no, bug.commit_sha) for bug in bugs] == [('src/A.java', 3, bad)]
@@ -0,0 +1,229 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from github_client import AsyncGitHubClient, MAX_REDIRECTS
+from patterns.models.detectors import online_search_async
+from patterns.models.search_cache import SearchCache
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def do_GET(self):
+        server = self.server
+        if self.path.startswith(('/moved/', '/loop')):
+            with server.lock:
+                server.requests.append((time.time(), self.path, self.headers.get('Authorization')))
+            location = '/loop' if self.path.startswith('/loop') else '/repos/' + self.path[len('/moved/'):]
+            self._send(302 if self.path.startswith('/loop') else 301, {'message': 'Moved Permanently'},
+                       {'Location': location})
+            return
+
+        if self.path.startswith('/repos/'):
+            # the core resource has a budget of its own
+            with server.lock:
+                server.requests.append((time.time(), self.path, self.headers.get('Authorization')))
+            self._send(200, {'full_name': self.path[len('/repos/'):]},
+                       {'X-RateLimit-Resource': 'core', 'X-RateLimit-Limit': '5000', 'X-RateLimit-Remaining': '4999',
+                        'X-RateLimit-Reset': str(time.time() + 3600)})
+            return
+
+        with server.lock:
+            server.requests.append((time.time(), self.path, self.headers.get('Authorization')))
+            remaining = server.remaining
+            if remaining is not None:
+                server.remaining = max(remaining - 1, 0)
+
+        if self.path.startswith('/retry') and len(server.requests) == 1:
+            self._send(403, {'message': 'secondary rate limit'}, {'Retry-After': '0.2'})
+            return
+
+        if self.path.startswith('/etag'):
+            if self.headers.get('If-None-Match') == '"v1"':
+                self.send_response(304)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+            else:
+                self._send(200, {'total_count': 1, 'path': self.path}, {'ETag': '"v1"'})
+            return
+
+        headers = dict()
+        if remaining is not None:
+            headers = {'X-RateLimit-Resource': 'search', 'X-RateLimit-Limit': '100',
+                       'X-RateLimit-Remaining': str(max(remaining - 1, 0)), 'X-RateLimit-Reset': str(server.reset_at)}
+        body = {'total_count': 1, 'path': self.path}
+        if self.path.startswith('/chunked'):
+            self._send_chunked(body, headers)
+        else:
+            self._send(200, body, headers)
+
+    def _send(self, status, body, headers):
+        content = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+    def _send_chunked(self, body, headers):
+        content = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header('Transfer-Encoding', 'chunked')
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        for i in range(0, len(content), 7):
+            chunk = content[i:i + 7]
+            self.wfile.write(b'%x\r\n%s\r\n' % (len(chunk), chunk))
+        self.wfile.write(b'0\r\n\r\n')
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    httpd.connections, httpd.requests, httpd.lock = 0, list(), threading.Lock()
+    httpd.remaining, httpd.reset_at = None, 0
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _url(server, path):
+    return f'http://127.0.0.1:{server.server_address[1]}{path}'
+
+
+def test_concurrent_requests_reuse_connections(server):
+    client = AsyncGitHubClient(max_concurrency=4)
+    urls = [_url(server, f'/search/{i}') for i in range(20)]
+    responses = client.run(client.get_many(urls, token='abc'))
+    client.close()
+
+    assert [resp.json()['path'] for resp in responses] == [f'/search/{i}' for i in range(20)]
+    assert server.connections <= 4
+    assert all(auth == 'token abc' for _, _, auth in server.requests)
+
+
+def test_chunked_response(server):
+    client = AsyncGitHubClient()
+    resp = client.run(client.get(_url(server, '/chunked')))
+    client.close()
+    assert resp.json() == {'total_count': 1, 'path': '/chunked'}
+
+
+def test_run_from_threads(server, monkeypatch):
+    loops, real_new_event_loop = list(), asyncio.new_event_loop
+
+    def new_event_loop():
+        time.sleep(0.05)  # widen the window between checking and setting the loop
+        loops.append(real_new_event_loop())
+        return loops[-1]
+
+    monkeypatch.setattr(asyncio, 'new_event_loop', new_event_loop)
+    client = AsyncGitHubClient()
+    barrier = threading.Barrier(4)
+    results = list()
+
+    def search(i):
+        barrier.wait()
+        results.append(client.run(client.get(_url(server, f'/search/{i}'))).json()['path'])
+
+    threads = [threading.Thread(target=search, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    client.close()
+    assert sorted(results) == [f'/search/{i}' for i in range(4)]
+    assert len(loops) == 1
+
+
+def test_rate_limit_waits_for_reset(server):
+    server.remaining, server.reset_at = 2, time.time() + 0.5
+    client = AsyncGitHubClient(max_concurrency=1)
+    start = time.time()
+    # the first response tells the client about the rate limit window
+    client.run(client.get(_url(server, '/search/0')))
+    client.run(client.get_many([_url(server, f'/search/{i}') for i in range(1, 4)]))
+    client.close()
+
+    # the third request must wait for the reset of the rate limit window
+    assert len(server.requests) == 4
+    assert server.requests[2][0] >= server.reset_at - 0.05
+    assert time.time() - start < 3
+
+
+def test_rate_limit_per_resource(server):
+    server.remaining, server.reset_at = 2, time.time() + 0.5
+    client = AsyncGitHubClient(max_concurrency=1)
+    client.run(client.get(_url(server, '/search/0')))
+    # the large budget of the core resource does not lift the limit of searches
+    client.run(client.get(_url(server, '/repos/owner/name')))
+    client.run(client.get_many([_url(server, f'/search/{i}') for i in range(1, 4)]))
+    client.close()
+
+    searches = [t for t, path, _ in server.requests if path.startswith('/search/')]
+    assert len(searches) == 4
+    assert searches[1] < server.reset_at - 0.05
+    assert searches[2] >= server.reset_at - 0.05
+
+
+def test_follow_redirects(server):
+    client = AsyncGitHubClient()
+    # e.g. a renamed repository
+    resp = client.run(client.get(_url(server, '/moved/owner/new-name'), token='abc'))
+    assert resp.status_code == 200 and resp.json() == {'full_name': 'owner/new-name'}
+    assert [(path, auth) for _, path, auth in server.requests] == [('/moved/owner/new-name', 'token abc'),
+                                                                   ('/repos/owner/new-name', 'token abc')]
+
+    server.requests.clear()
+    resp = client.run(client.get(_url(server, '/loop')))
+    client.close()
+    assert resp.status_code == 302
+    assert len(server.requests) == MAX_REDIRECTS + 1
+
+
+def test_retry_after(server):
+    client = AsyncGitHubClient()
+    resp = client.run(client.get(_url(server, '/retry')))
+    client.close()
+    assert resp.status_code == 200
+    assert len(server.requests) == 2
+    assert server.requests[1][0] - server.requests[0][0] >= 0.15
+
+
+def test_online_search_async(server):
+    client = AsyncGitHubClient()
+    resp_json = asyncio.run(online_search_async(_url(server, '/search/code?q=extends+Foo'), client=client))
+    assert resp_json['total_count'] == 1
+
+
+@pytest.mark.parametrize('ttl,expected_requests', [(3600, 1), (0, 2)])
+def test_search_cache(server, tmp_path, ttl, expected_requests):
+    url = _url(server, '/etag/search?q=extends+Foo')
+    client = AsyncGitHubClient()
+    cache = SearchCache(str(tmp_path / 'search.db'), ttl=ttl)
+    first = asyncio.run(online_search_async(url, repo_name='a/b', client=client, cache=cache))
+
+    # another process or run opens the same database
+    cache = SearchCache(str(tmp_path / 'search.db'), ttl=ttl)
+    second = asyncio.run(online_search_async(url, repo_name='a/b', client=client, cache=cache))
+
+    assert first == second == {'total_count': 1, 'path': '/etag/search?q=extends+Foo'}
+    assert len(server.requests) == expected_requests
+    assert (cache.hits, cache.revalidated) == ((1, 0) if ttl else (0, 1))
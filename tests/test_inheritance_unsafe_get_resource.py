@@ -88,3 +88,19 @@ def test_local_search():
     engine.visit(patch_1, patch_2, patch_3)
     assert len(engine.filter_bugs()) == 2
     assert len(engine.filter_bugs('low')) == 2
+
+
+@pytest.mark.parametrize('other_file,expected_priority', [
+    ('class Sub extends Dummy { }', 2),
+    ('class Sub extends Other { }', 3),
+])
+def test_index_search(tmp_path, other_file, expected_priority):
+    (tmp_path / 'Dummy.java').write_text('class Dummy { }')
+    (tmp_path / 'Sub.java').write_text(other_file)
+    patch = parse('''URL url = getClass().getResource(name);''', False, 'src/Dummy.java')
+    context = Context()
+    context.enable_index_search(str(tmp_path))
+    engine = DefaultEngine(context, ['GetResourceDetector'])
+    engine.visit(patch)
+    assert len(engine.bug_accumulator) == 1
+    assert engine.bug_accumulator[0].priority == expected_priority
@@ -0,0 +1,37 @@
+import pytest
+
+from lexer import tokenize, strip_comments, string_ranges
+from rparser import parse
+
+
+@pytest.mark.parametrize('content,expected', [
+    ('a.b(c);', [('ident', 'a'), ('op', '.'), ('ident', 'b'), ('op', '('), ('ident', 'c'), ('op', ')'),
+                 ('op', ';')]),
+    ('x >>>= 0x1F + 1e-5f - .5;', [('ident', 'x'), ('op', '>>>='), ('number', '0x1F'), ('op', '+'),
+                                   ('number', '1e-5f'), ('op', '-'), ('number', '.5'), ('op', ';')]),
+    (r's = "a\"b" + "\\";', [('ident', 's'), ('op', '='), ('string', r'"a\"b"'), ('op', '+'), ('string', r'"\\"'),
+                            ('op', ';')]),
+    ("c == '\"' || c == '\\''", [('ident', 'c'), ('op', '=='), ('char', "'\"'"), ('op', '||'), ('ident', 'c'),
+                                 ('op', '=='), ('char', "'\\''")]),
+    ('s = """\n  a "b"\n""";', [('ident', 's'), ('op', '='), ('string', '"""\n  a "b"\n"""'), ('op', ';')]),
+    ('f(x); // g(y)', [('ident', 'f'), ('op', '('), ('ident', 'x'), ('op', ')'), ('op', ';'),
+                       ('comment', '// g(y)')]),
+    ('s = "unterminated', [('ident', 's'), ('op', '='), ('string', '"unterminated')]),
+])
+def test_tokenize(content, expected):
+    assert [(kind, content[start:end]) for kind, start, end in tokenize(content)] == expected
+
+
+@pytest.mark.parametrize('content,expected', [
+    ('a = 1; // comment\n', 'a = 1; '),
+    ('a /* b */ = /* c */ 1;\n', 'a  =  1;\n'),
+    ('url = "http://a/*b*/";\n', 'url = "http://a/*b*/";\n'),
+    ('a = 1; /* multi-line\n', 'a = 1; /* multi-line\n'),
+])
+def test_strip_comments(content, expected):
+    assert strip_comments(content) == expected
+
+
+def test_char_literals_do_not_open_strings():
+    stmt = parse('''if (c == '"' && s.equals("a == b")) {''', False).hunks[0].lines[0]
+    assert stmt.string_ranges == string_ranges(stmt.tokens) == [(25, 33)]
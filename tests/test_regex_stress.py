@@ -0,0 +1,27 @@
+import pytest
+
+from benchmarks.regex_stress import FAMILIES, growth_exponent, keyword_core, stress_detector, worst_cases
+from gen_detectors import DETECTOR_DICT
+
+
+@pytest.mark.parametrize('power', [1, 2, 3])
+def test_growth_exponent(power):
+    lengths = [100, 200, 400, 800]
+    assert growth_exponent(lengths, [1e-6 * length ** power for length in lengths]) == pytest.approx(power)
+
+
+def test_statements_reach_detectors():
+    detector = DETECTOR_DICT['FloatEqualityDetector']()
+    core = keyword_core(detector)
+    assert core == 'NaN >'
+    for make in FAMILIES.values():
+        statement = make(10, core)
+        assert 'NaN' in statement and '>' in statement
+
+
+def test_stress_detector():
+    rows = stress_detector('CheckForSelfComputation', sizes=(10, 20, 40), repeat=1)
+    assert {row['family'] for row in rows} == set(FAMILIES)
+    assert {row['target'] for row in rows} == {'match', 'pattern'}
+    assert all(len(row['times']) == 3 and not row['timed_out'] for row in rows)
+    assert set(worst_cases(rows)) == {'CheckForSelfComputation'}
@@ -0,0 +1,89 @@
+import glob
+import os
+import shutil
+
+from patterns.models import priorities
+from patterns.models.context import Context
+from patterns.models.engine import DefaultEngine
+from patterns.models.repo_scan import RepoScanner
+from rparser import parse
+
+
+def _make_repo(repo):
+    for i, path in enumerate(sorted(glob.glob('tests/data/*.java'))):
+        target = repo / f'module{i}' / 'src' / os.path.basename(path)
+        target.parent.mkdir(parents=True)
+        shutil.copy(path, target)
+    (repo / '.git').mkdir()
+    (repo / '.git' / 'Hidden.java').write_text('class Hidden { void f() { int x = 1; x = x; } }')
+    (repo / 'README.md').write_text('not java')
+
+
+def _expected_bugs(repo):
+    engine = DefaultEngine(Context())
+    bugs = list()
+    for path in sorted(glob.glob(str(repo / '**' / '*.java'), recursive=True)):
+        rel_path = os.path.relpath(path, repo).replace(os.sep, '/')
+        with open(path, 'r') as f:
+            engine.visit(parse(f.read(), is_patch=False, name=rel_path))
+        bugs += engine.bug_accumulator
+    return sorted(str(bug) for bug in bugs)
+
+
+def test_scan(tmp_path):
+    repo, manifest_path = tmp_path / 'repo', str(tmp_path / 'manifest.json')
+    _make_repo(repo)
+    expected = _expected_bugs(repo)
+    assert expected
+
+    scanner = RepoScanner(str(repo), manifest_path)
+    assert sorted(str(bug) for bug in scanner.scan()) == expected
+    assert (scanner.analyzed, scanner.reused) == (3, 0)
+
+    # unchanged files are not read again
+    scanner = RepoScanner(str(repo), manifest_path)
+    assert sorted(str(bug) for bug in scanner.scan()) == expected
+    assert (scanner.analyzed, scanner.reused) == (0, 3)
+
+    # a touched file is read but not visited, a changed file is visited, a deleted file is dropped
+    touched, changed = sorted(glob.glob(str(repo / '*' / 'src' / '*.java')))[:2]
+    os.utime(touched, ns=(0, 0))
+    with open(changed, 'w') as f:
+        f.write('class A {\n    void f() {\n        int x = 1;\n        x = x;\n    }\n}\n')
+    os.remove(str(repo / 'module2' / 'src' / 'cnt_rough_constant_value.java'))
+    scanner = RepoScanner(str(repo), manifest_path, processes=2)
+    bugs = scanner.scan()
+    assert (scanner.analyzed, scanner.reused) == (1, 1)
+    assert sorted(str(bug) for bug in bugs) == _expected_bugs(repo)
+    assert not any('cnt_rough_constant_value' in bug.file_name for bug in bugs)
+
+
+def test_detector_change(tmp_path):
+    repo, manifest_path = tmp_path / 'repo', str(tmp_path / 'manifest.json')
+    _make_repo(repo)
+    RepoScanner(str(repo), manifest_path).scan()
+
+    # findings of other detectors are not reused
+    scanner = RepoScanner(str(repo), manifest_path, included_filter=('CheckForSelfAssignment',))
+    scanner.scan()
+    assert scanner.analyzed == 3
+
+
+def test_same_content_in_other_file(tmp_path):
+    repo, manifest_path = tmp_path / 'repo', str(tmp_path / 'manifest.json')
+    content = 'class A {\n    URL url = getClass().getResource("a");\n}\nclass Child extends A {\n}\n'
+    for name in ('A.java', 'B.java'):
+        (repo / 'src' / name).parent.mkdir(parents=True, exist_ok=True)
+        (repo / 'src' / name).write_text(content)
+
+    # findings depend on the file name, A is extended but B is not
+    options = dict(included_filter=('GetResourceDetector',))
+    bugs = RepoScanner(str(repo), manifest_path, **options).scan()
+    expected = [('src/A.java', priorities.MEDIUM_PRIORITY), ('src/B.java', priorities.LOW_PRIORITY)]
+    assert [(bug.file_name, bug.priority) for bug in bugs] == expected
+
+    os.rename(repo / 'src' / 'B.java', repo / 'src' / 'C.java')
+    scanner = RepoScanner(str(repo), manifest_path, **options)
+    bugs = scanner.scan()
+    assert [(bug.file_name, bug.priority) for bug in bugs] == [expected[0], ('src/C.java', priorities.LOW_PRIORITY)]
+    assert (scanner.analyzed, scanner.reused) == (1, 1)
@@ -0,0 +1,56 @@
+import glob
+
+from patterns.models.context import Context
+from patterns.models.engine import DefaultEngine
+from patterns.models.result_cache import ResultCache
+from rparser import parse
+
+
+def _visit(engine, *patches):
+    engine.visit(*patches)
+    return [(str(bug), bug.description, bug.line_content) for bug in engine.bug_accumulator]
+
+
+def test_cache_reuses_findings(tmp_path):
+    patches = list()
+    for path in sorted(glob.glob('tests/data/*.java')):
+        with open(path, 'r') as f:
+            patches.append(parse(f.read(), is_patch=False, name=path))
+    expected = _visit(DefaultEngine(Context()), *patches)
+
+    cache = ResultCache(str(tmp_path / 'findings.db'))
+    assert _visit(DefaultEngine(Context(), result_cache=cache), *patches) == expected
+    assert cache.hits == 0 and cache.misses > 0
+
+    # a new engine reuses the findings stored on disk
+    cache = ResultCache(str(tmp_path / 'findings.db'))
+    assert _visit(DefaultEngine(Context(), result_cache=cache), *patches) == expected
+    assert cache.misses == 0 and cache.hits > 0
+
+
+def test_cache_rebuilds_line_numbers(tmp_path):
+    code = '''int x = 0;
+        if (s == "abc") {
+            x = x;
+        }'''
+    shifted = 'int y = 0;\nint z = 0;\n' + code
+    cache = ResultCache(str(tmp_path / 'findings.db'))
+    engine = DefaultEngine(Context(), result_cache=cache)
+
+    bugs = _visit(engine, parse(code, is_patch=False, name='A.java'))
+    assert [bug[0] for bug in bugs] == ['A.java:2:MEDIUM Confidence:ES_COMPARING_STRINGS_WITH_EQ',
+                                        'A.java:3:HIGH Confidence:SA_SELF_ASSIGNMENT']
+
+    hits = cache.hits
+    bugs = _visit(engine, parse(shifted, is_patch=False, name='B.java'))
+    assert [bug[0] for bug in bugs] == ['B.java:4:MEDIUM Confidence:ES_COMPARING_STRINGS_WITH_EQ',
+                                        'B.java:5:HIGH Confidence:SA_SELF_ASSIGNMENT']
+    assert cache.hits > hits
+
+
+def test_patch_dependent_detectors_are_not_cached(tmp_path):
+    engine = DefaultEngine(Context(), result_cache=str(tmp_path / 'findings.db'))
+    assert 'GetResourceDetector' not in engine._cached_names
+    assert 'MethodNameConventionDetector' not in engine._cached_names
+    assert 'NewLineDetector' not in engine._cached_names
+    assert 'EqualityDetector' in engine._cached_names
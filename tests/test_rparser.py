@@ -1,5 +1,6 @@
 import pytest
-from rparser import parse
+from rparser import parse, iter_parse, parse_unified_diff, iter_diff_stream, Line, VirtualStatement
+from utils import in_range
 
 params = [
     # -------------------------- test support for patch and non-patch --------------------------
@@ -511,3 +512,191 @@ def test_file_02():
     with open(p, 'r') as f:
         patch = parse(f.read(), is_patch=False, name=p)
         assert len(patch.hunks[0].lines) == 101
+
+
+def test_lazy_ranges():
+    patch = parse('''String s = "a" + "b";
+    List<Map<String, Integer>> m = f("<x>");''', False)
+    stmt = patch.hunks[0].lines[0]
+    assert stmt.string_ranges == [(11, 14), (17, 20)]
+    assert stmt.string_ranges is stmt.string_ranges  # computed once
+
+    # ranges follow the content when it is replaced
+    stmt.content = 'List<String> l = "x";'
+    assert stmt.string_ranges == [(17, 20)]
+    assert stmt.generic_type_ranges == [(4, 12)]
+
+
+@pytest.mark.parametrize('num,expected', [(-1, False), (0, True), (3, True), (4, False), (5, False), (6, True),
+                                          (8, True), (9, False)])
+def test_in_range(num, expected):
+    assert in_range(num, [(0, 4), (6, 9)]) == expected
+
+
+def test_fork_statement():
+    patch = parse('''@@ -1,3 +1,3 @@
+     foo(a,
+-        b);
++        c);''', True)
+    del_stmt, add_stmt = patch.hunks[0].lines
+    assert (del_stmt.prefix, del_stmt.content) == ('-', '    foo(a,\n        b);\n')
+    assert (add_stmt.prefix, add_stmt.content) == ('+', '    foo(a,\n        c);')
+    # the common line is shared by both statements
+    assert del_stmt.sub_lines[0] is add_stmt.sub_lines[0]
+    assert [line.lineno for line in del_stmt.sub_lines] == [(1, 1), (2, -1)]
+    assert [line.lineno for line in add_stmt.sub_lines] == [(1, 1), (-1, 2)]
+
+
+def test_fork_copy_on_write():
+    stmt = VirtualStatement(Line(' a(b,', (1, 1)))
+    stmt.append_sub_line(Line(' c);', (2, 2)))
+    fork = stmt.fork()
+    # the fragments are not joined by the fork
+    assert fork._content is None and fork._fragments is stmt._fragments
+
+    # reading or replacing content does not give up the sharing of sub-lines
+    assert stmt.content == 'a(b,c);'
+    fork.content = 'a(b,'
+    fork.append_sub_line(Line('+d);', (-1, 3)))
+    stmt.append_sub_line(Line('-e);', (3, -1)))
+    assert [line.content for line in stmt.sub_lines] == ['a(b,', 'c);', 'e);']
+    assert [line.content for line in fork.sub_lines] == ['a(b,', 'c);', 'd);']
+    assert (stmt.content, fork.content) == ('a(b,c);e);', 'a(b,d);')
+
+
+@pytest.mark.parametrize('offset,if_strip,expected', [
+    (0, False, 1), (9, False, 1), (10, False, 2), (21, False, 2), (22, False, 3), (33, False, 3), (34, False, None),
+    (5, True, 1), (6, True, 2), (17, True, 2), (18, True, 3), (27, True, 3), (28, True, None),
+])
+def test_lineno_by_offset(offset, if_strip, expected):
+    # sub-lines: '    a = \n' (9), '        b +\n' (12), '        c;  ' (12)
+    stmt = parse('    a = \n        b +\n        c;  ', False).hunks[0].lines[0]
+    assert len(stmt.sub_lines) == 3
+    lineno = stmt.get_exact_lineno_by_offset(offset, if_strip)
+    assert (lineno[1] if lineno else None) == expected
+
+
+def test_compact_lines():
+    stmt = parse('''@@ -1,2 +1,2 @@
+-    a(b,
+-      c);''', True).hunks[0].lines[0]
+    assert not hasattr(stmt, '__dict__') and not hasattr(stmt.sub_lines[0], '__dict__')
+    assert stmt.lineno == (1, -1)
+    stmt.lineno = (3, 4)
+    assert stmt.lineno == (3, 4)
+
+
+def test_iter_parse():
+    patch_str = '''diff --git a/A.java b/A.java
+@@ -1,2 +1,3 @@
+ int a = 1;
++int b = 2;
+ int c = 3;
+@@ -10,2 +11,2 @@ class A {
+-    foo(a,
++    foo(b,
+         c);
+'''
+    expected = parse(patch_str)
+    hunks = list(iter_parse(iter(patch_str.splitlines(keepends=True))))
+    assert len(hunks) == len(expected.hunks) == 2
+    for hunk, expected_hunk in zip(hunks, expected.hunks):
+        assert [(line.prefix, line.content, line.lineno) for line in hunk.lines] == \
+               [(line.prefix, line.content, line.lineno) for line in expected_hunk.lines]
+        assert hunk.dellines == expected_hunk.dellines
+
+
+def test_bad_hunk_header():
+    patch_str = '''@@ -1,2 +1,3 @@
+ int a = 1;
++int b = 2;
+ int c = 3;
+@@ -10,2 +11,2 @@ class A {
+-    x = x;
++    y = y;
+@@ -12,x +13 @@
+-b */
+ z;
+@@ -20,1 +21,1 @@
++w = w;
+'''
+    hunks = iter_parse(iter(patch_str.splitlines(keepends=True)))
+    assert len(next(hunks).lines) == 3
+    # the malformed hunk comes with the lines before the bad header, then parsing stops
+    assert [(line.prefix, line.content) for line in next(hunks).lines] == [('+', '    y = y;\n')]
+    with pytest.raises(AttributeError):
+        next(hunks)
+
+    patch = parse(patch_str)
+    assert [len(hunk.lines) for hunk in patch.hunks] == [3, 1]
+
+
+UNIFIED_DIFF = '''From 0123456789abcdef0123456789abcdef01234567 Mon Sep 17 00:00:00 2001
+Subject: [PATCH] Change A
+
+diff --git a/src/A.java b/src/A.java
+index 1234567..89abcde 100644
+--- a/src/A.java
++++ b/src/A.java
+@@ -1,2 +1,2 @@
+-int a = 1;
++int a = 2;
+ int b = 3;
+diff --git a/src/B.java b/src/B.java
+new file mode 100644
+--- /dev/null
++++ b/src/B.java
+@@ -0,0 +1 @@
++class B {}
+diff --git a/logo.png b/logo.png
+index 1234567..89abcde 100644
+Binary files a/logo.png and b/logo.png differ
+-- 
+2.39.0
+
+From 89abcdef0123456789abcdef0123456789abcdef Mon Sep 17 00:00:00 2001
+Subject: [PATCH] Remove C
+
+diff --git a/src/C.java b/src/C.java
+deleted file mode 100644
+--- a/src/C.java
++++ /dev/null
+@@ -1 +0,0 @@
+-class C {}
+-- 
+2.39.0
+'''
+
+
+def test_parse_unified_diff(tmp_path):
+    diff_path = tmp_path / 'commits.patch'
+    diff_path.write_text(UNIFIED_DIFF)
+    patches = parse_unified_diff(str(diff_path))
+    assert [(p.name, p.type, p.sha[:4]) for p in patches] == [
+        ('src/A.java', 'modified', '0123'), ('src/B.java', 'added', '0123'), ('logo.png', 'modified', '0123'),
+        ('src/C.java', 'removed', '89ab')]
+    assert [len(p.hunks) for p in patches] == [1, 1, 0, 1]
+    # the signature of git format-patch is not part of the last hunk
+    assert [(line.prefix, line.content) for line in patches[3].hunks[0].lines] == [('-', 'class C {}\n')]
+
+    expected = parse('''@@ -1,2 +1,2 @@
+-int a = 1;
++int a = 2;
+ int b = 3;
+''')
+    assert [(line.prefix, line.content, line.lineno) for line in patches[0].hunks[0].lines] == \
+           [(line.prefix, line.content, line.lineno) for line in expected.hunks[0].lines]
+
+
+def test_iter_diff_stream():
+    lines = UNIFIED_DIFF.splitlines(keepends=True)
+    patches = list(iter_diff_stream(lines, sha='x'))
+    assert [(p.name, p.type, p.sha[:4], len(p.hunks)) for p in patches] == [
+        ('src/A.java', 'modified', '0123', 1), ('src/B.java', 'added', '0123', 1),
+        ('logo.png', 'modified', '0123', 0), ('src/C.java', 'removed', '89ab', 1)]
+    assert patches[0].blobs == ('1234567', '89abcde')
+    assert [(line.prefix, line.content) for line in patches[3].hunks[0].lines] == [('-', 'class C {}\n')]
+
+    # hunks of skipped patches are not parsed
+    patches = list(iter_diff_stream(lines, parse_hunks=lambda patch: patch.type != 'added'))
+    assert [len(p.hunks) for p in patches] == [1, 0, 0, 1]
@@ -0,0 +1,218 @@
+import http.client
+import json
+import socket
+import threading
+
+import pytest
+
+from patterns.models import priorities
+from patterns.models.context import Context
+from patterns.models.engine import DefaultEngine
+from patterns.models.result_cache import ResultCache
+from patterns.models.server import EnginePool, create_server, read_patches
+from rparser import parse
+
+PATCH = '''@@ -1,3 +1,5 @@
+ class A {
+     void f(int x) {
++        x = x;
++        String s = String.format("%d\\n", x);
+     }
+'''
+
+
+@pytest.fixture
+def server():
+    server = create_server(port=0, concurrency=2)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _post(server, body, content_type):
+    conn = http.client.HTTPConnection(*server.server_address)
+    conn.request('POST', '/analyze', body=body, headers={'Content-Type': content_type})
+    resp = conn.getresponse()
+    lines = [json.loads(line) for line in resp.read().decode().splitlines()]
+    conn.close()
+    return resp.status, lines
+
+
+def _expected():
+    engine = DefaultEngine(Context())
+    patch = parse(PATCH, name='src/A.java')
+    patch.sha = 'abc'
+    engine.visit(patch)
+    return [bug.to_dict() for bug in engine.filter_bugs('low')]
+
+
+def test_analyze(server):
+    expected = _expected()
+    assert expected
+
+    files = json.dumps({'files': [{'filename': 'src/A.java', 'patch': PATCH}, {'filename': 'logo.png'}],
+                        'sha': 'abc'})
+    status, lines = _post(server, files, 'application/json')
+    assert status == 200
+    assert lines[:-1] == expected
+    assert lines[-1]['done'] and lines[-1]['patches'] == 1 and lines[-1]['bugs'] == len(expected)
+
+    diff = 'commit ' + 'a' * 40 + '\n\ndiff --git a/src/A.java b/src/A.java\n--- a/src/A.java\n+++ b/src/A.java\n' + PATCH
+    status, lines = _post(server, diff, 'text/x-diff')
+    assert [dict(bug, sha='abc') for bug in lines[:-1]] == expected
+    assert lines[0]['sha'] == 'a' * 40
+
+    status, lines = _post(server, json.dumps({'diff': diff, 'included_filter': ['NewLineDetector'], 'level': 'medium'}),
+                          'application/json')
+    assert [bug['type'] for bug in lines[:-1]] == ['VA_FORMAT_STRING_USES_NEWLINE']
+    assert server.pool.stats()['detector_sets'] == 2
+
+    conn = http.client.HTTPConnection(*server.server_address)
+    conn.request('POST', '/analyze', body=json.dumps({'diff': diff, 'format': 'sarif'}),
+                 headers={'Content-Type': 'application/json'})
+    results = json.loads(conn.getresponse().read())['runs'][0]['results']
+    conn.close()
+    assert [result['ruleId'] for result in results] == [bug['type'] for bug in expected]
+
+    assert _post(server, '{"patches": []}', 'application/json')[0] == 400
+    assert _post(server, json.dumps({'diff': diff, 'format': 'xml'}), 'application/json')[0] == 400
+    for detectors in ('NewLineDetector', 42, [42], ['NoSuchDetector']):
+        assert _post(server, json.dumps({'diff': diff, 'included_filter': detectors}), 'application/json')[0] == 400
+        assert _post(server, json.dumps({'diff': diff, 'excluded_filter': detectors}), 'application/json')[0] == 400
+    assert _post(server, json.dumps({'files': [], 'level': 'x'}), 'application/json')[0] == 400
+
+
+def test_pool_eviction():
+    pool = EnginePool(size=2, max_detector_sets=2)
+    pool.warm(('NewLineDetector',), count=2)
+    names = ('CheckForSelfAssignment', 'EqualityDetector', 'DontCatchIllegalMonitorStateException')
+    for name in names:
+        with pool.engine((name,)):
+            pass
+    # the warmed set is kept, and only the two sets used most recently of the others
+    assert pool.stats() == {'detector_sets': 3, 'idle_engines': 4}
+    with pool.engine((names[1],)) as engine:
+        pass
+    with pool.engine((names[0],)):
+        pass
+    with pool.engine((names[1],)) as engine_again:
+        assert engine_again is engine
+    # the engine of names[2] was dropped when names[0] was used again
+    assert list(pool._idle) == [(('NewLineDetector',), (), None), ((names[0],), (), None), ((names[1],), (), None)]
+
+
+def test_unix_socket(tmp_path):
+    path = str(tmp_path / 'codegex.sock')
+    server = create_server(unix_socket=path, concurrency=1, warm=False)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(path)
+            sock.sendall(b'GET /health HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n')
+            response = b''
+            while True:
+                data = sock.recv(65536)
+                if not data:
+                    break
+                response += data
+        head, body = response.split(b'\r\n\r\n', 1)
+        assert head.startswith(b'HTTP/1.1 200')
+        assert json.loads(body)['status'] == 'ok'
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+GET_RESOURCE_PATCH = '''@@ -1,2 +1,3 @@
+ void load() {
++    URL url = getClass().getResource("a.txt");
+ }
+'''
+
+
+def _get_resource_files(extended: bool):
+    files = [{'filename': 'a/Foo.java', 'patch': GET_RESOURCE_PATCH},
+             {'filename': 'b/Foo.java', 'patch': GET_RESOURCE_PATCH}]
+    if extended:
+        files.insert(0, {'filename': 'Bar.java', 'patch': '@@ -0,0 +1 @@\n+class Bar extends Foo {\n'})
+    return {'files': files, 'included_filter': ['GetResourceDetector']}
+
+
+def test_overlapping_patch_sets(server):
+    # engines of the pool checking different patch sets at the same time do not share decided priorities
+    patches_a, _ = read_patches(json.dumps(_get_resource_files(True)).encode(), 'application/json')
+    patches_b, _ = read_patches(json.dumps(_get_resource_files(False)).encode(), 'application/json')
+    with server.pool.engine(('GetResourceDetector',)) as engine_a, \
+            server.pool.engine(('GetResourceDetector',)) as engine_b:
+        bugs_a = engine_a.iter_bugs(*patches_a)
+        first_bug = next(bugs_a)
+        bugs_b = list(engine_b.iter_bugs(*patches_b))
+        bugs_a = [first_bug] + list(bugs_a)
+    assert [bug.priority for bug in bugs_a] == [priorities.MEDIUM_PRIORITY] * 2
+    assert [bug.priority for bug in bugs_b] == [priorities.LOW_PRIORITY] * 2
+
+    def post(extended, results):
+        for _ in range(10):
+            results.append(_post(server, json.dumps(_get_resource_files(extended)), 'application/json')[1])
+
+    results_a, results_b = list(), list()
+    threads = [threading.Thread(target=post, args=(True, results_a)),
+               threading.Thread(target=post, args=(False, results_b))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert all([bug['priority'] for bug in lines[:-1]] == [priorities.MEDIUM_PRIORITY] * 2 for lines in results_a)
+    assert all([bug['priority'] for bug in lines[:-1]] == [priorities.LOW_PRIORITY] * 2 for lines in results_b)
+    assert len(results_a) == len(results_b) == 10
+
+
+def test_analysis_error(server):
+    def fail(context):
+        raise RuntimeError('broken detector')
+
+    with server.pool.engine(('CheckForSelfAssignment',), level='low') as engine:
+        engine._detectors['CheckForSelfAssignment'].match = fail
+    payload = {'files': [{'filename': 'src/A.java', 'patch': PATCH}], 'included_filter': ['CheckForSelfAssignment']}
+
+    status, lines = _post(server, json.dumps(payload), 'application/json')
+    assert status == 200
+    assert 'broken detector' in lines[-1]['error']
+    assert engine.context.patch_set == ()  # the engine went back to the pool without the patches
+
+    conn = http.client.HTTPConnection(*server.server_address)
+    conn.request('POST', '/analyze', body=json.dumps(dict(payload, format='sarif')),
+                 headers={'Content-Type': 'application/json'})
+    invocation = json.loads(conn.getresponse().read())['runs'][0]['invocations'][0]
+    conn.close()
+    assert not invocation['executionSuccessful']
+    assert 'broken detector' in invocation['toolExecutionNotifications'][0]['message']['text']
+
+
+def test_shared_result_cache(tmp_path):
+    # pooled engines move between handler threads, and share the cache
+    cache = ResultCache(str(tmp_path / 'findings.db'))
+    server = create_server(port=0, concurrency=2, result_cache=cache)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        expected = _expected()
+        results = list()
+
+        def post():
+            for _ in range(5):
+                results.append(_post(server, json.dumps({'files': [{'filename': 'src/A.java', 'patch': PATCH}],
+                                                         'sha': 'abc'}), 'application/json'))
+
+        threads = [threading.Thread(target=post) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(results) == 15
+        assert all(status == 200 and lines[:-1] == expected for status, lines in results)
+        assert cache.hits > 0
+    finally:
+        server.shutdown()
+        server.server_close()
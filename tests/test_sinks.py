@@ -0,0 +1,50 @@
+import io
+import json
+
+from patterns.models.bug_instance import BugInstance
+from patterns.models.priorities import HIGH_PRIORITY, LOW_PRIORITY
+from patterns.models.sinks import JsonLinesWriter, SarifWriter
+
+BUGS = (
+    BugInstance('SA_LOCAL_SELF_ASSIGNMENT', HIGH_PRIORITY, 'src/A.java', 3, 'Self assignment of x', 'abc', 'x = x;'),
+    BugInstance('NM_CLASS_NAMING_CONVENTION', LOW_PRIORITY, 'src/a.java', 1, 'Class names should start with an '
+                'upper case letter', 'abc', 'class a {'),
+    BugInstance('SA_LOCAL_SELF_ASSIGNMENT', HIGH_PRIORITY, 'src/B.java', 7, 'Self assignment of y', '', 'y = y;'),
+)
+
+
+def test_json_lines_writer():
+    stream = io.StringIO()
+    with JsonLinesWriter(stream) as writer:
+        writer.write(BUGS[0])
+        assert json.loads(stream.getvalue()) == BUGS[0].to_dict()  # written at once
+        assert writer.write_all(BUGS[1:]) == 2
+    assert [json.loads(line) for line in stream.getvalue().splitlines()] == [bug.to_dict() for bug in BUGS]
+    assert writer.count == 3
+
+
+def test_sarif_writer():
+    stream = io.StringIO()
+    with SarifWriter(stream) as writer:
+        writer.write_all(iter(BUGS))
+    log = json.loads(stream.getvalue())
+    assert log['version'] == '2.1.0'
+    run = log['runs'][0]
+    assert [rule['id'] for rule in run['tool']['driver']['rules']] == ['SA_LOCAL_SELF_ASSIGNMENT',
+                                                                       'NM_CLASS_NAMING_CONVENTION']
+    results = run['results']
+    assert [result['ruleIndex'] for result in results] == [0, 1, 0]
+    assert [result['level'] for result in results] == ['error', 'note', 'error']
+    location = results[0]['locations'][0]['physicalLocation']
+    assert location['artifactLocation']['uri'] == 'src/A.java'
+    assert location['region'] == {'startLine': 3, 'snippet': {'text': 'x = x;'}}
+    assert results[0]['properties']['commitSha'] == 'abc' and 'commitSha' not in results[2]['properties']
+
+    assert run['invocations'] == [{'executionSuccessful': True}]
+
+    stream = io.StringIO()
+    with SarifWriter(stream) as writer:
+        writer.write_error('analysis failed')
+    run = json.loads(stream.getvalue())['runs'][0]
+    assert run['results'] == []
+    assert run['invocations'][0]['toolExecutionNotifications'][0]['message']['text'] == 'analysis failed'
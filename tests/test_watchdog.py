@@ -0,0 +1,43 @@
+import pytest
+import regex
+
+from patterns.models.context import Context
+from patterns.models.engine import DefaultEngine
+from patterns.models.watchdog import RegexBudget, WatchedPattern
+from rparser import parse
+
+# catastrophic backtracking: (.*?,){20} tries every split of the commas before failing
+SLOW_PATTERN = r'(.*?,){20}P'
+SLOW_LINE = 'a,' * 19 + 'a' * 300
+
+
+def test_watched_pattern():
+    budget = RegexBudget(0.01)
+    pattern = WatchedPattern(regex.compile(SLOW_PATTERN), budget)
+    budget.start()
+    with pytest.raises(TimeoutError):
+        pattern.search(SLOW_LINE)
+    assert budget.expired()
+
+    budget.start()
+    assert pattern.search('a,' * 20 + 'P')
+
+
+def test_engine_skips_timed_out_detector():
+    patch = parse('int x = ' + SLOW_LINE + ' - x;\nint y = y;\n', is_patch=False, name='Slow.java')
+    engine = DefaultEngine(Context(), included_filter=('CheckForSelfComputation', 'CheckForSelfAssignment'),
+                           regex_timeout=0.01)
+    detector = engine._detectors['CheckForSelfComputation']
+    detector.pattern = WatchedPattern(regex.compile(SLOW_PATTERN), engine._regex_budget)
+
+    engine.visit(patch)
+    assert engine.timeouts == {'CheckForSelfComputation': 1}
+    assert [bug.type for bug in engine.bug_accumulator] == ['SA_SELF_ASSIGNMENT']
+
+
+def test_patterns_are_watched():
+    engine = DefaultEngine(Context(), included_filter=('EqualityDetector',), regex_timeout=1)
+    assert isinstance(engine._detectors['EqualityDetector'].p, WatchedPattern)
+
+    engine = DefaultEngine(Context(), included_filter=('EqualityDetector',))
+    assert isinstance(engine._detectors['EqualityDetector'].p, regex.Pattern)
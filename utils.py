@@ -1,16 +1,34 @@
 import regex
-from loguru import logger
 import os
-import requests
-import time
-from cachetools import cached, LRUCache
+from bisect import bisect_right
 
 # ===========================================
 #                  Output
 # ===========================================
 LOG_PATH = 'log'
-os.makedirs(LOG_PATH, exist_ok=True)
-TRACE = logger.add(LOG_PATH + '/{time}.log')
+TRACE = None  # id of the sink of the log file, added on the first use of logger
+
+
+def _get_logger():
+    global TRACE
+    from loguru import logger as loguru_logger
+    if TRACE is None:
+        os.makedirs(LOG_PATH, exist_ok=True)
+        TRACE = loguru_logger.add(LOG_PATH + '/{time}.log')
+    return loguru_logger
+
+
+class _Logger:
+    """
+    The loguru logger, imported with the sink of the log file added on the first use, so that importing this module
+    neither imports loguru nor creates the log directory
+    """
+
+    def __getattr__(self, name):
+        return getattr(_get_logger(), name)
+
+
+logger = _Logger()
 
 
 def is_comment(content: str):
@@ -44,45 +62,16 @@ def log_message(message: str, level='info'):
 # ===========================================
 #                  Network
 # ===========================================
-requests.adapters.DEFAULT_RETRIES = 5
-SESSION = requests.Session()
-SESSION.keep_alive = False
-BASE_SLEEP_TIME = 4
 user_agent = 'Mozilla/5.0 ven(Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) ' \
              'Chrome/69.0.3497.100 Safari/537.36 '
 
 
-def send(url, token='', max_retry=1, sleep_time=2):
-    time.sleep(BASE_SLEEP_TIME)
-
-    headers = {'User-Agent': user_agent}
-    if token:
-        headers['Authorization'] = f'token %{token}'
-
-    try:
-        res = SESSION.get(url, headers=headers, stream=False, timeout=10)
-        return res
-    except Exception as e:
-        logger.error('[Request Error] url: {}    - msg: {}'.format(url, e))
-
-        # only retry when exception happens
-        if max_retry <= 0:
-            return None
-        cur_sleep_time = sleep_time + BASE_SLEEP_TIME
-        time.sleep(cur_sleep_time)
-        return send(url, token, max_retry - 1, sleep_time=cur_sleep_time)
-
-
 # ===========================================
 #                    Regex
 # ===========================================
 GENERIC_REGEX = regex.compile(r'(?P<gen><(?:[^<>]++|(?&gen))*>)')
-DOUBLE_QUOTE_REGEX = regex.compile(r'[^\\](")')
-_cache_generic_type_ranges = LRUCache(maxsize=500)
-_cache_string_ranges = LRUCache(maxsize=500)
 
 
-@cached(cache=_cache_generic_type_ranges)
 def get_generic_type_ranges(content: str):
     """
     Match `<...>` pairs in the given string
@@ -97,46 +86,17 @@ def get_generic_type_ranges(content: str):
     return range_list
 
 
-@cached(cache=_cache_string_ranges)
-def get_string_ranges(content: str):
-    """
-    Match `"` pairs in the given string
-    :param content: string to match
-    :return: a list of offset range for `"` pairs
-    """
-    range_list = list()
-    tmp_list = list()
-
-    if not content or '"' not in content:
-        return range_list
-
-    # find the offset of each double quote
-    if content.startswith('"'):  # the leading quote won't be matched by regex, but should be added to tmp_list
-        tmp_list.append(0)
-
-    its = DOUBLE_QUOTE_REGEX.finditer(content)
-    for m in its:
-        tmp_list.append(m.start(1))
-
-    # whether double quotes appear in pairs
-    size = len(tmp_list)
-    if size % 2 != 0:
-        tmp_list.append(len(content) - 1)
-
-    # pair double quotes in order
-    i = 0
-    while i < size:
-        range_list.append((tmp_list[i], tmp_list[i + 1] + 1))
-        i += 2
-
-    return range_list
+_INF = float('inf')
 
 
 def in_range(num, bound_list):
-    for bound in bound_list:
-        if bound[0] <= num < bound[1]:
-            return True
-    return False
+    """
+    :param num: offset to check
+    :param bound_list: a sorted list of non-overlapping (start, end) ranges, like Line.string_ranges
+    :return: whether start <= num < end for any range
+    """
+    i = bisect_right(bound_list, (num, _INF))  # the ranges starting at or before num
+    return i > 0 and num < bound_list[i - 1][1]
 
 
 # ===========================================